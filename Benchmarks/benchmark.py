@@ -0,0 +1,331 @@
+########################################################################################################################
+# benchmark.py
+# This script measures the hot paths of the managers and pages against a fake podman that reports a chosen number of
+# resources of every type: the time taken to list and decode each inventory, the memory held per record, the time taken
+# to populate each page's table and the memory held per row, and the latency of switching to each page in a headless
+# instance of the application.
+#
+# Every scale runs in its own process, with the fake podman first on its PATH and the CLI backend and an uncached
+# inventory forced, so that no state carries over between scales and the real podman is never touched. Docker Hub is
+# not contacted either: the image page is given an empty listing of popular images.
+#
+# Usage: python Benchmarks/benchmark.py [--scales 100,10000,100000] [--latency 0] [--json results.json]
+#                                        [--baseline previous.json --tolerance 0.25]
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import argparse
+import asyncio
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+# The repository is not installed as a package, so its modules are imported from the parent directory
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from Managers.backend_manager import STREAM_CHUNK_SIZE
+from Managers.container_manager import list_containers, list_containers_command
+from Managers.image_manager import list_images, list_images_command
+from Managers.network_manager import LIST_NETWORKS_COMMAND, list_networks
+from Managers.pod_manager import LIST_PODS_COMMAND, list_pods
+from Managers.record_manager import Container, Image, Network, Pod, Record, Volume
+from Managers.stream_manager import iter_json_array
+from Managers.volume_manager import LIST_VOLUMES_COMMAND, list_volumes
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+DEFAULT_SCALES = (100, 10_000, 100_000)
+
+# The listing function, podman command and record class of each resource
+RESOURCES: Dict[str, Tuple[Callable[[], List[Record]], List[str], Type[Record]]] = {
+    "containers": (list_containers, list_containers_command(), Container),
+    "images": (list_images, list_images_command(), Image),
+    "networks": (list_networks, LIST_NETWORKS_COMMAND, Network),
+    "pods": (list_pods, LIST_PODS_COMMAND, Pod),
+    "volumes": (list_volumes, LIST_VOLUMES_COMMAND, Volume),
+}
+
+# The tag of each page, the resource shown in its main table and the id of that table
+PAGES = [
+    ("container_page", "containers", "container_tbl"),
+    ("image_page", "images", "strd_img_tbl"),
+    ("network_page", "networks", "net_tbl"),
+    ("pod_page", "pods", "pod_tbl"),
+    ("volume_page", "volumes", "volume_tbl"),
+]
+
+# Worker groups that never finish or that fetch from Docker Hub, which a page switch does not wait for
+BACKGROUND_GROUPS = {"podman_events", "dh_img_tbl", "dh_tag_tbl"}
+
+# The metrics compared against a baseline, all of which are better when lower
+COMPARED_METRICS = ("list_ms", "parse_ms", "bytes_per_record", "switch_ms", "populate_ms", "bytes_per_row")
+
+# The size of the headless terminal
+SCREEN_SIZE = (200, 60)
+
+
+########################################################################################################################
+# ENVIRONMENT
+########################################################################################################################
+def install_fake_podman(directory: Path) -> None:
+    """
+    Place a 'podman' executable in a directory that runs the fake podman with the current interpreter.
+    :param directory: The directory, which is put first on the PATH of the benchmark.
+    """
+    shim = directory.joinpath("podman")
+    shim.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).with_name("fake_podman.py")}" "$@"\n')
+    shim.chmod(shim.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def benchmark_environment(directory: Path, objects: int, latency: float) -> Dict[str, str]:
+    """
+    Build the environment of a benchmark process.
+    :param directory: The directory containing the fake podman.
+    :param objects: The number of resources of each type the fake podman reports.
+    :param latency: The number of seconds the fake podman waits before answering.
+    :return: The environment variables.
+    """
+    # Build workspaces are kept in a temporary directory, so that a run leaves nothing behind
+    return dict(os.environ, PATH=f"{directory}{os.pathsep}{os.environ.get('PATH', '')}",
+                ISOPOD_BENCH_OBJECTS=str(objects), ISOPOD_BENCH_LATENCY=str(latency),
+                ISOPOD_BACKEND="cli", ISOPOD_CACHE_TTL="0",
+                ISOPOD_WORKSPACE_ROOT=tempfile.mkdtemp(prefix="isopod-workspaces-", dir=directory))
+
+
+########################################################################################################################
+# MEASUREMENTS
+########################################################################################################################
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def measure_listings(objects: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measure every list function end to end, the time taken to decode its output alone, and the memory held by the
+    records it produces.
+    :param objects: The number of resources of each type.
+    :return: The measurements of each resource.
+    """
+    results = {}
+    for name, (list_function, command, record_type) in RESOURCES.items():
+        started = time.perf_counter()
+        list_function()
+        list_ms = elapsed_ms(started)
+
+        # The output is captured once and decoded in memory, in the chunks it would have been read in
+        output = subprocess.run(command, capture_output=True, check=True).stdout
+        chunks = [output[index:index + STREAM_CHUNK_SIZE] for index in range(0, len(output), STREAM_CHUNK_SIZE)]
+
+        started = time.perf_counter()
+        records = [record_type.from_json(data) for data in iter_json_array(iter(chunks))]
+        parse_ms = elapsed_ms(started)
+        del records
+
+        tracemalloc.start()
+        records = [record_type.from_json(data) for data in iter_json_array(iter(chunks))]
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {"list_ms": list_ms, "parse_ms": parse_ms,
+                         "bytes_per_record": round(held / max(len(records), 1), 1)}
+    return results
+
+
+async def settle(app, pilot) -> None:
+    """
+    Wait until every worker started by the active screen has finished and the result has been rendered.
+    """
+    # The header clock keeps the application busy, so waiting for it to go idle would always time out. Pausing for no
+    # time still waits until every widget on the screen has processed its pending messages.
+    await pilot.pause(0)
+    while any(not worker.is_finished for worker in app.workers if worker.group not in BACKGROUND_GROUPS):
+        await asyncio.sleep(0.005)
+    await pilot.pause(0)
+
+
+def empty_hub_listing(*args, **kwargs) -> Iterator[List[List[str]]]:
+    return iter(())
+
+
+async def measure_pages(objects: int) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the latency of switching to each page from the home page, including the time taken to render it, and the
+    time taken to populate its main table with every resource along with the memory held per row.
+    :param objects: The number of resources of each type.
+    :return: The measurements of each page.
+    """
+    from textual.widgets import DataTable
+
+    import Pages.image_page
+    from main import IsopodApp
+    from Managers.navigation_manager import NavigationManager
+    from Managers.widget_manager import populate_records
+
+    Pages.image_page.iter_docker_hub_image_pages = empty_hub_listing
+
+    results = {}
+    app = IsopodApp()
+    async with app.run_test(size=SCREEN_SIZE) as pilot:
+        nav_manager = NavigationManager()
+        for tag, resource, table_id in PAGES:
+            list_function, _, record_type = RESOURCES[resource]
+
+            nav_manager.navigate('home_page')
+            await settle(app, pilot)
+            started = time.perf_counter()
+            nav_manager.navigate(tag)
+            await settle(app, pilot)
+            switch_ms = elapsed_ms(started)
+
+            records = list_function()
+            table = app.screen.query_one(f'#{table_id}', DataTable)
+            table.clear(columns=True)
+            await pilot.pause(0)
+            # Only the visible rows are rendered, so the cost of a fill is in building the rows
+            started = time.perf_counter()
+            populate_records(app.screen, table_id, record_type, records)
+            populate_ms = elapsed_ms(started)
+
+            # Tracing slows allocation down, so memory is measured on a second, untimed fill
+            table.clear(columns=True)
+            await pilot.pause(0)
+            tracemalloc.start()
+            populate_records(app.screen, table_id, record_type, records)
+            held, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[tag] = {"switch_ms": switch_ms, "populate_ms": populate_ms,
+                            "bytes_per_row": round(held / max(len(records), 1), 1)}
+    return results
+
+
+def run_worker(objects: int, pages: bool) -> Dict[str, Any]:
+    """
+    Take every measurement at one scale, in a process whose environment already points at the fake podman.
+    """
+    results: Dict[str, Any] = {"objects": objects, "listings": measure_listings(objects)}
+    if pages:
+        results["pages"] = asyncio.run(measure_pages(objects))
+    return results
+
+
+def run_scale(directory: Path, objects: int, latency: float, pages: bool) -> Dict[str, Any]:
+    """
+    Run the benchmark at one scale in a separate process.
+    :param directory: The directory containing the fake podman.
+    :param objects: The number of resources of each type.
+    :param latency: The number of seconds the fake podman waits before answering.
+    :param pages: Whether to measure the pages as well as the managers.
+    :return: The measurements.
+    """
+    command = [sys.executable, __file__, "--worker", "--scales", str(objects)] + ([] if pages else ["--skip-pages"])
+    result = subprocess.run(command, env=benchmark_environment(directory, objects, latency), cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"The benchmark of {objects} objects failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+########################################################################################################################
+# REPORTING
+########################################################################################################################
+def format_section(title: str, measurements: Dict[str, Dict[str, float]]) -> List[str]:
+    metrics = list(next(iter(measurements.values())))
+    lines = [f"{title:<16}" + "".join(f"{metric:>18}" for metric in metrics)]
+    for name, values in measurements.items():
+        lines.append(f"{name:<16}" + "".join(f"{values[metric]:>18}" for metric in metrics))
+    return lines
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    lines = []
+    for result in results:
+        lines.append(f"== {result['objects']} objects ==")
+        lines.extend(format_section("listing", result["listings"]))
+        if "pages" in result:
+            lines.extend(format_section("page", result["pages"]))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Compare measurements against those of a previous run.
+    :param results: The measurements of this run.
+    :param baseline: The measurements of the previous run.
+    :param tolerance: The fraction by which a metric may grow before it is reported.
+    :return: A description of every metric that grew by more than the tolerance.
+    """
+    previous = {entry["objects"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result["objects"])
+        if before is None:
+            continue
+        for section in ("listings", "pages"):
+            for name, values in result.get(section, {}).items():
+                for metric in COMPARED_METRICS:
+                    old = before.get(section, {}).get(name, {}).get(metric)
+                    new = values.get(metric)
+                    if old and new is not None and new > old * (1 + tolerance):
+                        regressions.append(f"{result['objects']} objects, {name} {metric}: {old} -> {new}")
+    return regressions
+
+
+########################################################################################################################
+# MAIN
+########################################################################################################################
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Isopod managers and pages against a fake podman.")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="comma separated numbers of resources of each type")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the fake podman waits before answering each command")
+    parser.add_argument("--skip-pages", action="store_true", help="only measure the managers")
+    parser.add_argument("--json", help="write the measurements to this file")
+    parser.add_argument("--baseline", help="compare against measurements previously written with --json")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="fraction by which a metric may exceed the baseline before the run fails")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(arguments)
+    scales = [int(scale) for scale in options.scales.split(",")]
+
+    if options.worker:
+        print(json.dumps(run_worker(scales[0], not options.skip_pages)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="isopod-bench-") as directory:
+        install_fake_podman(Path(directory))
+        results = []
+        for objects in scales:
+            results.append(run_scale(Path(directory), objects, options.latency, not options.skip_pages))
+            print(format_results(results[-1:]), flush=True)
+
+    if options.json:
+        Path(options.json).write_text(json.dumps(results, indent=2))
+
+    if options.baseline:
+        regressions = find_regressions(results, json.loads(Path(options.baseline).read_text()), options.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
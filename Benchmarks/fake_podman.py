@@ -0,0 +1,130 @@
+########################################################################################################################
+# fake_podman.py
+# A stand-in for the podman executable used by the benchmarks. It answers the list commands issued by the managers with
+# synthetic JSON for a configurable number of resources, optionally after a fixed delay, and echoes every other
+# command as podman does for commands that succeed.
+#
+# ISOPOD_BENCH_OBJECTS sets the number of resources of each type (100 by default) and ISOPOD_BENCH_LATENCY the number of
+# seconds to wait before answering (0 by default).
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# A fixed creation time, so that every run produces the same output
+CREATED = 1735689600
+
+CREATED_AT = "2025-01-01T00:00:00Z"
+
+
+########################################################################################################################
+# RESOURCES
+########################################################################################################################
+def resource_id(index: int, kind: int) -> str:
+    return f"{kind:02x}{index:010x}".ljust(64, "0")
+
+
+def containers(count: int) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield {"Id": resource_id(index, 1), "Image": f"docker.io/library/image{index % 20}:latest",
+               "Command": ["sh", "-c", "sleep infinity"], "Created": CREATED, "CreatedAt": "2 hours ago",
+               "Status": "Up 2 hours" if index % 2 else "Exited (0) 1 hour ago", "State": "running",
+               "Ports": [{"host_port": 8000 + index % 1000, "container_port": 80, "protocol": "tcp"}],
+               "Names": [f"container{index}"]}
+
+
+def images(count: int) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield {"Id": resource_id(index, 2), "Names": [f"docker.io/library/image{index}:latest"], "Created": CREATED,
+               "Size": 5_000_000 + index, "Labels": {}}
+
+
+def networks(count: int) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield {"id": resource_id(index, 3), "name": f"network{index}", "driver": "bridge",
+               "subnets": [{"subnet": f"10.{index // 256 % 256}.{index % 256}.0/24"}]}
+
+
+def pods(count: int) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield {"Id": resource_id(index, 4), "Name": f"pod{index}", "Status": "Running", "Created": CREATED_AT,
+               "InfraId": resource_id(index, 5), "Containers": [{"Id": resource_id(index, 5)}],
+               "Networks": ["podman"]}
+
+
+def volumes(count: int) -> Iterator[Dict[str, Any]]:
+    for index in range(count):
+        yield {"Name": f"volume{index}", "Driver": "local",
+               "Mountpoint": f"/var/lib/containers/storage/volumes/volume{index}/_data", "CreatedAt": CREATED_AT,
+               "Labels": {"bench": "true"}}
+
+
+########################################################################################################################
+# OUTPUT
+########################################################################################################################
+def write_array(records: Iterator[Dict[str, Any]]) -> None:
+    """
+    Print a JSON array one element at a time, as podman does, so that large inventories are never held in memory.
+    :param records: The elements of the array.
+    """
+    write = sys.stdout.write
+    write("[")
+    for index, record in enumerate(records):
+        write(",\n" if index else "\n")
+        write(json.dumps(record))
+    write("\n]\n")
+
+
+def main(arguments: List[str]) -> int:
+    count = int(os.environ.get("ISOPOD_BENCH_OBJECTS", 100))
+    time.sleep(float(os.environ.get("ISOPOD_BENCH_LATENCY", 0)))
+
+    # Filters are only used by the managers to look up a single resource by its id or name
+    filters = [value.split("=", 1)[1] for option, value in zip(arguments, arguments[1:]) if option == "--filter"]
+    limit = int(arguments[arguments.index("--last") + 1]) if "--last" in arguments else None
+    words = [argument for argument in arguments if not argument.startswith("-")][:2]
+
+    if words[:1] == ["ps"]:
+        records = containers(count if limit is None else min(limit, count))
+    elif words[:1] == ["images"]:
+        records = images(count)
+    elif words == ["network", "ls"]:
+        records = networks(count)
+    elif words == ["pod", "ps"]:
+        records = pods(count)
+    elif words == ["volume", "ls"]:
+        records = volumes(count)
+    elif words[:1] == ["events"]:
+        # Nothing changes while a benchmark runs, so the event stream stays silent until it is stopped
+        time.sleep(3600)
+        return 0
+    else:
+        print(" ".join(arguments))
+        return 0
+
+    if filters:
+        records = (record for record in records
+                   if any(str(record.get(key, "")).startswith(filters[0]) for key in ("Id", "id", "Name")))
+    try:
+        write_array(records)
+    except BrokenPipeError:
+        # The reader stopped once it had the rows it needed, as windowed tables do
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
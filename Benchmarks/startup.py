@@ -0,0 +1,154 @@
+########################################################################################################################
+# startup.py
+# This script measures how quickly the application starts: the time from launching the process until the home page has
+# been drawn, the time spent importing main, and the time taken to open each page for the first time, which is when
+# pages are created and their modules imported. It also reports whether any module that should only be loaded on
+# demand, such as requests, was imported before the first frame.
+#
+# Each run is a fresh process using the fake podman of benchmark.py, and Docker Hub is never contacted.
+#
+# Usage: python Benchmarks/startup.py [--runs 5] [--json results.json] [--budget-ms 1500]
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmark import PAGES, ROOT, SCREEN_SIZE, benchmark_environment, elapsed_ms, empty_hub_listing, \
+    install_fake_podman, settle
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# Modules that must not be imported before the first frame is drawn
+DEFERRED_MODULES = ("requests",)
+
+# The line a run prints as soon as the home page has been drawn
+PAINTED = "painted"
+
+# The number of resources of each type reported by the fake podman
+OBJECTS = 100
+
+
+########################################################################################################################
+# MEASUREMENTS
+########################################################################################################################
+async def measure_run() -> Dict[str, Any]:
+    """
+    Start the application headlessly and open every page once, in a process whose environment already points at the
+    fake podman.
+    :return: The measurements of the run.
+    """
+    started = time.perf_counter()
+    from main import IsopodApp
+    import_ms = elapsed_ms(started)
+
+    import Managers.image_manager
+    from Managers.navigation_manager import NavigationManager
+    Managers.image_manager.iter_docker_hub_image_pages = empty_hub_listing
+
+    app = IsopodApp()
+    started = time.perf_counter()
+    async with app.run_test(size=SCREEN_SIZE) as pilot:
+        await pilot.pause(0)
+        mount_ms = elapsed_ms(started)
+        print(PAINTED, flush=True)
+        loaded_early = [module for module in DEFERRED_MODULES if module in sys.modules]
+
+        first_open = {}
+        nav_manager = NavigationManager()
+        for tag, _, _ in PAGES:
+            started = time.perf_counter()
+            nav_manager.navigate(tag)
+            await settle(app, pilot)
+            first_open[tag] = elapsed_ms(started)
+
+    return {"import_ms": import_ms, "mount_ms": mount_ms, "first_open_ms": first_open, "loaded_early": loaded_early}
+
+
+def run_once(directory: Path) -> Dict[str, Any]:
+    """
+    Launch a fresh process and time how long it takes to draw the home page.
+    :param directory: The directory containing the fake podman.
+    :return: The measurements of the run.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, __file__, "--worker"], cwd=ROOT, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True, env=benchmark_environment(directory, OBJECTS, 0))
+    first_paint_ms = None
+    lines = []
+    for line in process.stdout:
+        if line.strip() == PAINTED and first_paint_ms is None:
+            first_paint_ms = elapsed_ms(started)
+        else:
+            lines.append(line)
+    if process.wait() != 0 or first_paint_ms is None:
+        raise RuntimeError(f"The application failed to start:\n{process.stderr.read()}")
+    return {"first_paint_ms": first_paint_ms, **json.loads(lines[-1])}
+
+
+def summarise(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Take the median of every measurement across runs, which is less sensitive to a single slow start than the mean.
+    """
+    summary = {metric: statistics.median(run[metric] for run in runs)
+               for metric in ("first_paint_ms", "import_ms", "mount_ms")}
+    summary["first_open_ms"] = {tag: statistics.median(run["first_open_ms"][tag] for run in runs) for tag, _, _ in PAGES}
+    summary["loaded_early"] = sorted({module for run in runs for module in run["loaded_early"]})
+    return summary
+
+
+########################################################################################################################
+# MAIN
+########################################################################################################################
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the startup time of the Isopod terminal interface.")
+    parser.add_argument("--runs", type=int, default=5, help="the number of times to start the application")
+    parser.add_argument("--json", help="write the measurements to this file")
+    parser.add_argument("--budget-ms", type=float,
+                        help="fail if the median time to the first frame exceeds this many milliseconds")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(arguments)
+
+    if options.worker:
+        print(json.dumps(asyncio.run(measure_run())))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="isopod-startup-") as directory:
+        install_fake_podman(Path(directory))
+        runs = [run_once(Path(directory)) for _ in range(options.runs)]
+    summary = summarise(runs)
+
+    print(f"{'first paint':<24}{summary['first_paint_ms']:>10} ms")
+    print(f"{'import main':<24}{summary['import_ms']:>10} ms")
+    print(f"{'mount home page':<24}{summary['mount_ms']:>10} ms")
+    for tag, value in summary["first_open_ms"].items():
+        print(f"{'open ' + tag:<24}{value:>10} ms")
+    print(f"{'loaded before paint':<24}{', '.join(summary['loaded_early']) or 'nothing deferred':>10}")
+
+    if options.json:
+        Path(options.json).write_text(json.dumps({"summary": summary, "runs": runs}, indent=2))
+
+    failed = bool(summary["loaded_early"])
+    if options.budget_ms is not None and summary["first_paint_ms"] > options.budget_ms:
+        print(f"First paint took {summary['first_paint_ms']} ms, over the budget of {options.budget_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,849 @@
+########################################################################################################################
+# backend_manager.py
+# This module provides pluggable backends used to execute Podman operations, either through the libpod REST API over
+# the local Unix socket or through the podman CLI.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import http.client
+import json
+import os
+import select
+import socket
+import stat
+import subprocess
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from queue import LifoQueue, Empty, Full
+from subprocess import CompletedProcess
+from typing import List, Optional, Dict, Tuple, Callable, Any, Iterator, AsyncIterator
+from urllib.parse import quote, urlencode
+
+from Managers.profile_manager import ProfileManager, attributed, calling_function
+from Managers.record_manager import parse_timestamp
+from Managers.system_manager import run_command, run_command_async
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The prefix of every libpod REST endpoint
+LIBPOD_PREFIX = "/v4.0.0/libpod"
+
+# The return code podman uses when a command fails
+PODMAN_ERROR_CODE = 125
+
+# The return code recorded for a REST API stream that was abandoned before the response ended
+ABORTED_CODE = -1
+
+# The number of bytes read from a pipe or socket at a time when streaming output
+STREAM_CHUNK_SIZE = 65536
+
+
+########################################################################################################################
+# BACKENDS
+########################################################################################################################
+class StreamStatus:
+    """
+    The outcome of a streamed podman command, filled in by the backend once the output is exhausted or abandoned.
+    """
+
+    def __init__(self, command: List[str], merge_stderr: bool = False):
+        self.command = command
+        # Commands that report progress on their error output, such as pulls, have it interleaved with their output
+        self.merge_stderr = merge_stderr
+        self.returncode: Optional[int] = None
+        self.stderr = ""
+        self.size = 0
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        # The output may be read on another thread, so the caller is identified while its stack is still available
+        self.caller = calling_function()
+        self.backend = "cli"
+        self.spawn: Optional[float] = None
+        self.bytes_in = 0
+        # Set by backends whose output is read on another thread, to interrupt a read that is blocked
+        self.abort: Optional[Callable[[], None]] = None
+        # Set by a reader that stopped on purpose once it had all the output it needed, such as a window of an
+        # inventory, in which case the command being killed does not mean that it failed
+        self.stopped_early = False
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0 or (self.stopped_early and self.returncode is not None)
+
+    def finish(self, returncode: int) -> None:
+        """
+        Record the return code of the command and how long it ran, and report it to the ProfileManager.
+        :param returncode: The return code.
+        """
+        self.returncode = returncode
+        self.duration = time.perf_counter() - self.started
+        ProfileManager().record(self.command, self.caller, self.backend, self.duration, self.spawn, self.bytes_in,
+                                self.size + len(self.stderr), 0 if self.succeeded else returncode)
+
+
+class Backend:
+    """
+    The base class for all Podman backends.
+    """
+
+    name = "base"
+
+    def run(self, command: List[str]) -> Optional[CompletedProcess]:
+        """
+        Execute a podman command.
+        :param command: The podman command as it would be passed to the CLI.
+        :return: A CompletedProcess object, or None if the backend cannot serve the command.
+        """
+        raise NotImplementedError
+
+    async def run_async(self, command: List[str]) -> Optional[CompletedProcess]:
+        """
+        Execute a podman command without blocking the event loop.
+        :param command: The podman command as it would be passed to the CLI.
+        :return: A CompletedProcess object, or None if the backend cannot serve the command.
+        """
+        raise NotImplementedError
+
+    def stream(self, command: List[str], status: StreamStatus) -> Optional[Iterator[bytes]]:
+        """
+        Execute a podman command and read its output incrementally. Closing the iterator early stops the command.
+        :param command: The podman command as it would be passed to the CLI.
+        :param status: Filled in with the return code and error output once the output is exhausted.
+        :return: An iterator of output chunks, or None if the backend cannot serve the command.
+        """
+        return None
+
+    async def stream_async(self, command: List[str], status: StreamStatus) -> Optional[AsyncIterator[bytes]]:
+        """
+        Execute a podman command and read its output incrementally without blocking the event loop.
+        :param command: The podman command as it would be passed to the CLI.
+        :param status: Filled in with the return code and error output once the output is exhausted.
+        :return: An iterator of output chunks, or None if the backend cannot serve the command.
+        """
+        return None
+
+
+class CliBackend(Backend):
+    """
+    A backend that forks the podman CLI for every command.
+    """
+
+    name = "cli"
+
+    def run(self, command: List[str]) -> Optional[CompletedProcess]:
+        return run_command(command, capture_output=True, text=True)
+
+    async def run_async(self, command: List[str]) -> Optional[CompletedProcess]:
+        return await run_command_async(command)
+
+    def stream(self, command: List[str], status: StreamStatus) -> Optional[Iterator[bytes]]:
+        started = time.perf_counter()
+        stderr = subprocess.STDOUT if status.merge_stderr else subprocess.PIPE
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        status.backend, status.spawn = self.name, time.perf_counter() - started
+        return self.read_process(process, status)
+
+    async def stream_async(self, command: List[str], status: StreamStatus) -> Optional[AsyncIterator[bytes]]:
+        started = time.perf_counter()
+        stderr = subprocess.STDOUT if status.merge_stderr else subprocess.PIPE
+        process = await asyncio.create_subprocess_exec(*command, stdout=subprocess.PIPE, stderr=stderr)
+        status.backend, status.spawn = self.name, time.perf_counter() - started
+        return self.read_process_async(process, status)
+
+    @staticmethod
+    def read_process(process: subprocess.Popen, status: StreamStatus) -> Iterator[bytes]:
+        # The error output is drained alongside the output, as podman would block once the pipe of either one filled up
+        errors: List[bytes] = []
+        drain = None
+        if process.stderr:
+            drain = threading.Thread(target=drain_pipe, args=(process.stderr, errors), daemon=True)
+            drain.start()
+        try:
+            while chunk := process.stdout.read1(STREAM_CHUNK_SIZE):
+                status.size += len(chunk)
+                yield chunk
+            if drain is not None:
+                drain.join()
+            status.stderr = b"".join(errors).decode(errors="replace")
+            status.finish(process.wait())
+        finally:
+            # The reader stopped early, so the rest of the output is not needed
+            if process.poll() is None:
+                process.kill()
+                status.finish(process.wait())
+            # The error output is closed by the thread draining it
+            process.stdout.close()
+
+    @staticmethod
+    async def read_process_async(process: asyncio.subprocess.Process, status: StreamStatus) -> AsyncIterator[bytes]:
+        # The error output is drained alongside the output, as podman would block once the pipe of either one filled up
+        drain = asyncio.ensure_future(process.stderr.read()) if process.stderr else None
+        try:
+            while chunk := await process.stdout.read(STREAM_CHUNK_SIZE):
+                status.size += len(chunk)
+                yield chunk
+            status.stderr = (await drain).decode(errors="replace") if drain is not None else ""
+            status.finish(await process.wait())
+        finally:
+            if process.returncode is None:
+                process.kill()
+                # The process is only reaped once its pipes are closed, so the output left unread is discarded
+                while await process.stdout.read(STREAM_CHUNK_SIZE):
+                    pass
+                status.finish(await process.wait())
+            if drain is not None and not drain.done():
+                drain.cancel()
+
+
+def drain_pipe(pipe: Any, chunks: List[bytes]) -> None:
+    """
+    Read a pipe to the end and close it.
+    :param pipe: The pipe.
+    :param chunks: Receives everything read from the pipe.
+    """
+    with pipe:
+        chunks.append(pipe.read())
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    An HTTP connection over a Unix domain socket.
+    """
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def connection_dropped(connection: UnixHTTPConnection) -> bool:
+    """
+    Determine whether the service has closed an idle connection. No response is pending on an idle connection, so its
+    socket only becomes readable once the service has closed its end.
+    :param connection: The idle connection.
+    :return: True if the connection can no longer be used, False otherwise.
+    """
+    if connection.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class ConnectionPool:
+    """
+    A pool of persistent keep-alive connections to the Podman service.
+    """
+
+    def __init__(self, socket_path: str, size: int = 4, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.idle = LifoQueue(maxsize=size)
+
+    def acquire(self) -> Tuple[UnixHTTPConnection, bool]:
+        """
+        Take a connection from the pool, opening a new one if none are idle.
+        :return: The connection and whether it was reused.
+        """
+        try:
+            return self.idle.get_nowait(), True
+        except Empty:
+            return UnixHTTPConnection(self.socket_path, self.timeout), False
+
+    def release(self, connection: UnixHTTPConnection) -> None:
+        """
+        Return a connection to the pool, closing it if the pool is full.
+        :param connection: The connection to return.
+        """
+        try:
+            self.idle.put_nowait(connection)
+        except Full:
+            connection.close()
+
+    def send(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> UnixHTTPConnection:
+        """
+        Send a request to the Podman service on a pooled connection. An error raised here means the request never
+        reached the service, so it is safe to repeat it elsewhere. The response must be read from the connection and
+        the connection handed back with finish.
+        :param method: The HTTP method.
+        :param path: The request path, including the query string.
+        :param body: An optional JSON body.
+        :return: The connection the request was sent on.
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+
+        while True:
+            connection, reused = self.acquire()
+            # A kept-alive connection may have been closed by the service while it was idle
+            if reused and connection_dropped(connection):
+                connection.close()
+                continue
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                return connection
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+
+    def finish(self, connection: UnixHTTPConnection, response: http.client.HTTPResponse) -> None:
+        """
+        Hand back a connection a request was sent on, keeping it alive only if the response was read to the end.
+        :param connection: The connection.
+        :param response: The response received on the connection.
+        """
+        if connection.sock is None or response.will_close or not response.isclosed():
+            connection.close()
+        else:
+            self.release(connection)
+
+    def close(self) -> None:
+        """
+        Close every idle connection in the pool.
+        """
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                return
+
+
+# A route maps the arguments of a podman command to a REST request and the stdout the CLI would have printed
+Route = Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]]]
+
+
+def _path(template: str, **params: str) -> str:
+    return LIBPOD_PREFIX + template.format(**{key: quote(value, safe="") for key, value in params.items()})
+
+
+def _query(template: str, filters: Dict[str, List[str]], **params: str) -> str:
+    query = dict(params, filters=json.dumps(filters)) if filters else params
+    return LIBPOD_PREFIX + template + ("?" + urlencode(query) if query else "")
+
+
+# Routes that list resources and accept any number of '--filter key=value' arguments
+LIST_ROUTES: List[Route] = [
+    (("ps", "-a", "--format", "json"),
+     lambda p: ("GET", _query("/containers/json", p["filters"], all="true"), None, None)),
+    (("ps", "-a", "--last", "{limit}", "--format", "json"),
+     lambda p: ("GET", _query("/containers/json", p["filters"], all="true", limit=p["limit"]), None, None)),
+    (("images", "--format", "json"),
+     lambda p: ("GET", _query("/images/json", p["filters"]), None, None)),
+    (("network", "ls", "--format", "json"),
+     lambda p: ("GET", _query("/networks/json", p["filters"]), None, None)),
+    (("pod", "ps", "--format", "json"),
+     lambda p: ("GET", _query("/pods/json", p["filters"]), None, None)),
+    (("volume", "ls", "--format", "json"),
+     lambda p: ("GET", _query("/volumes/json", p["filters"]), None, None)),
+]
+
+
+def human_duration(seconds: float) -> str:
+    """
+    Describe a duration the way the podman CLI does in its STATUS and CREATED columns.
+    :param seconds: The duration in seconds.
+    :return: The approximate duration, such as '5 minutes' or 'About an hour'.
+    """
+    # Hours are rounded half up, like the Go duration the CLI formats
+    minutes, hours = int(seconds / 60), int(seconds / 3600 + 0.5)
+    if seconds < 1:
+        return "Less than a second"
+    if seconds < 2:
+        return "1 second"
+    if seconds < 60:
+        return f"{int(seconds)} seconds"
+    if minutes == 1:
+        return "About a minute"
+    if minutes < 60:
+        return f"{minutes} minutes"
+    if hours == 1:
+        return "About an hour"
+    if hours < 48:
+        return f"{hours} hours"
+    if hours < 24 * 7 * 2:
+        return f"{hours // 24} days"
+    if hours < 24 * 30 * 2:
+        return f"{hours // 24 // 7} weeks"
+    if hours < 24 * 365 * 2:
+        return f"{hours // 24 // 30} months"
+    return f"{int(seconds / 3600) // 24 // 365} years"
+
+
+def normalise_container(data: Dict[str, Any], now: float) -> Dict[str, Any]:
+    """
+    Convert a container listed by the REST API into the JSON printed by 'podman ps --format json', which reports the
+    creation time in seconds and replaces the health status with a human readable status.
+    :param data: The container as listed by the REST API.
+    :param now: The current time, which the CLI measures durations from.
+    :return: The container as the CLI would have printed it.
+    """
+    created = data.get("Created")
+    if isinstance(created, str):
+        created = parse_timestamp(created)
+    created = int(created or 0)
+
+    state = data.get("State") or ""
+    if state == "running":
+        status = "Up " + human_duration(now - (data.get("StartedAt") or 0))
+    elif state in ("exited", "stopped"):
+        status = f"Exited ({data.get('ExitCode') or 0}) {human_duration(now - (data.get('ExitedAt') or 0))} ago"
+    else:
+        status = state[:1].upper() + state[1:]
+    if data.get("Status"):
+        status += f" ({data['Status']})"
+    return dict(data, Created=created, CreatedAt=human_duration(now - created) + " ago", Status=status)
+
+
+# List endpoints whose REST records differ from the records the CLI prints, with the function converting each record
+NORMALISERS: Dict[str, Callable[[Dict[str, Any], float], Dict[str, Any]]] = {
+    "/containers/json": normalise_container,
+}
+
+
+def response_normaliser(path: str) -> Optional[Callable[[bytes], bytes]]:
+    """
+    Find the conversion that turns the body of a REST list response into the output the CLI would have printed.
+    :param path: The path of the request.
+    :return: A function converting the body, or None if the body already matches the CLI output.
+    """
+    normalise = NORMALISERS.get(path[len(LIBPOD_PREFIX):].partition("?")[0])
+    if normalise is None:
+        return None
+
+    def convert(content: bytes) -> bytes:
+        try:
+            records = json.loads(content) or []
+        except ValueError:
+            return content
+        now = time.time()
+        return json.dumps([normalise(record, now) for record in records]).encode()
+    return convert
+
+
+ROUTES: List[Route] = [
+    # Containers
+    (("start", "{name}"),
+     lambda p: ("POST", _path("/containers/{name}/start", name=p["name"]), None, p["name"])),
+    (("stop", "{name}"),
+     lambda p: ("POST", _path("/containers/{name}/stop", name=p["name"]), None, p["name"])),
+    (("restart", "{name}"),
+     lambda p: ("POST", _path("/containers/{name}/restart", name=p["name"]), None, p["name"])),
+    (("rm", "{name}"),
+     lambda p: ("DELETE", _path("/containers/{name}", name=p["name"]), None, p["name"])),
+    (("stop", "-t", "{timeout}", "{name}"),
+     lambda p: ("POST", _path("/containers/{name}/stop", name=p["name"]) + "?" + urlencode({"timeout": p["timeout"]}),
+                None, p["name"])),
+    (("restart", "-t", "{timeout}", "{name}"),
+     lambda p: ("POST", _path("/containers/{name}/restart", name=p["name"]) + "?" + urlencode({"t": p["timeout"]}),
+                None, p["name"])),
+    (("rm", "-f", "-t", "{timeout}", "{name}"),
+     lambda p: ("DELETE", _path("/containers/{name}", name=p["name"]) + "?" +
+                urlencode({"force": "true", "timeout": p["timeout"]}), None, p["name"])),
+    # Images
+    (("pull", "{reference}"),
+     lambda p: ("POST", _query("/images/pull", {}, reference=p["reference"]), None, None)),
+    (("image", "rm", "{id}"),
+     lambda p: ("DELETE", _path("/images/{id}", id=p["id"]), None, None)),
+    # Networks
+    (("network", "create", "--subnet", "{subnet}", "{name}"),
+     lambda p: ("POST", LIBPOD_PREFIX + "/networks/create",
+                {"name": p["name"], "subnets": [{"subnet": p["subnet"]}] if p["subnet"] else []}, p["name"])),
+    (("network", "rm", "{name}"),
+     lambda p: ("DELETE", _path("/networks/{name}", name=p["name"]), None, p["name"])),
+    # Pods
+    (("pod", "rm", "{name}"),
+     lambda p: ("DELETE", _path("/pods/{name}", name=p["name"]), None, None)),
+    # Volumes
+    (("volume", "create", "{name}"),
+     lambda p: ("POST", LIBPOD_PREFIX + "/volumes/create", {"Name": p["name"]}, p["name"])),
+    (("volume", "rm", "{name}"),
+     lambda p: ("DELETE", _path("/volumes/{name}", name=p["name"]), None, p["name"])),
+]
+
+
+def match_route(arguments: List[str]) -> Optional[Tuple[Route, Dict[str, Any]]]:
+    """
+    Find the route that serves the given podman arguments.
+    :param arguments: The podman arguments, without the leading 'podman'.
+    :return: The matching route and its captured parameters, or None if no route matches.
+    """
+    # Filters may appear anywhere and repeat, so they are collected before matching the remaining arguments
+    filters: Dict[str, List[str]] = {}
+    remaining = []
+    iterator = iter(arguments)
+    for argument in iterator:
+        if argument == "--filter":
+            key, _, value = next(iterator, "").partition("=")
+            filters.setdefault(key, []).append(value)
+        else:
+            remaining.append(argument)
+
+    for route in LIST_ROUTES + ([] if filters else ROUTES):
+        pattern = route[0]
+        if len(pattern) != len(remaining):
+            continue
+        params: Dict[str, Any] = {"filters": filters}
+        for expected, actual in zip(pattern, remaining):
+            if expected.startswith("{") and expected.endswith("}"):
+                params[expected[1:-1]] = actual
+            elif expected != actual:
+                break
+        else:
+            return route, params
+    return None
+
+
+class SocketBackend(Backend):
+    """
+    A backend that talks to the libpod REST API over the local Unix socket.
+    """
+
+    name = "socket"
+
+    def __init__(self, socket_path: str, pool_size: int = 4):
+        self.socket_path = socket_path
+        self.pool = ConnectionPool(socket_path, pool_size)
+
+    def available(self) -> bool:
+        """
+        Determine whether the Podman service socket exists.
+        :return: True if the socket exists, False otherwise.
+        """
+        try:
+            return stat.S_ISSOCK(os.stat(self.socket_path).st_mode)
+        except OSError:
+            return False
+
+    def run(self, command: List[str]) -> Optional[CompletedProcess]:
+        matched = match_route(command[1:])
+        if matched is None:
+            return None
+        route, params = matched
+        method, path, body, output = route[1](params)
+
+        started = time.perf_counter()
+        try:
+            connection = self.pool.send(method, path, body)
+        except (http.client.HTTPException, OSError):
+            return None
+        # The service may already have acted on the request, so from here on an error is reported rather than the
+        # command being repeated by the CLI
+        try:
+            response = connection.getresponse()
+            status, content = response.status, response.read()
+        except (http.client.HTTPException, OSError) as error:
+            connection.close()
+            result = CompletedProcess(command, PODMAN_ERROR_CODE, stdout="", stderr=f"Error: {error}\n")
+            ProfileManager().record(command, calling_function(), self.name, time.perf_counter() - started,
+                                    bytes_in=request_size(body), returncode=result.returncode)
+            return result
+        self.pool.finish(connection, response)
+
+        # 304 is returned when a container is already in the requested state, which the CLI treats as success
+        if 200 <= status < 300 or status == 304:
+            normalise = response_normaliser(path)
+            stdout = output + "\n" if output is not None else \
+                (normalise(content) if normalise else content).decode(errors="replace")
+            result = CompletedProcess(command, 0, stdout=stdout, stderr="")
+        else:
+            result = CompletedProcess(command, PODMAN_ERROR_CODE, stdout="", stderr=error_message(content))
+        ProfileManager().record(command, calling_function(), self.name, time.perf_counter() - started,
+                                bytes_in=request_size(body), bytes_out=len(content), returncode=result.returncode)
+        return result
+
+    async def run_async(self, command: List[str]) -> Optional[CompletedProcess]:
+        # Requests are short-lived and the pool is thread safe, so they are served from a worker thread
+        if match_route(command[1:]) is None:
+            return None
+        return await asyncio.to_thread(self.run, command)
+
+    def stream(self, command: List[str], status: StreamStatus) -> Optional[Iterator[bytes]]:
+        matched = match_route(command[1:])
+        if matched is None:
+            return None
+        route, params = matched
+        method, path, body, output = route[1](params)
+
+        # The request is sent before returning so that an unreachable service falls back to the CLI
+        try:
+            connection = self.pool.send(method, path, body)
+        except (http.client.HTTPException, OSError):
+            return None
+        status.backend, status.bytes_in = self.name, request_size(body)
+        status.abort = partial(close_connection, connection)
+        try:
+            response = connection.getresponse()
+        except (http.client.HTTPException, OSError) as error:
+            connection.close()
+            return self.read_failure(error, status)
+        return self.read_response(connection, response, output, status, response_normaliser(path))
+
+    async def stream_async(self, command: List[str], status: StreamStatus) -> Optional[AsyncIterator[bytes]]:
+        if match_route(command[1:]) is None:
+            return None
+        sending = asyncio.ensure_future(asyncio.to_thread(self.stream, command, status))
+        try:
+            chunks = await asyncio.shield(sending)
+        except asyncio.CancelledError:
+            # The response would never be read, so the connection is closed once the worker thread has opened it
+            sending.add_done_callback(lambda _: self.abandon(status))
+            raise
+        if chunks is None:
+            return None
+        return self.read_in_thread(chunks, status)
+
+    def read_response(self, connection: UnixHTTPConnection, response: http.client.HTTPResponse, output: Optional[str],
+                      status: StreamStatus, normalise: Optional[Callable[[bytes], bytes]] = None) -> Iterator[bytes]:
+        try:
+            if not (200 <= response.status < 300 or response.status == 304):
+                status.stderr = error_message(response.read())
+                status.finish(PODMAN_ERROR_CODE)
+                return
+            if output is not None:
+                response.read()
+                status.finish(0)
+                yield (output + "\n").encode()
+            elif normalise is not None:
+                # Records are converted as a whole, so a body that differs from the CLI output is not streamed
+                content = response.read()
+                status.size += len(content)
+                status.finish(0)
+                yield normalise(content)
+            else:
+                # http.client removes the chunked transfer encoding, so the body arrives as it is produced
+                while chunk := response.read1(STREAM_CHUNK_SIZE):
+                    status.size += len(chunk)
+                    yield chunk
+                # A read woken by closing the connection under it ends as if the response had ended
+                if connection.sock is None:
+                    return
+                # Marks the response as complete so that the connection can be kept alive
+                response.read()
+                status.finish(0)
+        finally:
+            if status.returncode is None:
+                status.finish(ABORTED_CODE)
+            self.pool.finish(connection, response)
+
+    @staticmethod
+    def abandon(status: StreamStatus) -> None:
+        if status.abort is not None:
+            status.abort()
+        if status.returncode is None:
+            status.finish(ABORTED_CODE)
+
+    @staticmethod
+    def read_failure(error: Exception, status: StreamStatus) -> Iterator[bytes]:
+        # The request was sent before the connection failed, so the failure is reported rather than retried
+        status.stderr = f"Error: {error}\n"
+        status.finish(PODMAN_ERROR_CODE)
+        yield from ()
+
+    @staticmethod
+    async def read_in_thread(chunks: Iterator[bytes], status: StreamStatus) -> AsyncIterator[bytes]:
+        try:
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                yield chunk
+        finally:
+            try:
+                chunks.close()
+            except ValueError:
+                # The reader was cancelled while a read was blocked on the worker thread, which only ends once the
+                # connection is shut down under it. The connection is closed here rather than handed back to the pool,
+                # as the worker thread may still be reading from it
+                status.abort()
+
+
+def close_connection(connection: UnixHTTPConnection) -> None:
+    """
+    Close a connection whose response is abandoned. The socket is shut down first, which wakes a read of the response
+    that is blocked on another thread.
+    :param connection: The connection.
+    """
+    try:
+        connection.sock.shutdown(socket.SHUT_RDWR)
+    except (AttributeError, OSError):
+        pass
+    connection.close()
+
+
+def request_size(body: Optional[Dict[str, Any]]) -> int:
+    """
+    Determine the number of bytes a request body occupies on the wire.
+    :param body: The JSON body, or None if the request has no body.
+    :return: The size of the encoded body.
+    """
+    return len(json.dumps(body).encode()) if body is not None else 0
+
+
+def error_message(content: bytes) -> str:
+    """
+    Convert the body of a failed libpod response into the error output the CLI would have printed.
+    :param content: The body of the response.
+    :return: The error output.
+    """
+    try:
+        message = json.loads(content).get("message", "")
+    except (ValueError, AttributeError):
+        message = content.decode(errors="replace")
+    return f"Error: {message}\n"
+
+
+########################################################################################################################
+# BACKEND SELECTION
+########################################################################################################################
+def default_socket_path() -> str:
+    """
+    Determine the path of the Podman service socket, honouring CONTAINER_HOST when it points to a Unix socket.
+    :return: The path to the socket.
+    """
+    container_host = os.environ.get("CONTAINER_HOST", "")
+    if container_host.startswith("unix://"):
+        return container_host[len("unix://"):]
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+    return str(Path(runtime_dir).joinpath("podman", "podman.sock"))
+
+
+class BackendManager:
+    """
+    Selects the backend used by the manager functions. The ISOPOD_BACKEND environment variable may be set to 'socket',
+    'cli' or 'auto' (the default), which uses the socket when the Podman service is running and the CLI otherwise.
+    Commands the socket backend cannot serve always fall back to the CLI.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.cli = CliBackend()
+            cls._instance.backend = cls._instance.select_backend(os.environ.get("ISOPOD_BACKEND", "auto"))
+        return cls._instance
+
+    def select_backend(self, preference: str) -> Backend:
+        """
+        Select a backend based on a preference.
+        :param preference: One of 'auto', 'socket' or 'cli'.
+        :return: The selected backend.
+        """
+        if preference == "cli":
+            return self.cli
+
+        backend = SocketBackend(default_socket_path())
+        if preference == "socket" or backend.available():
+            return backend
+        return self.cli
+
+    def set_backend(self, backend: Backend) -> None:
+        self.backend = backend
+
+    def run(self, command: List[str]) -> CompletedProcess:
+        """
+        Execute a podman command on the selected backend, falling back to the CLI if required.
+        :param command: The podman command as it would be passed to the CLI.
+        :return: A CompletedProcess object containing the result of the command.
+        """
+        started = time.perf_counter()
+        result = self.backend.run(command)
+        if result is None:
+            result = self.cli.run(command)
+        result.duration = time.perf_counter() - started
+        return result
+
+    async def run_async(self, command: List[str]) -> CompletedProcess:
+        """
+        Execute a podman command on the selected backend without blocking the event loop.
+        :param command: The podman command as it would be passed to the CLI.
+        :return: A CompletedProcess object containing the result of the command.
+        """
+        started = time.perf_counter()
+        # The socket backend serves requests from a worker thread, which cannot see the stack of the caller
+        with attributed():
+            result = await self.backend.run_async(command)
+            if result is None:
+                result = await self.cli.run_async(command)
+        result.duration = time.perf_counter() - started
+        return result
+
+    def stream(self, command: List[str], status: StreamStatus) -> Iterator[bytes]:
+        """
+        Execute a podman command on the selected backend and read its output incrementally.
+        :param command: The podman command as it would be passed to the CLI.
+        :param status: Filled in with the return code and error output once the output is exhausted.
+        :return: An iterator of output chunks.
+        """
+        chunks = self.backend.stream(command, status)
+        if chunks is None:
+            chunks = self.cli.stream(command, status)
+        return chunks
+
+    async def stream_async(self, command: List[str], status: StreamStatus) -> AsyncIterator[bytes]:
+        """
+        Execute a podman command on the selected backend and read its output incrementally without blocking the event
+        loop.
+        :param command: The podman command as it would be passed to the CLI.
+        :param status: Filled in with the return code and error output once the output is exhausted.
+        :return: An iterator of output chunks.
+        """
+        chunks = await self.backend.stream_async(command, status)
+        if chunks is None:
+            chunks = await self.cli.stream_async(command, status)
+        return chunks
+
+
+def run_podman(command: List[str]) -> CompletedProcess:
+    """
+    Execute a podman command on the selected backend.
+    :param command: The podman command as it would be passed to the CLI.
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    return BackendManager().run(command)
+
+
+async def run_podman_async(command: List[str]) -> CompletedProcess:
+    """
+    Execute a podman command on the selected backend without blocking the event loop.
+    :param command: The podman command as it would be passed to the CLI.
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    return await BackendManager().run_async(command)
+
+
+def stream_podman(command: List[str], status: StreamStatus) -> Iterator[bytes]:
+    """
+    Execute a podman command on the selected backend and read its output incrementally.
+    :param command: The podman command as it would be passed to the CLI.
+    :param status: Filled in with the return code and error output once the output is exhausted.
+    :return: An iterator of output chunks.
+    """
+    return BackendManager().stream(command, status)
+
+
+async def stream_podman_async(command: List[str], status: StreamStatus) -> AsyncIterator[bytes]:
+    """
+    Execute a podman command on the selected backend and read its output incrementally without blocking the event loop.
+    :param command: The podman command as it would be passed to the CLI.
+    :param status: Filled in with the return code and error output once the output is exhausted.
+    :return: An iterator of output chunks.
+    """
+    return await BackendManager().stream_async(command, status)
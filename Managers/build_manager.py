@@ -0,0 +1,331 @@
+########################################################################################################################
+# build_manager.py
+# This module runs image builds in the background. The output of each build is streamed into a bounded buffer as it is
+# produced, the time taken by every step of the Containerfile is measured, and a build can be cancelled, which stops
+# the podman process running it.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import codecs
+import itertools
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import Dict, List, Optional
+
+from Managers.backend_manager import PODMAN_ERROR_CODE, StreamStatus, stream_podman_async
+from Managers.cache_manager import CacheManager, IMAGES
+from Managers.image_manager import build_command, reuse_unchanged_image_async
+from Managers.log_manager import LogManager
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The number of output lines kept for each build, unless overridden by ISOPOD_BUILD_LOG_LINES
+DEFAULT_LOG_LINES = 2000
+
+# The states of a build
+BUILDING = "building"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+# The start of a step, such as 'STEP 2/5: RUN make' or '[1/2] STEP 3/4: COPY . /src' in a multi-stage build
+STEP_LINE = re.compile(r"(?:\[(\d+)/(\d+)\] )?STEP (\d+)/(\d+): (.*)")
+
+# Printed when a step reuses a layer of an earlier build
+CACHE_LINE = re.compile(r"--> Using cache ([0-9a-f]+)")
+
+# The ID printed by podman once the image is committed
+IMAGE_ID = re.compile(r"[0-9a-f]{64}")
+
+LINE_BREAKS = re.compile(r"\r?\n|\r")
+
+
+########################################################################################################################
+# PROGRESS
+########################################################################################################################
+class BuildStep:
+    """
+    A single instruction of a Containerfile and how long it took.
+    """
+
+    __slots__ = ("stage", "number", "total", "instruction", "started", "finished", "cached")
+
+    def __init__(self, stage: Optional[str], number: int, total: int, instruction: str):
+        self.stage = stage
+        self.number = number
+        self.total = total
+        self.instruction = instruction
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.cached = False
+
+    @property
+    def label(self) -> str:
+        return f"{self.stage} {self.number}/{self.total}" if self.stage else f"{self.number}/{self.total}"
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+
+class BuildJob:
+    """
+    A build of a single image, updated as its output arrives.
+    """
+
+    def __init__(self, id: str, path: Path, name: str, tag: str, no_cache: bool, log_lines: int,
+                 build_args: Optional[Dict[str, str]] = None):
+        self.id = id
+        self.path = path
+        self.reference = f"{name}:{tag}"
+        self.name = name
+        self.tag = tag
+        self.no_cache = no_cache
+        self.build_args = build_args
+        self.state = BUILDING
+        self.steps: List[BuildStep] = []
+        # Only the most recent lines are kept, while lines_seen counts every line so that views can tell what is new
+        self.lines = deque(maxlen=log_lines)
+        self.lines_seen = 0
+        self.size = 0
+        self.message = "Hashing the build context"
+        self.image_id: Optional[str] = None
+        self.result: Optional[CompletedProcess] = None
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.completed = asyncio.Event()
+        # Incremented on every change, so that views only redraw the builds that changed
+        self.version = 0
+
+    def builds(self, path: Path, no_cache: bool, build_args: Optional[Dict[str, str]]) -> bool:
+        """
+        Determine whether this job builds its image from the given context and options.
+        :param path: The path to the build context.
+        :param no_cache: Whether every layer is rebuilt.
+        :param build_args: The values of the ARG instructions of the Containerfile.
+        :return: True if a build with these inputs would produce the same image, False otherwise.
+        """
+        return (Path(self.path).resolve() == Path(path).resolve() and self.no_cache == no_cache and
+                (self.build_args or {}) == (build_args or {}))
+
+    def feed_line(self, line: str) -> None:
+        """
+        Record a line of output, starting a new step when the line announces one.
+        :param line: The line, without its line break.
+        """
+        self.lines.append(line)
+        self.lines_seen += 1
+        text = line.strip()
+        if not text:
+            return
+
+        match = STEP_LINE.match(text)
+        if match:
+            stage, stages, number, total, instruction = match.groups()
+            self.finish_step()
+            self.steps.append(BuildStep(f"[{stage}/{stages}]" if stage else None, int(number), int(total), instruction))
+        elif CACHE_LINE.match(text) and self.steps:
+            self.steps[-1].cached = True
+        elif IMAGE_ID.fullmatch(text):
+            self.image_id = text
+        self.message = text
+        self.version += 1
+
+    def finish_step(self) -> None:
+        if self.steps and self.steps[-1].finished is None:
+            self.steps[-1].finished = time.perf_counter()
+
+    def finish(self, state: str, result: CompletedProcess, message: Optional[str] = None) -> None:
+        """
+        Record the outcome of the build and wake anything waiting for it.
+        :param state: One of DONE, FAILED or CANCELLED.
+        :param result: The result of the build.
+        :param message: The status shown for the build, instead of one describing the outcome.
+        """
+        self.finish_step()
+        self.state = state
+        self.result = result
+        self.finished = time.perf_counter()
+        if message:
+            self.message = message
+        elif state == CANCELLED:
+            self.message = "Cancelled"
+        elif state == DONE:
+            slowest = self.slowest_step
+            self.message = f"Built {self.image_id[:12]}" if self.image_id else "Built"
+            if slowest is not None:
+                self.message += f", slowest step {slowest.label} took {slowest.elapsed:.1f} s"
+        self.version += 1
+        self.completed.set()
+
+    @property
+    def current_step(self) -> Optional[BuildStep]:
+        return self.steps[-1] if self.steps else None
+
+    @property
+    def slowest_step(self) -> Optional[BuildStep]:
+        return max(self.steps, key=lambda step: step.elapsed, default=None)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def timing_summary(self) -> str:
+        """
+        The time taken by every step, for the log.
+        """
+        return "\n".join(f"STEP {step.label} {step.elapsed:.1f} s{' (cached)' if step.cached else ''}: "
+                         f"{step.instruction}" for step in self.steps)
+
+
+########################################################################################################################
+# BUILD MANAGER
+########################################################################################################################
+class BuildManager:
+    """
+    Runs image builds in the background on the event loop of the application.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.jobs = {}
+            cls._instance.ids = itertools.count(1)
+            # The jobs are changed on the event loop and read by the workspace reaper thread
+            cls._instance.lock = threading.Lock()
+            cls._instance.log_lines = int(os.environ.get("ISOPOD_BUILD_LOG_LINES", DEFAULT_LOG_LINES))
+        return cls._instance
+
+    def start(self, path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+              build_args: Optional[Dict[str, str]] = None) -> BuildJob:
+        """
+        Start building an image. Must be called from a running event loop.
+        :param path: The path to the directory containing the Dockerfile and resources.
+        :param name: The name of the image to build.
+        :param tag: The tag of the image.
+        :param no_cache: Whether to rebuild every layer and never reuse an existing image.
+        :param build_args: The values of the ARG instructions of the Containerfile.
+        :return: The job building the image, which is the existing job if the same build is already running.
+        :raises ValueError: If the image is already being built from a different context or with different options.
+        """
+        reference = f"{name}:{tag}"
+        for job in self.get_jobs():
+            if job.reference != reference or job.state in FINISHED_STATES:
+                continue
+            if job.builds(path, no_cache, build_args):
+                return job
+            raise ValueError(f"{reference} is already being built from {job.path} with different options, "
+                             f"cancel that build first")
+
+        job_id = str(next(self.ids))
+        job = BuildJob(job_id, path, name, tag, no_cache, self.log_lines, build_args)
+        with self.lock:
+            # A finished build of the same image is replaced, moving it to the end of the list
+            self.jobs = {key: other for key, other in self.jobs.items() if other.reference != reference}
+            self.jobs[job_id] = job
+        job.task = asyncio.get_running_loop().create_task(self.run(job))
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a build, stopping the podman process running it.
+        :param job_id: The id of the build.
+        :return: True if the build was cancelled, False if it had already finished.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.task.cancel()
+        return True
+
+    def get_job(self, job_id: str) -> Optional[BuildJob]:
+        return self.jobs.get(job_id)
+
+    def get_jobs(self) -> List[BuildJob]:
+        with self.lock:
+            return list(self.jobs.values())
+
+    def has_pending(self) -> bool:
+        return any(job.state not in FINISHED_STATES for job in self.get_jobs())
+
+    def clear_finished(self) -> None:
+        with self.lock:
+            self.jobs = {job_id: job for job_id, job in self.jobs.items() if job.state not in FINISHED_STATES}
+
+    async def run(self, job: BuildJob) -> None:
+        # The command recorded if the build ends before the context hash that labels the image is known
+        unlabelled = build_command(job.path, job.name, job.tag, job.no_cache, build_args=job.build_args)
+        try:
+            command, reused = await reuse_unchanged_image_async(job.path, job.name, job.tag, job.no_cache,
+                                                                job.build_args)
+            if reused is not None:
+                if reused.returncode == 0:
+                    job.image_id = reused.stdout.strip()
+                    CacheManager().invalidate(IMAGES)
+                    job.finish(DONE, reused, f"Unchanged, reused image {job.image_id[:12]}")
+                else:
+                    job.finish(FAILED, reused, reused.stderr.strip())
+                return
+            job.message = "Starting"
+            job.version += 1
+            await self.stream_build(job, command)
+        except asyncio.CancelledError:
+            job.finish(CANCELLED, CompletedProcess(unlabelled, -1, stdout="", stderr="Cancelled"))
+            LogManager().add_log(f"Build of {job.reference} cancelled after {job.elapsed:.1f} s")
+        except OSError as error:
+            # The context cannot be read or podman is not installed
+            result = CompletedProcess(unlabelled, PODMAN_ERROR_CODE, stdout="", stderr=str(error))
+            job.finish(FAILED, result, str(error))
+            LogManager().log_command(unlabelled, PODMAN_ERROR_CODE, "", str(error), job.elapsed)
+
+    async def stream_build(self, job: BuildJob, command: List[str]) -> None:
+        status = StreamStatus(command, merge_stderr=True)
+        try:
+            async with aclosing(await stream_podman_async(command, status)) as chunks:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                buffer = ""
+                async for chunk in chunks:
+                    job.size += len(chunk)
+                    *lines, buffer = LINE_BREAKS.split(buffer + decoder.decode(chunk))
+                    for line in lines:
+                        job.feed_line(line)
+                buffer += decoder.decode(b"", final=True)
+                if buffer:
+                    job.feed_line(buffer)
+        except OSError as error:
+            # podman is not installed
+            returncode, error_output = PODMAN_ERROR_CODE, str(error)
+        else:
+            returncode = status.returncode or 0
+            error_output = "\n".join(list(job.lines)[-20:]) if returncode else ""
+
+        result = CompletedProcess(command, returncode, stdout=f"{job.image_id}\n" if job.image_id else "",
+                                  stderr=error_output)
+        if returncode:
+            job.finish(FAILED, result, error_output.splitlines()[-1] if error_output else
+                       f"podman exited with {returncode}")
+        else:
+            CacheManager().invalidate(IMAGES)
+            job.finish(DONE, result)
+        # The log records the time of each step rather than the whole output, which stays in the job
+        LogManager().log_command(command, returncode, job.timing_summary(), error_output, job.elapsed,
+                                 stdout_size=job.size)
@@ -0,0 +1,200 @@
+########################################################################################################################
+# cache_manager.py
+# This module provides a process-wide cache of Podman resource inventories.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import functools
+import inspect
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The resource types that are cached
+CONTAINERS = "containers"
+IMAGES = "images"
+NETWORKS = "networks"
+PODS = "pods"
+VOLUMES = "volumes"
+
+# The number of seconds an inventory stays fresh, unless overridden by ISOPOD_CACHE_TTL
+DEFAULT_TTL = 30.0
+
+
+########################################################################################################################
+# CACHE
+########################################################################################################################
+class CacheManager:
+    """
+    Caches the inventory of each resource type for a configurable time to live. Entries are invalidated whenever a
+    manager function that changes the resource succeeds.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.ttl = float(os.environ.get("ISOPOD_CACHE_TTL", DEFAULT_TTL))
+            cls._instance.entries = {}
+            # Incremented by every invalidation of a resource type, and under the empty key by every full invalidation
+            cls._instance.generations = {}
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    def set_ttl(self, ttl: float) -> None:
+        """
+        Set the number of seconds an inventory stays fresh. A TTL of 0 disables caching.
+        :param ttl: The time to live in seconds.
+        """
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached inventory.
+        :param key: The resource type.
+        :return: The inventory, or None if it is missing or stale.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self.entries[key]
+                return None
+            return value
+
+    def generation(self, key: str) -> Tuple[int, int]:
+        """
+        Get the number of times an inventory has been invalidated, to be passed to put once it has been loaded.
+        :param key: The resource type, or the key of a window of it.
+        :return: The generation.
+        """
+        with self.lock:
+            return self.current_generation(key)
+
+    def current_generation(self, key: str) -> Tuple[int, int]:
+        return self.generations.get("", 0), self.generations.get(key.split(":", 1)[0], 0)
+
+    def put(self, key: str, value: Any, generation: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Store an inventory.
+        :param key: The resource type.
+        :param value: The inventory.
+        :param generation: The generation of the inventory when loading it started. The inventory is not stored if it
+        has been invalidated since, as it may have been loaded before the change that invalidated it.
+        """
+        with self.lock:
+            if generation is not None and generation != self.current_generation(key):
+                return
+            self.entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, *keys: str) -> None:
+        """
+        Remove inventories from the cache, or every inventory if no keys are given. The pages of a resource type are
+        removed along with its full inventory.
+        :param keys: The resource types.
+        """
+        with self.lock:
+            for generation_key in keys or ("",):
+                self.generations[generation_key] = self.generations.get(generation_key, 0) + 1
+            if not keys:
+                self.entries.clear()
+            prefixes = tuple(f"{key}:" for key in keys)
+            for entry_key in [entry_key for entry_key in self.entries if entry_key in keys or entry_key.startswith(prefixes)]:
+                del self.entries[entry_key]
+
+
+########################################################################################################################
+# HELPERS
+########################################################################################################################
+T = TypeVar("T")
+
+
+def page_key(key: str, offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> str:
+    """
+    Get the cache key of a window of an inventory. The full, unfiltered inventory is stored under the resource type.
+    :param key: The resource type.
+    :param offset: The index of the first row in the window.
+    :param limit: The maximum number of rows in the window, or None for every remaining row.
+    :param filters: The podman filters applied to the inventory.
+    :return: The cache key.
+    """
+    if not offset and limit is None and not filters:
+        return key
+    filter_key = ",".join(f"{name}={value}" for name, value in sorted((filters or {}).items()))
+    return f"{key}:{offset}:{limit}:{filter_key}"
+
+
+def fetch_inventory(key: str, load: Callable[[], Tuple[T, bool]]) -> T:
+    """
+    Get an inventory from the cache, or load it if it is missing or stale. Inventories are only stored when the podman
+    call succeeded and the resource type was not invalidated while it was loading.
+    :param key: The resource type.
+    :param load: A function that runs the podman list command and returns the inventory and whether it succeeded.
+    :return: The inventory.
+    """
+    cache = CacheManager()
+    value = cache.get(key)
+    if value is None:
+        generation = cache.generation(key)
+        value, succeeded = load()
+        if succeeded:
+            cache.put(key, value, generation)
+    return value
+
+
+async def fetch_inventory_async(key: str, load: Callable[[], Awaitable[Tuple[T, bool]]]) -> T:
+    """
+    Get an inventory from the cache, or load it without blocking the event loop if it is missing or stale.
+    :param key: The resource type.
+    :param load: A function returning an awaitable that produces the inventory and whether it succeeded.
+    :return: The inventory.
+    """
+    cache = CacheManager()
+    value = cache.get(key)
+    if value is None:
+        generation = cache.generation(key)
+        value, succeeded = await load()
+        if succeeded:
+            cache.put(key, value, generation)
+    return value
+
+
+def invalidates(*keys: str) -> Callable:
+    """
+    Invalidate inventories when the decorated manager function returns a successful CompletedProcess. Works on both
+    regular and coroutine functions.
+    :param keys: The resource types changed by the function.
+    :return: The decorator.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                result = await function(*args, **kwargs)
+                if result.returncode == 0:
+                    CacheManager().invalidate(*keys)
+                return result
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                result = function(*args, **kwargs)
+                if result.returncode == 0:
+                    CacheManager().invalidate(*keys)
+                return result
+        return wrapper
+
+    return decorator
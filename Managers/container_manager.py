@@ -1,12 +1,48 @@
-import json
-from typing import Optional, List, Dict, Tuple
-
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from subprocess import CompletedProcess
+from typing import Optional, List, Dict, Tuple, Iterator, AsyncIterator, Sequence
+
+from Managers.backend_manager import BackendManager, SocketBackend, run_podman, run_podman_async
+from Managers.cache_manager import CONTAINERS, IMAGES, PODS, CacheManager, fetch_inventory, fetch_inventory_async, \
+    invalidates, page_key
 from Managers.log_manager import LogManager
-from Managers.system_manager import run_command, run_command_interactive
+from Managers.record_manager import Container
+from Managers.stream_manager import iter_inventory, aiter_inventory, load_inventory, load_inventory_async
+from Managers.system_manager import run_command_interactive
 
+# The number of seconds podman waits for a container to stop before killing it
+STOP_TIMEOUT = 10
 
-def create_container(name: str, image: str, network: Optional[str] = None, pod: Optional[str] = None, volume: Optional[str] = None, mount_path: Optional[str] = None, command: Optional[str] = None, detached: bool = True, interactive: bool = True, tty: bool = True, ports: Optional[List[Tuple[str, str]]] = None, env_vars: Optional[List[Tuple[str, str]]] = None):
+# The number of requests sent to the Podman service at once when acting on several containers
+BULK_CONCURRENCY = 8
+
+# The description of each bulk action in the log
+BULK_DESCRIPTIONS = {"start": "Start containers", "stop": "Stop containers", "restart": "Restart containers",
+                     "remove": "Remove containers"}
 
+
+def list_containers_command(limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Build the podman command that lists containers, letting podman do the filtering and limiting.
+    :param limit: The number of most recently created containers to list, or None for all of them.
+    :param filters: The podman filters to apply, such as {"status": "running"}.
+    :return: The podman command.
+    """
+    cmd = ["podman", "ps", "-a"]
+    cmd += ["--last", str(limit)] if limit is not None else []
+    cmd += [item for key, value in (filters or {}).items() for item in ("--filter", f"{key}={value}")]
+    cmd += ["--format", "json"]
+    return cmd
+
+
+def create_container_command(name: str, image: str, network: Optional[str] = None, pod: Optional[str] = None, volume: Optional[str] = None, mount_path: Optional[str] = None, command: Optional[str] = None, detached: bool = True, interactive: bool = True, tty: bool = True, ports: Optional[List[Tuple[str, str]]] = None, env_vars: Optional[List[Tuple[str, str]]] = None) -> List[str]:
+    """
+    Build the podman command that creates a container.
+    :return: The podman command.
+    """
     network = None if network and pod else network
 
     cmd = ["podman", "run", "--name", name]
@@ -27,7 +63,24 @@ def create_container(name: str, image: str, network: Optional[str] = None, pod:
 
     cmd.append(command) if command else None
 
-    result = run_command(cmd)
+    return cmd
+
+
+@invalidates(CONTAINERS, IMAGES, PODS)
+def create_container(name: str, image: str, network: Optional[str] = None, pod: Optional[str] = None, volume: Optional[str] = None, mount_path: Optional[str] = None, command: Optional[str] = None, detached: bool = True, interactive: bool = True, tty: bool = True, ports: Optional[List[Tuple[str, str]]] = None, env_vars: Optional[List[Tuple[str, str]]] = None):
+    cmd = create_container_command(name, image, network, pod, volume, mount_path, command, detached, interactive, tty, ports, env_vars)
+    result = run_podman(cmd)
+
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    return result
+
+
+@invalidates(CONTAINERS, IMAGES, PODS)
+async def create_container_async(name: str, image: str, network: Optional[str] = None, pod: Optional[str] = None, volume: Optional[str] = None, mount_path: Optional[str] = None, command: Optional[str] = None, detached: bool = True, interactive: bool = True, tty: bool = True, ports: Optional[List[Tuple[str, str]]] = None, env_vars: Optional[List[Tuple[str, str]]] = None):
+    cmd = create_container_command(name, image, network, pod, volume, mount_path, command, detached, interactive, tty, ports, env_vars)
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
@@ -35,57 +88,130 @@ def create_container(name: str, image: str, network: Optional[str] = None, pod:
     return result
 
 
-def list_containers() -> List[List[str]]:
+def iter_containers(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> Iterator[Container]:
+    """
+    Stream podman containers with their details, most recently created first, as the output of podman arrives.
+    :param offset: The index of the first container to list.
+    :param limit: The maximum number of containers to list, or None for every remaining container.
+    :param filters: The podman filters to apply.
+    :return: An iterator of containers.
+    """
+    # podman can only limit from the start of the list, so the window is fetched up to its end and skipped into
+    cmd = list_containers_command(None if limit is None else offset + limit, filters)
+    return iter_inventory(cmd, Container, offset, limit)
+
+
+def aiter_containers(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> AsyncIterator[Container]:
+    """
+    Stream podman containers with their details without blocking the event loop.
+    :param offset: The index of the first container to list.
+    :param limit: The maximum number of containers to list, or None for every remaining container.
+    :param filters: The podman filters to apply.
+    :return: An iterator of containers.
+    """
+    cmd = list_containers_command(None if limit is None else offset + limit, filters)
+    return aiter_inventory(cmd, Container, offset, limit)
+
+
+def list_containers(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[Container]:
     """
-    List all podman containers with their details.
-    :return: A list of containers with their details.
+    List podman containers with their details, most recently created first.
+    :param offset: The index of the first container to list.
+    :param limit: The maximum number of containers to list, or None for every remaining container.
+    :param filters: The podman filters to apply.
+    :return: A list of containers.
     """
-    cmd = ["podman", "ps", "-a", "--format", "json"]
+    cmd = list_containers_command(None if limit is None else offset + limit, filters)
+    return fetch_inventory(page_key(CONTAINERS, offset, limit, filters),
+                           partial(load_inventory, cmd, Container, offset, limit))
 
-    headers = ["CONTAINER ID", "IMAGE", "COMMAND", "CREATED", "STATUS", "PORTS", "NAMES"]
-    data = [headers]
 
-    result = run_command(cmd, capture_output=True, text=True)
+async def list_containers_async(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[Container]:
+    """
+    List podman containers with their details without blocking the event loop.
+    :param offset: The index of the first container to list.
+    :param limit: The maximum number of containers to list, or None for every remaining container.
+    :param filters: The podman filters to apply.
+    :return: A list of containers.
+    """
+    cmd = list_containers_command(None if limit is None else offset + limit, filters)
+    return await fetch_inventory_async(page_key(CONTAINERS, offset, limit, filters),
+                                       partial(load_inventory_async, cmd, Container, offset, limit))
 
-    if result.returncode == 0:
-        content = json.loads(result.stdout)
-        for container in content:
-            container_id = container.get("Id")[:12]  # Shortened ID
-            image = container.get("Image")
-            command = ' '.join(container.get("Command", [])) if container.get("Command") else ""
-            created = container.get("CreatedAt") or ""
-            status = container.get("Status") or ""
-            ports = ', '.join([f"{p['host_port']}->{p['container_port']}/{p['protocol']}" for p in (container.get("Ports") or [])])
-            names = ', '.join(container.get("Names", []))
 
-            data.append([container_id, image, command, created, status, ports, names])
+def find_container(container_id: str) -> Optional[Container]:
+    """
+    Look up a single container.
+    :param container_id: The ID of the container.
+    :return: The container, or None if it does not exist.
+    """
+    containers = list(iter_containers(filters={"id": container_id}))
+    return next((container for container in containers if container.key == container_id[:12]), None)
+
+
+async def find_container_async(container_id: str) -> Optional[Container]:
+    """
+    Look up a single container without blocking the event loop.
+    :param container_id: The ID of the container.
+    :return: The container, or None if it does not exist.
+    """
+    containers = [container async for container in aiter_containers(filters={"id": container_id})]
+    return next((container for container in containers if container.key == container_id[:12]), None)
+
+@invalidates(CONTAINERS, PODS)
+def start_container(name: str):
+    cmd = ['podman', 'start', name]
+    result = run_podman(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    return data
+    return result
 
-def start_container(name: str):
+@invalidates(CONTAINERS, PODS)
+async def start_container_async(name: str):
     cmd = ['podman', 'start', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
     return result
 
+@invalidates(CONTAINERS, PODS)
 def stop_container(name: str):
     cmd = ['podman', 'stop', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = run_podman(cmd)
+
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    return result
+
+@invalidates(CONTAINERS, PODS)
+async def stop_container_async(name: str):
+    cmd = ['podman', 'stop', name]
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
     return result
 
+@invalidates(CONTAINERS, PODS)
 def restart_container(name: str):
     cmd = ['podman', 'restart', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = run_podman(cmd)
+
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    return result
+
+@invalidates(CONTAINERS, PODS)
+async def restart_container_async(name: str):
+    cmd = ['podman', 'restart', name]
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
@@ -100,12 +226,118 @@ def exec_container_shell(name: str, shell: str = 'sh') -> None:
     cmd = ['podman', 'exec', '-it', name, shell]
     run_command_interactive(cmd)
 
-def remove_container(name: str):
-    stop_container(name)
-    cmd = ['podman', 'rm', name]
-    result = run_command(cmd, capture_output=True, text=True)
+@invalidates(CONTAINERS, PODS)
+def remove_container(name: str, timeout: int = STOP_TIMEOUT):
+    cmd = bulk_container_command('remove', [name], timeout)
+    result = run_podman(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    return result
\ No newline at end of file
+    return result
+
+@invalidates(CONTAINERS, PODS)
+async def remove_container_async(name: str, timeout: int = STOP_TIMEOUT):
+    cmd = bulk_container_command('remove', [name], timeout)
+    result = await run_podman_async(cmd)
+
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    return result
+
+
+def bulk_container_command(action: str, names: Sequence[str], timeout: int = STOP_TIMEOUT) -> List[str]:
+    """
+    Build a single podman command that applies an action to several containers. Removal forces running containers to
+    stop first, so that it takes one command rather than a stop and a remove.
+    :param action: One of 'start', 'stop', 'restart' or 'remove'.
+    :param names: The names or IDs of the containers.
+    :param timeout: The number of seconds to wait for each container to stop before killing it.
+    :return: The podman command.
+    """
+    match action:
+        case 'start':
+            cmd = ['podman', 'start']
+        case 'stop':
+            cmd = ['podman', 'stop', '-t', str(timeout)]
+        case 'restart':
+            cmd = ['podman', 'restart', '-t', str(timeout)]
+        case 'remove':
+            cmd = ['podman', 'rm', '-f', '-t', str(timeout)]
+        case _:
+            raise ValueError(f"Unknown container action: {action}")
+    return cmd + list(names)
+
+
+def split_bulk_result(result: CompletedProcess, names: Sequence[str]) -> List[Tuple[str, CompletedProcess]]:
+    """
+    Split the result of a bulk command into a result per container. podman carries on past containers it cannot act
+    on, printing the name of each container it did act on and an error line for each one it did not.
+    :param result: The result of the bulk command.
+    :param names: The containers given to the command.
+    :return: Each container and its result.
+    """
+    done = set(result.stdout.split())
+    errors = [line for line in result.stderr.splitlines() if line.strip()]
+    results = []
+    for name in names:
+        if result.returncode == 0 or name in done:
+            results.append((name, CompletedProcess(result.args, 0, stdout=f"{name}\n", stderr="")))
+        else:
+            error = next((line for line in errors if name in line), "\n".join(errors))
+            results.append((name, CompletedProcess(result.args, result.returncode, stdout="", stderr=error)))
+    return results
+
+
+def finish_bulk_action(action: str, results: List[Tuple[str, CompletedProcess]], started: float) -> List[Tuple[str, CompletedProcess]]:
+    if any(result.returncode == 0 for _, result in results):
+        CacheManager().invalidate(CONTAINERS, PODS)
+    LogManager().log_batch(BULK_DESCRIPTIONS[action], results, time.perf_counter() - started)
+    return results
+
+
+def run_bulk_action(action: str, names: Sequence[str], timeout: int = STOP_TIMEOUT) -> List[Tuple[str, CompletedProcess]]:
+    """
+    Start, stop, restart or remove several containers, logging the outcome as a single entry. The CLI acts on every
+    container in one command, while the Podman service is sent a bounded number of requests in parallel.
+    :param action: One of 'start', 'stop', 'restart' or 'remove'.
+    :param names: The names or IDs of the containers.
+    :param timeout: The number of seconds to wait for each container to stop before killing it.
+    :return: Each container and its result.
+    """
+    if not names:
+        return []
+    started = time.perf_counter()
+    if isinstance(BackendManager().backend, SocketBackend):
+        with ThreadPoolExecutor(max_workers=BULK_CONCURRENCY) as executor:
+            outcomes = executor.map(lambda name: run_podman(bulk_container_command(action, [name], timeout)), names)
+            results = list(zip(names, outcomes))
+    else:
+        results = split_bulk_result(run_podman(bulk_container_command(action, names, timeout)), names)
+    return finish_bulk_action(action, results, started)
+
+
+async def run_bulk_action_async(action: str, names: Sequence[str], timeout: int = STOP_TIMEOUT) -> List[Tuple[str, CompletedProcess]]:
+    """
+    Start, stop, restart or remove several containers without blocking the event loop, logging the outcome as a single
+    entry.
+    :param action: One of 'start', 'stop', 'restart' or 'remove'.
+    :param names: The names or IDs of the containers.
+    :param timeout: The number of seconds to wait for each container to stop before killing it.
+    :return: Each container and its result.
+    """
+    if not names:
+        return []
+    started = time.perf_counter()
+    if isinstance(BackendManager().backend, SocketBackend):
+        semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+        async def run_one(name: str) -> CompletedProcess:
+            async with semaphore:
+                return await run_podman_async(bulk_container_command(action, [name], timeout))
+
+        results = list(zip(names, await asyncio.gather(*(run_one(name) for name in names))))
+    else:
+        results = split_bulk_result(await run_podman_async(bulk_container_command(action, names, timeout)), names)
+    return finish_bulk_action(action, results, started)
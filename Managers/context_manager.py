@@ -0,0 +1,611 @@
+########################################################################################################################
+# context_manager.py
+# This module provides the content hash of an image build context. The hash covers the Containerfile or Dockerfile and
+# every file its COPY and ADD instructions and RUN bind mounts can reach, leaving out the files excluded by
+# .containerignore or .dockerignore, and the build arguments. Images are labelled with the hash of the context they
+# were built from, so that a build whose context has not changed can reuse the existing image instead of running again.
+# It also analyzes how large a context is, where its size comes from, and which paths could be ignored to make it
+# smaller.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import re
+import stat
+import threading
+import time
+from fnmatch import fnmatchcase
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+from Managers.file_manager import format_size
+from Managers.log_manager import LogManager
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The label holding the content hash of the context an image was built from
+CONTEXT_LABEL = "io.isopod.context-hash"
+
+# Changed whenever the way the hash is computed changes, so that images labelled by an older version are rebuilt
+HASH_VERSION = b"isopod-context-1"
+
+# The files podman reads the build instructions from, in order of preference
+BUILD_FILES = ("Containerfile", "Dockerfile")
+
+# The files listing paths to leave out of the context, in order of preference
+IGNORE_FILES = (".containerignore", ".dockerignore")
+
+# The number of bytes read from a file at a time while hashing it
+READ_SIZE = 1024 * 1024
+
+# A source of an ADD instruction that is fetched rather than read from the context
+REMOTE_SOURCE = re.compile(r"^([a-z][a-z0-9+.-]*://|git@)", re.IGNORECASE)
+
+# Mounts of a RUN instruction that provide files from outside the context, whose contents cannot be hashed
+UNHASHABLE_MOUNTS = ("secret", "ssh")
+
+# The number of threads listing directories at once while a context is analyzed
+SCAN_THREADS = 8
+
+# The number of files and of directories reported as the largest
+LARGEST_COUNT = 10
+
+# Directories that hold version control data, dependencies or build output, which rarely belong in a build context
+SUGGESTED_EXCLUSIONS = (".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache",
+                        ".pytest_cache", ".idea", ".vscode", "target")
+
+# A directory listing is only cached once its modification time is this many nanoseconds old, since a change made
+# within the resolution of the file system clock would not change the time again
+RACY_PERIOD = 2 * 10 ** 9
+
+
+########################################################################################################################
+# PATTERNS
+########################################################################################################################
+def compile_pattern(pattern: str) -> Pattern:
+    """
+    Compile a path pattern of an ignore file or a COPY source into a regular expression. A pattern matches a path
+    relative to the context and everything beneath it, '*' and '?' never cross a '/', and '**' matches any number of
+    directories.
+    :param pattern: The pattern, such as 'src/*.py' or '**/node_modules'.
+    :return: The compiled expression.
+    """
+    pattern = os.path.normpath(pattern.strip()).replace(os.sep, "/").lstrip("/")
+    expression = ""
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            expression += "(?:.*/)?"
+            index += 3
+        elif pattern.startswith("**", index):
+            expression += ".*"
+            index += 2
+        elif pattern[index] == "*":
+            expression += "[^/]*"
+            index += 1
+        elif pattern[index] == "?":
+            expression += "[^/]"
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 1:]:
+            end = pattern.index("]", index + 1)
+            expression += "[" + pattern[index + 1:end].replace("\\", "\\\\") + "]"
+            index = end + 1
+        else:
+            expression += re.escape(pattern[index])
+            index += 1
+    if pattern == ".":
+        expression = ".*"
+    return re.compile(f"{expression}(?:/.*)?")
+
+
+class IgnoreRules:
+    """
+    The patterns of a .containerignore or .dockerignore file. Patterns are applied in order and the last one matching a
+    path decides whether it is ignored, so a pattern starting with '!' brings back paths excluded before it.
+    """
+
+    def __init__(self, patterns: List[str]) -> None:
+        self.rules: List[Tuple[Pattern, bool]] = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            included = pattern.startswith("!")
+            self.rules.append((compile_pattern(pattern.lstrip("!")), included))
+
+    @property
+    def has_exceptions(self) -> bool:
+        """
+        Whether any pattern brings paths back, in which case an ignored directory may still contain included files.
+        """
+        return any(included for _, included in self.rules)
+
+    def ignored(self, path: str) -> bool:
+        """
+        Check whether a path is left out of the context.
+        :param path: The path, relative to the context and separated by '/'.
+        :return: True if the path is ignored.
+        """
+        ignored = False
+        for expression, included in self.rules:
+            if ignored == included and expression.fullmatch(path):
+                ignored = not included
+        return ignored
+
+
+def load_ignore_rules(context: Path) -> IgnoreRules:
+    """
+    Read the ignore file of a build context.
+    :param context: The directory of the build context.
+    :return: The rules, which ignore nothing if the context has no ignore file.
+    """
+    for name in IGNORE_FILES:
+        path = context / name
+        if path.is_file():
+            return IgnoreRules(path.read_text(errors="replace").splitlines())
+    return IgnoreRules([])
+
+
+########################################################################################################################
+# BUILD FILE
+########################################################################################################################
+def find_build_file(context: Path) -> Optional[Path]:
+    for name in BUILD_FILES:
+        path = context / name
+        if path.is_file():
+            return path
+    return None
+
+
+def iter_instructions(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Split a Containerfile into instructions, joining lines continued with a trailing backslash and dropping comments.
+    :param text: The contents of the file.
+    :return: An iterator of each instruction in upper case and its arguments.
+    """
+    current = ""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            continue
+        if stripped.endswith("\\"):
+            current += stripped[:-1] + " "
+            continue
+        current += stripped
+        if current.strip():
+            instruction, _, arguments = current.strip().partition(" ")
+            yield instruction.upper(), arguments.strip()
+        current = ""
+    if current.strip():
+        instruction, _, arguments = current.strip().partition(" ")
+        yield instruction.upper(), arguments.strip()
+
+
+def mounted_sources(arguments: str) -> Optional[List[str]]:
+    """
+    Find the paths of the context bind mounted by a RUN instruction, such as with
+    '--mount=type=bind,source=requirements.txt,target=/tmp/requirements.txt'.
+    :param arguments: The arguments of the instruction.
+    :return: The source paths, or None if a secret or SSH agent is mounted.
+    """
+    sources = []
+    words = arguments.split()
+    for index, word in enumerate(words):
+        if not word.startswith("--"):
+            break
+        if word == "--mount" and index + 1 < len(words):
+            specification = words[index + 1]
+        elif word.startswith("--mount="):
+            specification = word[len("--mount="):]
+        else:
+            continue
+        options = dict(option.partition("=")[::2] for option in specification.split(","))
+        mount_type = options.get("type", "bind")
+        if mount_type in UNHASHABLE_MOUNTS:
+            return None
+        # A mount from another stage or image does not read the context
+        if mount_type == "bind" and "from" not in options:
+            sources.append(options.get("source") or options.get("src") or ".")
+    return sources
+
+
+def copied_sources(text: str) -> Optional[List[str]]:
+    """
+    Find the paths of the context read by the COPY and ADD instructions of a Containerfile and bind mounted by its RUN
+    instructions.
+    :param text: The contents of the file.
+    :return: The source paths, which are ['.'] when a source cannot be resolved without running the build, such as one
+    naming a build argument, or None if an ADD instruction fetches a remote source or a RUN instruction mounts a secret,
+    whose contents cannot be hashed.
+    """
+    sources = []
+    for instruction, arguments in iter_instructions(text):
+        if instruction == "RUN":
+            mounted = mounted_sources(arguments)
+            if mounted is None:
+                return None
+            if any("$" in source for source in mounted):
+                return ["."]
+            sources += mounted
+            continue
+        if instruction not in ("COPY", "ADD"):
+            continue
+        if arguments.startswith("["):
+            try:
+                words = json.loads(arguments)
+            except ValueError:
+                return ["."]
+        else:
+            words = arguments.split()
+        flags = [word for word in words if word.startswith("--")]
+        words = [word for word in words if not word.startswith("--")]
+        # Files copied from another stage or image are not part of the context
+        if any(flag.startswith("--from") for flag in flags):
+            continue
+        for source in words[:-1]:
+            if REMOTE_SOURCE.match(source):
+                return None
+            if "$" in source or source.startswith("<<"):
+                return ["."]
+            sources.append(source)
+    return sources
+
+
+########################################################################################################################
+# HASHING
+########################################################################################################################
+def iter_context_files(context: Path, rules: IgnoreRules) -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    Walk the files of a build context that are not ignored, in a stable order.
+    :param context: The directory of the build context.
+    :param rules: The ignore rules of the context.
+    :return: An iterator of the path of each file relative to the context and its directory entry.
+    """
+    # Ignored directories are skipped as a whole unless an exception could bring back something inside them
+    prune = not rules.has_exceptions
+    stack = [("", str(context))]
+    while stack:
+        prefix, directory = stack.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            relative = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not (prune and rules.ignored(relative)):
+                    subdirectories.append((relative + "/", entry.path))
+            elif not rules.ignored(relative):
+                yield relative, entry
+        stack.extend(reversed(subdirectories))
+
+
+def hash_file(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def hash_context(context: Path, build_args: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """
+    Compute the content hash of a build context. Only the files reached by a COPY or ADD source or a RUN bind mount
+    are hashed, so editing anything else in the directory does not count as a change.
+    :param context: The directory of the build context.
+    :param build_args: The build arguments passed to podman, which are part of the hash.
+    :return: The hexadecimal SHA-256 hash, or None if the context has no build file, fetches remote sources or mounts
+    secrets.
+    """
+    build_file = find_build_file(context)
+    if build_file is None:
+        return None
+    text = build_file.read_text(errors="replace")
+    sources = copied_sources(text)
+    if sources is None:
+        return None
+
+    digest = hashlib.sha256(HASH_VERSION)
+    digest.update(b"\0" + build_file.name.encode() + b"\0" + text.encode())
+    if build_args:
+        digest.update(b"\0" + json.dumps(sorted(build_args.items())).encode())
+    expressions = [compile_pattern(source) for source in sources]
+    for relative, entry in iter_context_files(context, load_ignore_rules(context)):
+        if not any(expression.fullmatch(relative) for expression in expressions):
+            continue
+        try:
+            if entry.is_symlink():
+                content = os.readlink(entry.path).encode()
+                mode = 0o120000
+            else:
+                content = hash_file(entry.path)
+                mode = stat.S_IMODE(entry.stat().st_mode) & 0o111
+        except OSError:
+            # A file that cannot be read would fail the build, which is left to podman to report
+            return None
+        digest.update(b"\0" + relative.encode() + b"\0" + str(mode).encode() + b"\0" + content)
+    return digest.hexdigest()
+
+
+########################################################################################################################
+# ANALYSIS
+########################################################################################################################
+def count_files(count: int) -> str:
+    return f"{count} file" if count == 1 else f"{count} files"
+
+
+class DirectoryListing:
+    """
+    The files and subdirectories of a directory, as of its modification time.
+    """
+
+    __slots__ = ("mtime", "files", "directories")
+
+    def __init__(self, mtime: int, files: List[Tuple[str, int]], directories: List[str]):
+        self.mtime = mtime
+        self.files = files
+        self.directories = directories
+
+
+class ContextAnalysis:
+    """
+    Where the size of a build context comes from.
+    """
+
+    def __init__(self, context: Path):
+        self.context = context
+        self.total_size = 0
+        self.total_files = 0
+        self.ignored_size = 0
+        self.ignored_files = 0
+        # The path, size and whether it is ignored of each of the largest files
+        self.largest_files: List[Tuple[str, int, bool]] = []
+        # The path, size and size sent to the builder of each of the largest directories
+        self.largest_directories: List[Tuple[str, int, int]] = []
+        # The ignore pattern, the size it would save and why it is suggested
+        self.suggestions: List[Tuple[str, int, str]] = []
+        self.directories_scanned = 0
+        self.directories_cached = 0
+        self.elapsed = 0.0
+
+    @property
+    def sent_size(self) -> int:
+        return self.total_size - self.ignored_size
+
+    @property
+    def suggested_size(self) -> int:
+        return sum(size for _, size, _ in self.suggestions)
+
+    def summary(self) -> str:
+        text = (f"{format_size(self.total_size)} in {count_files(self.total_files)}, {format_size(self.sent_size)} "
+                f"sent to the builder")
+        if self.ignored_files:
+            text += (f", {format_size(self.ignored_size)} in {count_files(self.ignored_files)} left out by the ignore "
+                     f"rules")
+        if self.suggestions:
+            text += f". Ignoring the suggested paths would save a further {format_size(self.suggested_size)}"
+        return text
+
+
+class ContextAnalyzer:
+    """
+    Analyzes build contexts. The listing of every directory is cached by its modification time, so analyzing a context
+    again only lists the directories in which an entry was added, removed or renamed. A file rewritten in place keeps
+    the size it had when its directory was last listed.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.listings = {}
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    def list_directory(self, path: str) -> Tuple[Optional[DirectoryListing], bool]:
+        """
+        List a directory, reusing the cached listing if the directory has not been modified since.
+        :param path: The path of the directory.
+        :return: The listing, or None if the directory cannot be read, and whether it came from the cache.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            listing = self.listings.get(path)
+            if listing is not None and listing.mtime == mtime:
+                return listing, True
+            files, directories = [], []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.name)
+                        else:
+                            files.append((entry.name, entry.stat(follow_symlinks=False).st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            return None, False
+        listing = DirectoryListing(mtime, files, directories)
+        if time.time_ns() - mtime > RACY_PERIOD:
+            self.listings[path] = listing
+        return listing, False
+
+    def scan(self, context: Path, rules: IgnoreRules, analysis: ContextAnalysis) -> List[Tuple[str, int, bool]]:
+        """
+        List every file of a context, one level of directories at a time with the levels listed in parallel.
+        :param context: The directory of the build context.
+        :param rules: The ignore rules of the context.
+        :param analysis: The analysis, which records how many directories were listed.
+        :return: The path relative to the context, size and whether it is ignored of every file.
+        """
+        files = []
+        visited = set()
+        prune = not rules.has_exceptions
+        # The relative prefix, path and whether an ignored directory contains it, for each directory of a level
+        level = [("", str(context), False)]
+        with ThreadPoolExecutor(max_workers=SCAN_THREADS) as executor:
+            while level:
+                next_level = []
+                for (prefix, path, ignored), (listing, cached) in zip(
+                        level, executor.map(self.list_directory, [path for _, path, _ in level])):
+                    analysis.directories_scanned += 1
+                    analysis.directories_cached += cached
+                    if listing is None:
+                        continue
+                    visited.add(path)
+                    for name, size in listing.files:
+                        files.append((prefix + name, size, (ignored and prune) or rules.ignored(prefix + name)))
+                    for name in listing.directories:
+                        relative = prefix + name
+                        next_level.append((relative + "/", os.path.join(path, name),
+                                           (ignored and prune) or rules.ignored(relative)))
+                level = next_level
+
+        # Listings of directories that no longer exist are dropped
+        root = os.path.join(str(context), "")
+        with self.lock:
+            for path in [path for path in self.listings if path.startswith(root) and path not in visited]:
+                del self.listings[path]
+        return files
+
+    def analyze(self, context: Path) -> ContextAnalysis:
+        """
+        Measure a build context and suggest paths to ignore.
+        :param context: The directory of the build context.
+        :return: The analysis.
+        """
+        started = time.perf_counter()
+        analysis = ContextAnalysis(context)
+        rules = load_ignore_rules(context)
+        files = self.scan(context, rules, analysis)
+
+        directory_sizes: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for relative, size, ignored in files:
+            analysis.total_size += size
+            analysis.total_files += 1
+            if ignored:
+                analysis.ignored_size += size
+                analysis.ignored_files += 1
+            parts = relative.split("/")[:-1]
+            for depth in range(1, len(parts) + 1):
+                sizes = directory_sizes["/".join(parts[:depth])]
+                sizes[0] += size
+                if not ignored:
+                    sizes[1] += size
+
+        analysis.largest_files = heapq.nlargest(LARGEST_COUNT, files, key=lambda file: file[1])
+        analysis.largest_directories = heapq.nlargest(
+            LARGEST_COUNT, ((path, total, sent) for path, (total, sent) in directory_sizes.items()),
+            key=lambda directory: directory[1])
+        analysis.suggestions = suggest_exclusions(context, files, directory_sizes)
+        analysis.elapsed = time.perf_counter() - started
+        LogManager().add_log(f"Analyzed build context {context} in {analysis.elapsed:.2f} s, "
+                             f"{analysis.directories_cached} of {analysis.directories_scanned} directories cached: "
+                             f"{analysis.summary()}")
+        return analysis
+
+
+def copies_whole_context(source: str) -> bool:
+    return os.path.normpath(source).replace(os.sep, "/").strip("/") in ("", ".", "*", "**")
+
+
+def names_path(source: str, parts: List[str]) -> bool:
+    """
+    Check whether a COPY or ADD source names a directory or something inside it, rather than only a directory above it.
+    :param source: The source, such as 'src/*.py'.
+    :param parts: The components of the path of the directory relative to the context.
+    :return: True if the source reaches into the directory.
+    """
+    source_parts = os.path.normpath(source).replace(os.sep, "/").strip("/").split("/")
+    if "**" in source_parts[:len(parts)]:
+        return True
+    return len(source_parts) >= len(parts) and all(fnmatchcase(part, pattern)
+                                                   for pattern, part in zip(source_parts, parts))
+
+
+def suggest_exclusions(context: Path, files: List[Tuple[str, int, bool]],
+                       directory_sizes: Dict[str, List[int]]) -> List[Tuple[str, int, str]]:
+    """
+    Suggest ignore patterns for the paths of a context that are sent to the builder but not needed by it. These are
+    the top level entries that no COPY or ADD instruction reads, and directories such as .git or node_modules unless an
+    instruction names them or something inside them.
+    :param context: The directory of the build context.
+    :param files: The path, size and whether it is ignored of every file.
+    :param directory_sizes: The total size and size sent to the builder of every directory.
+    :return: The pattern, the size it would save and the reason of each suggestion, largest first.
+    """
+    build_file = find_build_file(context)
+    sources = copied_sources(build_file.read_text(errors="replace")) if build_file else None
+    # Sources such as '.' or '*' copy the whole context, and only the ones naming particular paths narrow it down
+    named_sources = [source for source in sources or () if not copies_whole_context(source)]
+    named = [compile_pattern(source) for source in named_sources]
+    keep = set(IGNORE_FILES) | {build_file.name if build_file else ""}
+
+    def copied(relative: str) -> bool:
+        return any(expression.fullmatch(relative) for expression in named)
+
+    suggestions = []
+    unused = set()
+    if sources is not None and len(named_sources) == len(sources):
+        top_level: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for relative, size, ignored in files:
+            if not ignored:
+                entry = top_level[relative.split("/", 1)[0]]
+                entry[0] += size
+                entry[1] |= copied(relative)
+        for name, (size, used) in top_level.items():
+            if not used and size and name not in keep:
+                unused.add(name)
+                suggestions.append((name, size, "not read by any COPY or ADD instruction"))
+
+    savings: Dict[str, int] = defaultdict(int)
+    needed = set()
+    for path, (_, sent) in directory_sizes.items():
+        parts = path.split("/")
+        if parts[-1] in SUGGESTED_EXCLUSIONS and sent and parts[0] not in unused and \
+                not any(part in SUGGESTED_EXCLUSIONS for part in parts[:-1]):
+            savings[parts[-1]] += sent
+            if any(names_path(source, parts) for source in named_sources):
+                needed.add(parts[-1])
+    for name, size in savings.items():
+        if name not in needed:
+            suggestions.append((f"**/{name}", size, "usually not needed to build an image"))
+    return sorted(suggestions, key=lambda suggestion: suggestion[1], reverse=True)
+
+
+def add_ignore_patterns(context: Path, patterns: Sequence[str]) -> Path:
+    """
+    Append patterns to the ignore file of a context, creating a .containerignore file if it has none.
+    :param context: The directory of the build context.
+    :param patterns: The patterns, of which those already in the file are skipped.
+    :return: The path of the ignore file.
+    """
+    path = next((context / name for name in IGNORE_FILES if (context / name).is_file()), context / IGNORE_FILES[0])
+    lines = path.read_text(errors="replace").splitlines() if path.is_file() else []
+    added = [pattern for pattern in patterns if pattern not in lines]
+    if added:
+        with open(path, "a") as file:
+            if lines and not path.read_text(errors="replace").endswith("\n"):
+                file.write("\n")
+            file.write("".join(f"{pattern}\n" for pattern in added))
+    return path
+
+
+async def analyze_context_async(context: Path) -> ContextAnalysis:
+    return await asyncio.to_thread(ContextAnalyzer().analyze, context)
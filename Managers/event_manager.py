@@ -0,0 +1,241 @@
+########################################################################################################################
+# event_manager.py
+# This module provides a subscriber to the Podman event stream that keeps the cache and the active screen up to date.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import json
+import subprocess
+from typing import Any, AsyncIterator, Dict, Optional
+
+from textual.app import App
+from textual.message import Message
+
+from Managers.backend_manager import BackendManager, SocketBackend, LIBPOD_PREFIX
+from Managers.cache_manager import CacheManager, CONTAINERS, IMAGES, NETWORKS, PODS, VOLUMES
+from Managers.container_manager import find_container_async
+from Managers.image_manager import find_image_async
+from Managers.network_manager import find_network_async
+from Managers.pod_manager import find_pod_async
+from Managers.record_manager import Record
+from Managers.volume_manager import find_volume_async
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The command that streams events as one JSON object per line
+EVENTS_COMMAND = ["podman", "events", "--format", "json",
+                  "--filter", "type=container", "--filter", "type=image", "--filter", "type=network",
+                  "--filter", "type=pod", "--filter", "type=volume"]
+
+# The cached inventories affected by each type of event
+INVALIDATED_INVENTORIES = {
+    "container": (CONTAINERS, PODS),
+    "image": (IMAGES,),
+    "network": (NETWORKS,),
+    "pod": (PODS, CONTAINERS),
+    "volume": (VOLUMES,),
+}
+
+# Actions that do not change anything shown in a table
+IGNORED_ACTIONS = {"exec", "exec_died", "health_status", "attach", "mount", "unmount", "sync", "export",
+                   "connect", "disconnect"}
+
+# The number of seconds to wait before reconnecting to the event stream
+RECONNECT_DELAY = 5.0
+
+
+########################################################################################################################
+# MESSAGES
+########################################################################################################################
+class PodmanEvent(Message):
+    """
+    Posted to the active screen when a Podman resource changes.
+    """
+
+    def __init__(self, resource: str, action: str, resource_id: str, name: str) -> None:
+        super().__init__()
+        self.resource = resource
+        self.action = action
+        self.resource_id = resource_id
+        self.name = name
+
+    @property
+    def key(self) -> str:
+        """
+        The key of the table row showing the resource, which is the name for volumes and the short ID otherwise.
+        """
+        return self.name if self.resource == "volume" else self.resource_id[:12]
+
+
+def parse_event(raw: Dict[str, Any]) -> Optional[PodmanEvent]:
+    """
+    Convert an event from either the CLI or the REST API into a message.
+    :param raw: The decoded JSON event.
+    :return: The message, or None if the event does not affect any table.
+    """
+    # The CLI uses 'ID', 'Name' and 'Status', while the REST API uses Docker's 'Actor' and 'Action'
+    actor = raw.get("Actor") or {}
+    resource = (raw.get("Type") or "").lower()
+    action = raw.get("Status") or raw.get("Action") or raw.get("status") or ""
+    resource_id = raw.get("ID") or actor.get("ID") or raw.get("id") or ""
+    name = raw.get("Name") or (actor.get("Attributes") or {}).get("name") or ""
+
+    if resource not in INVALIDATED_INVENTORIES or action in IGNORED_ACTIONS:
+        return None
+    # Volume events are identified by name, which the REST API reports as the actor ID
+    if resource == "volume":
+        name = name or resource_id
+    if not (name if resource == "volume" else resource_id):
+        return None
+    return PodmanEvent(resource, action, resource_id, name)
+
+
+async def find_event_record(event: PodmanEvent) -> Optional[Record]:
+    """
+    Fetch the current record of the resource an event refers to.
+    :param event: The event.
+    :return: The record, or None if the resource no longer exists.
+    """
+    if event.action == "remove":
+        return None
+
+    match event.resource:
+        case "container":
+            return await find_container_async(event.resource_id)
+        case "image":
+            return await find_image_async(event.resource_id)
+        case "network":
+            return await find_network_async(event.resource_id)
+        case "pod":
+            return await find_pod_async(event.resource_id)
+        case "volume":
+            return await find_volume_async(event.name)
+    return None
+
+
+########################################################################################################################
+# STREAMS
+########################################################################################################################
+async def stream_cli_events() -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream events from a long-lived 'podman events' process.
+    :return: An iterator of decoded events.
+    """
+    process = await asyncio.create_subprocess_exec(*EVENTS_COMMAND, stdout=subprocess.PIPE,
+                                                   stderr=subprocess.DEVNULL)
+    try:
+        while line := await process.stdout.readline():
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def stream_socket_events(socket_path: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream events from the libpod '/events' endpoint over the Unix socket.
+    :param socket_path: The path to the Podman service socket.
+    :return: An iterator of decoded events.
+    """
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write(f"GET {LIBPOD_PREFIX}/events?stream=true HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+
+        status = await reader.readline()
+        if b" 200 " not in status:
+            return
+
+        chunked = False
+        while (header := await reader.readline()) not in (b"\r\n", b""):
+            if header.lower().startswith(b"transfer-encoding:") and b"chunked" in header.lower():
+                chunked = True
+
+        buffer = b""
+        while True:
+            if chunked:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    return
+                data = (await reader.readexactly(size + 2))[:-2]
+            else:
+                data = await reader.read(65536)
+                if not data:
+                    return
+
+            # Events are separated by newlines but may be split across chunks
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        writer.close()
+
+
+def stream_events() -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream events from the selected backend.
+    :return: An iterator of decoded events.
+    """
+    backend = BackendManager().backend
+    if isinstance(backend, SocketBackend):
+        return stream_socket_events(backend.socket_path)
+    return stream_cli_events()
+
+
+########################################################################################################################
+# EVENT MANAGER
+########################################################################################################################
+class EventManager:
+    """
+    Consumes the Podman event stream for the lifetime of the application. Every event invalidates the cached
+    inventories it affects and is posted to the active screen as a PodmanEvent message.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.app = None
+        return cls._instance
+
+    def start(self, app: App) -> None:
+        """
+        Start consuming events in a background worker.
+        :param app: The application to post messages to.
+        """
+        self.app = app
+        app.run_worker(self.consume(), name="podman_events", group="podman_events", exclusive=True,
+                       exit_on_error=False)
+
+    async def consume(self) -> None:
+        while True:
+            try:
+                async for raw in stream_events():
+                    self.dispatch(raw)
+            except FileNotFoundError:
+                # podman is not installed, so there are no events to follow
+                return
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                pass
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def dispatch(self, raw: Dict[str, Any]) -> None:
+        event = parse_event(raw)
+        if event is None:
+            return
+
+        CacheManager().invalidate(*INVALIDATED_INVENTORIES[event.resource])
+        self.app.screen.post_message(event)
@@ -25,6 +25,78 @@ def delete_directory_contents(path: Path) -> None:
         elif item.is_dir():
             shutil.rmtree(item)
 
+def directory_size(path: Path) -> int:
+    """
+    Add up the size of every file beneath a directory, without following symbolic links.
+    :param path: The directory.
+    :return: The size in bytes, or 0 if the directory does not exist.
+    """
+    total = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+    return total
+
+def format_size(size: int) -> str:
+    """
+    Format a number of bytes for display, such as '1.5 MB'.
+    :param size: The number of bytes.
+    :return: The formatted size.
+    """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+def remove_tree(path: str) -> int:
+    """
+    Delete a file or a directory and everything beneath it, walking it with os.scandir. Unlike shutil.rmtree, the space
+    freed is reported and entries that cannot be removed are left behind rather than stopping the deletion.
+    :param path: The file or directory.
+    :return: The number of bytes freed.
+    """
+    freed = 0
+    # Directories are removed after their contents, in the reverse of the order they were listed
+    directories = []
+    stack = [path]
+    if not os.path.isdir(path) or os.path.islink(path):
+        stack = []
+        try:
+            freed += os.lstat(path).st_size
+            os.unlink(path)
+        except OSError:
+            pass
+    while stack:
+        directory = stack.pop()
+        directories.append(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            freed += entry.stat(follow_symlinks=False).st_size
+                            os.unlink(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    for directory in reversed(directories):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+    return freed
+
 def create_temp_directory() -> Path:
     """
     Generate a temporary directory with a unique id.
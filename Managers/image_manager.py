@@ -9,73 +9,158 @@
 ########################################################################################################################
 # IMPORTS
 ########################################################################################################################
+import asyncio
+import hashlib
 import json
+import os
 import pprint
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import List
-import requests
+from typing import Any, Dict, List, Optional, Iterator, AsyncIterator, Tuple
+from urllib.parse import urlencode
 from Managers.log_manager import LogManager
-from Managers.system_manager import run_command
+from Managers.backend_manager import run_podman, run_podman_async
+from Managers.context_manager import CONTEXT_LABEL, hash_context
+from Managers.cache_manager import IMAGES, fetch_inventory, fetch_inventory_async, invalidates, page_key
+from Managers.record_manager import Image
+from Managers.stream_manager import iter_inventory, aiter_inventory, load_inventory, load_inventory_async
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The Docker Hub API, unless overridden by ISOPOD_REGISTRY_URL
+DOCKER_HUB_URL = "https://hub.docker.com"
+
+# The number of seconds to wait for a connection to the registry and for each read from it
+REGISTRY_TIMEOUT = (3.05, 10)
+
+# The number of seconds a registry response is used without asking the registry whether it changed, unless overridden
+# by ISOPOD_REGISTRY_TTL
+REGISTRY_TTL = 300
+
+# The number of registry responses kept in memory
+REGISTRY_MEMORY_ENTRIES = 256
+
+# The number of connections kept open to the registry
+REGISTRY_POOL_SIZE = 8
 
 
 ########################################################################################################################
 # LOCAL IMAGE FUNCTIONS
 ########################################################################################################################
-def list_images() -> List[List[str]]:
+def list_images_command(filters: Optional[Dict[str, str]] = None) -> List[str]:
     """
-    List all images stored on the system.
-    :return: A list of images with their details.
+    Build the podman command that lists images, letting podman do the filtering.
+    :param filters: The podman filters to apply, such as {"dangling": "true"}.
+    :return: The podman command.
     """
-    # The command to list all images in the system in JSON format
-    cmd = ["podman", "images", "--format", "json"]
+    cmd = ["podman", "images"]
+    cmd += [item for key, value in (filters or {}).items() for item in ("--filter", f"{key}={value}")]
+    cmd += ["--format", "json"]
+    return cmd
 
-    # The headers for the table
-    headers = ["Repository", "Tag", "Image ID", "Created", "Size"]
-    data = [headers]
 
-    # Run the command and capture the output
-    result = run_command(cmd, capture_output=True, text=True)
-    # If the command was successful, parse the JSON output
-    if result.returncode == 0:
-        # The JSON output is stored in result.stdout
-        content = json.loads(result.stdout)
-        # Iterate through the images and extract the relevant information
-        for image in content:
-            # Extract the repository, tag, and ID
-            if len(image.get("Names", [])) > 0:
-                repository, tag = image["Names"][0].split(":")
-            else:
-                repository, tag = "Unknown", "Unknown"
-            img_id = image["Id"][:12]
-            # Parse the creation date
-            created = datetime.fromtimestamp(
-                image["Created"], tz=timezone.utc
-            ).strftime("%Y-%m-%d")
-            # Convert the size from bytes to MB
-            size = f"{round(image['Size'] / (1024 ** 2), 2)} MB"
-            # Append the image details to the data list
-            data.append([repository, tag, img_id, created, size])
+def iter_images(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> Iterator[Image]:
+    """
+    Stream the images stored on the system as the output of podman arrives.
+    :param offset: The index of the first image to list.
+    :param limit: The maximum number of images to list, or None for every remaining image.
+    :param filters: The podman filters to apply.
+    :return: An iterator of images.
+    """
+    return iter_inventory(list_images_command(filters), Image, offset, limit)
+
+
+def aiter_images(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> AsyncIterator[Image]:
+    """
+    Stream the images stored on the system without blocking the event loop.
+    :param offset: The index of the first image to list.
+    :param limit: The maximum number of images to list, or None for every remaining image.
+    :param filters: The podman filters to apply.
+    :return: An iterator of images.
+    """
+    return aiter_inventory(list_images_command(filters), Image, offset, limit)
+
+
+def list_images(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[Image]:
+    """
+    List images stored on the system.
+    :param offset: The index of the first image to list.
+    :param limit: The maximum number of images to list, or None for every remaining image.
+    :param filters: The podman filters to apply.
+    :return: A list of images.
+    """
+    return fetch_inventory(page_key(IMAGES, offset, limit, filters),
+                           partial(load_inventory, list_images_command(filters), Image, offset, limit))
+
+
+async def list_images_async(offset: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[Image]:
+    """
+    List images stored on the system without blocking the event loop.
+    :param offset: The index of the first image to list.
+    :param limit: The maximum number of images to list, or None for every remaining image.
+    :param filters: The podman filters to apply.
+    :return: A list of images.
+    """
+    return await fetch_inventory_async(page_key(IMAGES, offset, limit, filters),
+                                       partial(load_inventory_async, list_images_command(filters), Image, offset, limit))
+
+
+def find_image(img_id: str) -> Optional[Image]:
+    """
+    Look up a single image.
+    :param img_id: The ID of the image.
+    :return: The image, or None if it does not exist.
+    """
+    images = list(iter_images(filters={"id": img_id}))
+    return next((image for image in images if image.key == img_id[:12]), None)
+
+
+async def find_image_async(img_id: str) -> Optional[Image]:
+    """
+    Look up a single image without blocking the event loop.
+    :param img_id: The ID of the image.
+    :return: The image, or None if it does not exist.
+    """
+    images = [image async for image in aiter_images(filters={"id": img_id})]
+    return next((image for image in images if image.key == img_id[:12]), None)
+
+
+@invalidates(IMAGES)
+def remove_image(img_id: str):
+    """
+    Remove an image from the system if it is not in use.
+    :param img_id: The ID of the image to remove.
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    # The command to remove the image
+    result = run_podman(["podman", "image", "rm", img_id])
 
     # Log the operation
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    # Return the data
-    return data
+    # Return the result
+    return result
 
 
-def remove_image(img_id: str):
+@invalidates(IMAGES)
+async def remove_image_async(img_id: str):
     """
-    Remove an image from the system if it is not in use.
+    Remove an image from the system if it is not in use, without blocking the event loop.
     :param img_id: The ID of the image to remove.
     :return: A CompletedProcess object containing the result of the command.
     """
     # The command to remove the image
-    result = run_command(
-        ["podman", "image", "rm", img_id], capture_output=True, text=True
-    )
+    result = await run_podman_async(["podman", "image", "rm", img_id])
 
     # Log the operation
     log_manager = LogManager()
@@ -85,76 +170,311 @@ def remove_image(img_id: str):
     return result
 
 
+########################################################################################################################
+# REGISTRY CLIENT
+########################################################################################################################
+def default_registry_cache() -> Path:
+    """
+    Determine the directory registry responses are cached in, which is ISOPOD_REGISTRY_CACHE if it is set.
+    :return: The directory.
+    """
+    if os.environ.get("ISOPOD_REGISTRY_CACHE"):
+        return Path(os.environ["ISOPOD_REGISTRY_CACHE"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")
+    return Path(cache_home).joinpath("isopod", "registry")
+
+
+class CachedResponse:
+    """
+    A decoded registry response, with the entity tag used to ask the registry whether it has changed.
+    """
+
+    __slots__ = ("data", "etag", "fetched")
+
+    def __init__(self, data: Any, etag: Optional[str], fetched: float):
+        self.data = data
+        self.etag = etag
+        self.fetched = fetched
+
+
+class RegistryClient:
+    """
+    A client for the Docker Hub API. Connections are pooled in a shared session and every response is cached, in
+    memory and on disk, for a fixed time. Expired responses are revalidated with their entity tag, and are still served
+    if the registry cannot be reached.
+    """
+
+    def __init__(self, base_url: str = DOCKER_HUB_URL, cache_dir: Optional[Path] = None, ttl: float = REGISTRY_TTL,
+                 timeout: Tuple[float, float] = REGISTRY_TIMEOUT, memory_entries: int = REGISTRY_MEMORY_ENTRIES):
+        """
+        :param base_url: The root of the API, which tests may point at a local server.
+        :param cache_dir: The directory responses are persisted in, or None to only cache them in memory.
+        :param ttl: The number of seconds a response is used before it is revalidated.
+        :param timeout: The connect and read timeouts in seconds.
+        :param memory_entries: The number of responses kept in memory, least recently used first to go.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.memory_entries = memory_entries
+        self.memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            # requests is slow to import and only needed to contact the registry, so it is imported on first use
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=REGISTRY_POOL_SIZE, pool_maxsize=REGISTRY_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return f"{self.base_url}{path}" + (f"?{query}" if query else "")
+
+    def cache_path(self, url: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir.joinpath(hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """
+        Find the cached response for a URL, in memory or else on disk.
+        :param url: The URL, including its query string.
+        :return: The response, or None if it has never been fetched.
+        """
+        with self.lock:
+            entry = self.memory.get(url)
+            if entry is not None:
+                self.memory.move_to_end(url)
+                return entry
+
+        path = self.cache_path(url)
+        if path is None:
+            return None
+        try:
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            entry = CachedResponse(stored["data"], stored.get("etag"), stored["fetched"])
+        except (OSError, ValueError, KeyError):
+            return None
+        self.remember(url, entry)
+        return entry
+
+    def remember(self, url: str, entry: CachedResponse) -> None:
+        with self.lock:
+            self.memory[url] = entry
+            self.memory.move_to_end(url)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def store(self, url: str, entry: CachedResponse) -> None:
+        """
+        Cache a response in memory and on disk. A cache that cannot be written only costs a later request.
+        :param url: The URL, including its query string.
+        :param entry: The response.
+        """
+        self.remember(url, entry)
+        path = self.cache_path(url)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+            temporary.write_text(json.dumps({"url": url, "etag": entry.etag, "fetched": entry.fetched,
+                                             "data": entry.data}), encoding="utf-8")
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Get a JSON document from the registry, using the cache where possible.
+        :param path: The path of the document, such as '/v2/repositories/library/'.
+        :param params: The query parameters.
+        :return: The decoded document.
+        """
+        return self.fetch(self.url(path, params))
+
+    def fetch(self, url: str) -> Any:
+        """
+        Get a JSON document from the registry by its full URL, such as the next link of a page, using the cache where
+        possible.
+        :param url: The URL, including its query string.
+        :return: The decoded document.
+        """
+        import requests
+
+        entry = self.lookup(url)
+        if entry is not None and time.time() - entry.fetched < self.ttl:
+            return entry.data
+
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            # Offline, so the last known response is better than none
+            if entry is not None:
+                return entry.data
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            entry = CachedResponse(entry.data, response.headers.get("ETag", entry.etag), time.time())
+        else:
+            response.raise_for_status()
+            entry = CachedResponse(response.json(), response.headers.get("ETag"), time.time())
+        self.store(url, entry)
+        return entry.data
+
+    def clear(self) -> None:
+        """
+        Forget every cached response, in memory and on disk.
+        """
+        with self.lock:
+            self.memory.clear()
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+_registry_client: Optional[RegistryClient] = None
+
+
+def get_registry_client() -> RegistryClient:
+    """
+    Get the client shared by the registry functions, creating it from the environment on first use.
+    :return: The client.
+    """
+    global _registry_client
+    if _registry_client is None:
+        _registry_client = RegistryClient(os.environ.get("ISOPOD_REGISTRY_URL", DOCKER_HUB_URL),
+                                          default_registry_cache(),
+                                          float(os.environ.get("ISOPOD_REGISTRY_TTL", REGISTRY_TTL)))
+    return _registry_client
+
+
+def set_registry_client(client: RegistryClient) -> None:
+    global _registry_client
+    _registry_client = client
+
+
 ########################################################################################################################
 # REGISTRY FUNCTIONS
 ########################################################################################################################
+# The headers of the tables of repositories and tags
+REPOSITORY_HEADERS = ["Repository", "Official", "Pull Count", "Star Count", "Description"]
+TAG_HEADERS = ["Repository", "Tag", "Date Created"]
+
+# The largest page Docker Hub returns
+HUB_PAGE_SIZE = 100
+
+
+def iter_docker_hub_pages(path: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Walk every page of a Docker Hub listing by following its next links. While a page is being consumed the following
+    one is already being fetched on a background thread, so a reader that keeps up never waits on the network.
+    :param path: The path of the first page, such as '/v2/repositories/library/'.
+    :param params: The query parameters of the first page.
+    :return: An iterator of the decoded pages.
+    """
+    client = get_registry_client()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docker-hub")
+    try:
+        future = executor.submit(client.fetch, client.url(path, params))
+        while future is not None:
+            page = future.result()
+            next_url = page.get("next")
+            future = executor.submit(client.fetch, next_url) if next_url else None
+            yield page
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def repository_row(result: Dict[str, Any]) -> List[str]:
+    """
+    Convert a repository of the library namespace or a search result into a table row.
+    :param result: The repository as returned by Docker Hub.
+    :return: The row, with the columns of REPOSITORY_HEADERS.
+    """
+    if "repo_name" in result:
+        # Search results name their fields differently from repository listings
+        return [result.get("repo_name", "Unknown"), "Yes" if result.get("is_official", False) else "No",
+                result.get("pull_count", 0), result.get("star_count", 0),
+                result.get("short_description") or "No description available"]
+    # Repositories listed from 'library' are official
+    return [result.get("name", "Unknown"), "Yes", result.get("pull_count", 0), result.get("star_count", 0),
+            result.get("description") or "No description available"]
+
+
+def tag_row(repository: str, tag: Dict[str, Any]) -> List[str]:
+    """
+    Convert a tag into a table row.
+    :param repository: The repository the tag belongs to.
+    :param tag: The tag as returned by Docker Hub.
+    :return: The row, with the columns of TAG_HEADERS.
+    """
+    # Format the date the tag was last updated in a readable format
+    updated = datetime.fromisoformat((tag.get("last_updated") or "1970-01-01T00:00:00Z").replace("Z", "+00:00"))
+    return [repository, tag.get("name", "Unknown"), updated.strftime("%Y-%m-%d %H:%M:%S UTC")]
+
+
+def iter_docker_hub_image_pages(query: Optional[str] = None, page_size: int = HUB_PAGE_SIZE) -> Iterator[List[List[str]]]:
+    """
+    Walk Docker Hub images a page at a time: the most popular official images, or the results of a search.
+    :param query: The name or keyword to search for, or None for the official images.
+    :param page_size: The number of images per page.
+    :return: An iterator of pages of rows, with the columns of REPOSITORY_HEADERS.
+    """
+    if query:
+        pages = iter_docker_hub_pages("/v2/search/repositories/", {"query": query, "page_size": page_size})
+    else:
+        pages = iter_docker_hub_pages("/v2/repositories/library/", {"page_size": page_size})
+    for page in pages:
+        yield [repository_row(result) for result in page.get("results", [])]
+
+
+def iter_docker_hub_tag_pages(repository: str, name: Optional[str] = None, page_size: int = HUB_PAGE_SIZE) -> Iterator[List[List[str]]]:
+    """
+    Walk the tags of a Docker Hub repository a page at a time.
+    :param repository: The name of the repository (e.g., 'library/alpine').
+    :param name: Only list tags containing this text, which Docker Hub filters on the server.
+    :param page_size: The number of tags per page.
+    :return: An iterator of pages of rows, with the columns of TAG_HEADERS.
+    """
+    # Determine the path of the tags of the specified image
+    namespace, repo_name = (
+        repository.split("/") if "/" in repository else ("library", repository)
+    )
+    params = {"page_size": page_size}
+    if name:
+        params["name"] = name
+    for page in iter_docker_hub_pages(f"/v2/repositories/{namespace}/{repo_name}/tags/", params):
+        yield [tag_row(repository, tag) for tag in page.get("results", [])]
+
+
 def fetch_top_docker_hub_images(n: int = 25) -> List[List[str]]:
     """
     Fetch the top N Docker Hub images from the library repository.
     :param n: The number of images to fetch.
-    :return: A list of images with their details.
-    """
-    # The URL for the Docker Hub API
-    url = "https://hub.docker.com/v2/repositories/library/"
-
-    # Request the top N images
-    response = requests.get(url, params={"page": 1, "page_size": n})
-    response.raise_for_status()
-
-    # Parse the response
-    data = [["Repository", "Official", "Pull Count", "Star Count", "Description"]]
-    # Iterate through the results and extract the relevant information
-    for result in response.json().get("results", []):
-        data.append(
-            [
-                # Extract the repository name
-                result.get("name", "Unknown"),
-                # Official since it's in 'library'
-                "Yes",
-                # Extract the pull count and star count
-                result.get("pull_count", 0),
-                result.get("star_count", 0),
-                # Extract the description
-                result.get("description", "No description available"),
-            ]
-        )
-
-    # Return the data
-    return data
+    :return: The headers followed by a row for each image.
+    """
+    return [REPOSITORY_HEADERS] + next(iter_docker_hub_image_pages(page_size=n), [])
 
 
 def search_docker_hub_images(query: str) -> List[List[str]]:
     """
-    Search for Docker Hub images based on a query.
+    Search for Docker Hub images based on a query, returning the first page of results.
     :param query: The name or keyword to search for.
-    :return: A list of images with their details.
-    """
-    # The URL for the Docker Hub API
-    url = "https://hub.docker.com/v2/search/repositories/"
-
-    # Request the images based on the query
-    response = requests.get(url, params={"query": query})
-    response.raise_for_status()
-
-    # Parse the response
-    data = [["Repository", "Official", "Pull Count", "Star Count", "Description"]]
-    # Iterate through the results and extract the relevant information
-    for result in response.json().get("results", []):
-        data.append(
-            [
-                # Extract the repository name
-                result.get("repo_name", "Unknown"),
-                # Check if the image is official
-                "Yes" if result.get("is_official", False) else "No",
-                # Extract the pull count and star count
-                result.get("pull_count", 0),
-                result.get("star_count", 0),
-                # Extract the description
-                result.get("short_description", "No description available"),
-            ]
-        )
-
-    return data
+    :return: The headers followed by a row for each image.
+    """
+    return [REPOSITORY_HEADERS] + next(iter_docker_hub_image_pages(query, page_size=25), [])
 
 
 def get_docker_hub_tags(repository: str, max_tags: int = 10) -> List[List[str]]:
@@ -162,39 +482,39 @@ def get_docker_hub_tags(repository: str, max_tags: int = 10) -> List[List[str]]:
     Fetch the tags for a given Docker Hub repository.
     :param repository: The name of the repository (e.g., 'library/alpine').
     :param max_tags: The maximum number of tags to fetch.
+    :return: The headers followed by a row for each tag.
+    """
+    pages = iter_docker_hub_tag_pages(repository, page_size=min(max_tags, HUB_PAGE_SIZE))
+    rows = (row for page in pages for row in page)
+    return [TAG_HEADERS] + list(islice(rows, max_tags))
+
+
+async def fetch_top_docker_hub_images_async(n: int = 25) -> List[List[str]]:
+    """
+    Fetch the top N Docker Hub images from the library repository without blocking the event loop.
+    :param n: The number of images to fetch.
+    :return: A list of images.
+    """
+    return await asyncio.to_thread(fetch_top_docker_hub_images, n)
+
+
+async def search_docker_hub_images_async(query: str) -> List[List[str]]:
+    """
+    Search for Docker Hub images based on a query without blocking the event loop.
+    :param query: The name or keyword to search for.
+    :return: A list of images.
+    """
+    return await asyncio.to_thread(search_docker_hub_images, query)
+
+
+async def get_docker_hub_tags_async(repository: str, max_tags: int = 10) -> List[List[str]]:
+    """
+    Fetch the tags for a given Docker Hub repository without blocking the event loop.
+    :param repository: The name of the repository (e.g., 'library/alpine').
+    :param max_tags: The maximum number of tags to fetch.
     :return: A list of tags with their details.
     """
-    # Determine the url for the specified image
-    namespace, repo_name = (
-        repository.split("/") if "/" in repository else ("library", repository)
-    )
-    tags_url = f"https://hub.docker.com/v2/repositories/{namespace}/{repo_name}/tags/"
-
-    # Request the tags for the repository
-    response = requests.get(tags_url, params={"page_size": max_tags})
-    response.raise_for_status()
-
-    # Parse the response
-    data = [["Repository", "Tag", "Date Created"]]
-    # Iterate through the results and extract the relevant information
-    for tag in response.json().get("results", []):
-        data.append(
-            [
-                # Extract the repository name
-                repository,
-                # Extract the tag name
-                tag.get("name", "Unknown"),
-                # Extract the date created and format it to a readable format
-                datetime.fromisoformat(
-                    tag.get("last_updated", "1970-01-01T00:00:00Z").replace(
-                        "Z", "+00:00"
-                    )
-                ).strftime("%Y-%m-%d %H:%M:%S UTC"),
-            ]
-        )
-
-    # Return the data
-    return data
+    return await asyncio.to_thread(get_docker_hub_tags, repository, max_tags)
 
 
 def get_image_url(source: str, repository: str, tag: str = "latest") -> str:
@@ -204,21 +524,38 @@ def get_image_url(source: str, repository: str, tag: str = "latest") -> str:
     :param repository: The name of the repository (e.g., 'library/alpine').
     :param tag: The tag of the image (default is 'latest').
     :return: The formatted image URL.
+    :raises ValueError: If the repository is not a valid name on Docker Hub, such as 'a/b/c'.
     """
+    # A repository that starts with a registry, such as 'quay.io/foo/bar' or 'localhost:5000/foo', is already qualified
+    if is_qualified_repository(repository):
+        return f"{repository}:{tag}"
+
     # Determine the namespace and repository name
-    namespace, repo_name = (
-        repository.split("/") if "/" in repository else ("library", repository)
-    )
+    parts = repository.split("/")
+    if len(parts) > 2 or not all(parts):
+        raise ValueError(f"{repository!r} is not a valid repository name on {source}")
+    namespace, repo_name = parts if len(parts) == 2 else ("library", repository)
 
     # Generate the image URL based on the source
     match source:
         case "docker.io":
             return f"{source}/{namespace}/{repo_name}:{tag}"
 
-    # If the source is not recognized, return an empty string
-    return ""
+    return f"{source}/{repository}:{tag}"
+
+
+def is_qualified_repository(repository: str) -> bool:
+    """
+    Check whether a repository name starts with a registry, which is a first component containing a '.' or a port, or
+    'localhost'.
+    :param repository: The repository, such as 'quay.io/foo/bar'.
+    :return: True if the repository names its registry.
+    """
+    registry, separator, _ = repository.partition("/")
+    return bool(separator) and ("." in registry or ":" in registry or registry == "localhost")
 
 
+@invalidates(IMAGES)
 def pull_image(source: str, repository: str, tag: str = "latest") -> CompletedProcess:
     """
     Pull an image from a specified source and repository.
@@ -231,9 +568,30 @@ def pull_image(source: str, repository: str, tag: str = "latest") -> CompletedPr
     url = get_image_url(source, repository, tag)
 
     # Attempt to pull the image
-    result = run_command(
-        ["podman", "pull", "--quiet", url], capture_output=True, text=True
-    )
+    result = run_podman(["podman", "pull", "--quiet", url])
+
+    # Log the operation
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    # Return the result
+    return result
+
+
+@invalidates(IMAGES)
+async def pull_image_async(source: str, repository: str, tag: str = "latest") -> CompletedProcess:
+    """
+    Pull an image from a specified source and repository without blocking the event loop.
+    :param source: The source of the image (e.g., 'docker.io').
+    :param repository: The name of the repository (e.g., 'library/alpine').
+    :param tag: The tag of the image (default is 'latest').
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    # Generate the image URL
+    url = get_image_url(source, repository, tag)
+
+    # Attempt to pull the image
+    result = await run_podman_async(["podman", "pull", "--quiet", url])
 
     # Log the operation
     log_manager = LogManager()
@@ -247,20 +605,146 @@ def pull_image(source: str, repository: str, tag: str = "latest") -> CompletedPr
 # BUILDING FUNCTIONS
 ########################################################################################################################
 
-def build_image(path: Path, name: str, tag: str = "latest") -> CompletedProcess:
+def build_command(path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+                  context_hash: Optional[str] = None, build_args: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Build the podman command that builds an image, reusing cached layers unless told otherwise.
+    :param path: The path to the directory containing the Dockerfile and resources.
+    :param name: The name of the image to build.
+    :param tag: The tag of the image.
+    :param no_cache: Whether to rebuild every layer instead of reusing layers built before.
+    :param context_hash: The content hash of the build context, recorded as a label of the image.
+    :param build_args: The values of the ARG instructions of the Containerfile.
+    :return: The podman command.
+    """
+    cmd = ["podman", "build", "--rm"]
+    if no_cache:
+        cmd.append("--no-cache")
+    for key, value in sorted((build_args or {}).items()):
+        cmd += ["--build-arg", f"{key}={value}"]
+    if context_hash:
+        cmd += ["--label", f"{CONTEXT_LABEL}={context_hash}"]
+    return cmd + ["-t", f"{name}:{tag}", str(path)]
+
+
+def context_filter(context_hash: str) -> Dict[str, str]:
+    return {"label": f"{CONTEXT_LABEL}={context_hash}"}
+
+
+def reuse_built_image(image: Image, command: List[str], result: CompletedProcess) -> CompletedProcess:
+    """
+    Describe the result of tagging an image built from an unchanged context as the result of the skipped build.
+    :param image: The image built from the same context.
+    :param command: The build command that was skipped.
+    :param result: The result of tagging the image with the requested name.
+    :return: The result, with the id of the image as its output when the tag succeeded.
+    """
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+    if result.returncode == 0:
+        log_manager.add_log(f"Build of {command[-2]} skipped, image {image.key} was built from the same context")
+    return CompletedProcess(command, result.returncode, stdout=f"{image.id}\n" if result.returncode == 0 else "",
+                            stderr=result.stderr)
+
+
+def reuse_unchanged_image(path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+                          build_args: Optional[Dict[str, str]] = None) -> Tuple[List[str], Optional[CompletedProcess]]:
+    """
+    Hash a build context and, unless no_cache is set, tag an image already built from the same content with the
+    requested name instead of building it again.
+    :param path: The path to the directory containing the Dockerfile and resources.
+    :param name: The name of the image to build.
+    :param tag: The tag of the image (default is 'latest').
+    :param no_cache: Whether to rebuild every layer and never reuse an existing image.
+    :param build_args: The values of the ARG instructions of the Containerfile.
+    :return: The build command, labelled with the hash of the context, and the result of reusing an image, or None if
+             the image has to be built.
+    """
+    context_hash = hash_context(path, build_args)
+    command = build_command(path, name, tag, no_cache, context_hash, build_args)
+    if context_hash and not no_cache:
+        image = next(iter(list_images(filters=context_filter(context_hash))), None)
+        if image is not None:
+            return command, reuse_built_image(image, command, run_podman(["podman", "tag", image.id, f"{name}:{tag}"]))
+    return command, None
+
+
+async def reuse_unchanged_image_async(path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+                                      build_args: Optional[Dict[str, str]] = None
+                                      ) -> Tuple[List[str], Optional[CompletedProcess]]:
+    """
+    Hash a build context and, unless no_cache is set, tag an image already built from the same content with the
+    requested name instead of building it again, without blocking the event loop.
+    :param path: The path to the directory containing the Dockerfile and resources.
+    :param name: The name of the image to build.
+    :param tag: The tag of the image (default is 'latest').
+    :param no_cache: Whether to rebuild every layer and never reuse an existing image.
+    :param build_args: The values of the ARG instructions of the Containerfile.
+    :return: The build command, labelled with the hash of the context, and the result of reusing an image, or None if
+             the image has to be built.
+    """
+    # Hashing reads every file of the context, which is done on a worker thread
+    context_hash = await asyncio.to_thread(hash_context, path, build_args)
+    command = build_command(path, name, tag, no_cache, context_hash, build_args)
+    if context_hash and not no_cache:
+        image = next(iter(await list_images_async(filters=context_filter(context_hash))), None)
+        if image is not None:
+            return command, reuse_built_image(image, command,
+                                              await run_podman_async(["podman", "tag", image.id, f"{name}:{tag}"]))
+    return command, None
+
+
+@invalidates(IMAGES)
+def build_image(path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+                build_args: Optional[Dict[str, str]] = None) -> CompletedProcess:
+    """
+    Build a Docker image from a specified directory. Unless no_cache is set, the build is skipped when an image has
+    already been built from the same content, which is then tagged with the requested name.
+    :param path: The path to the directory containing the Dockerfile and resources.
+    :param name: The name of the image to build.
+    :param tag: The tag of the image (default is 'latest').
+    :param no_cache: Whether to rebuild every layer and never reuse an existing image.
+    :param build_args: The values of the ARG instructions of the Containerfile.
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    command, reused = reuse_unchanged_image(path, name, tag, no_cache, build_args)
+    if reused is not None:
+        return reused
+
+    # Attempt to build the image
+    result = run_podman(command)
+
+    # Log the operation
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    # Return the result
+    return result
+
+
+@invalidates(IMAGES)
+async def build_image_async(path: Path, name: str, tag: str = "latest", no_cache: bool = False,
+                            build_args: Optional[Dict[str, str]] = None) -> CompletedProcess:
     """
-    Build a Docker image from a specified directory.
+    Build a Docker image from a specified directory without blocking the event loop. Unless no_cache is set, the build
+    is skipped when an image has already been built from the same content.
     :param path: The path to the directory containing the Dockerfile and resources.
     :param name: The name of the image to build.
     :param tag: The tag of the image (default is 'latest').
+    :param no_cache: Whether to rebuild every layer and never reuse an existing image.
+    :param build_args: The values of the ARG instructions of the Containerfile.
     :return: A CompletedProcess object containing the result of the command.
     """
+    command, reused = await reuse_unchanged_image_async(path, name, tag, no_cache, build_args)
+    if reused is not None:
+        return reused
+
     # Attempt to build the image
-    result = run_command(["podman", "build", "--rm", "--no-cache", "-t", f"{name}:{tag}", str(path)], capture_output=True, text=True)
+    result = await run_podman_async(command)
 
     # Log the operation
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
     # Return the result
-    return result
\ No newline at end of file
+    return result
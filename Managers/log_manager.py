@@ -1,6 +1,80 @@
+import logging
+import os
+import threading
+from collections import deque
+from itertools import islice
 from datetime import datetime
+from logging.handlers import RotatingFileHandler
 from subprocess import CompletedProcess
-from typing import List
+from typing import List, Optional, Sequence, Tuple
+
+# The number of records kept in memory, unless overridden by ISOPOD_LOG_CAPACITY
+DEFAULT_CAPACITY = 1000
+
+# The number of characters of command output kept per record
+MAX_OUTPUT_CHARS = 1000
+
+# The size at which the log file is rotated and the number of rotated files kept, unless overridden by
+# ISOPOD_LOG_MAX_BYTES and ISOPOD_LOG_BACKUPS
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+
+def truncate(output: Optional[str]) -> str:
+    """
+    Keep the start of a command's output, summarising the rest.
+    :param output: The output.
+    :return: The output, shortened to MAX_OUTPUT_CHARS characters plus a note of how much was left out.
+    """
+    if not output:
+        return ""
+    if len(output) <= MAX_OUTPUT_CHARS:
+        return output
+    return f"{output[:MAX_OUTPUT_CHARS]}... ({len(output) - MAX_OUTPUT_CHARS} more characters)"
+
+
+class LogRecord:
+    """
+    A single log entry. Command records keep their arguments, outcome and sizes, and are only formatted into text when
+    they are displayed or written to the log file.
+    """
+
+    __slots__ = ("timestamp", "message", "argv", "returncode", "duration", "stdout_size", "stderr_size", "output",
+                 "details")
+
+    def __init__(self, timestamp: datetime, message: Optional[str] = None, argv: Optional[Sequence[str]] = None,
+                 returncode: Optional[int] = None, duration: Optional[float] = None, stdout_size: int = 0,
+                 stderr_size: int = 0, output: str = "", details: Sequence[str] = ()):
+        self.timestamp = timestamp
+        self.message = message
+        self.argv = argv
+        self.returncode = returncode
+        self.duration = duration
+        self.stdout_size = stdout_size
+        self.stderr_size = stderr_size
+        self.output = output
+        self.details = details
+
+    @property
+    def succeeded(self) -> bool:
+        return self.returncode == 0
+
+    def lines(self) -> List[str]:
+        """
+        Format the record for display.
+        :return: The lines of the record, each prefixed with its timestamp.
+        """
+        timestamp = self.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        if self.argv is None:
+            return [f'{timestamp}: {self.message}'] + [f'{timestamp}:   {detail}' for detail in self.details]
+
+        timing = f" in {self.duration * 1000:.0f} ms" if self.duration is not None else ""
+        if self.succeeded:
+            return [f"{timestamp}: Command executed successfully{timing}: {list(self.argv)}",
+                    f"{timestamp}: Output ({self.stdout_size} bytes): {self.output}"]
+        return [f"{timestamp}: Command failed with return code {self.returncode}{timing}: {list(self.argv)}",
+                f"{timestamp}: Error output ({self.stderr_size} bytes): {self.output}"]
+
 
 class LogManager:
     _instance = None
@@ -8,23 +82,99 @@ class LogManager:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.logs = []  # This will store all log entries
+            # The most recent records; older ones are dropped once the capacity is reached
+            cls._instance.records = deque(maxlen=int(os.environ.get("ISOPOD_LOG_CAPACITY", DEFAULT_CAPACITY)))
+            # The number of records ever added, which readers use as a cursor into the log
+            cls._instance.total = 0
+            cls._instance.lock = threading.Lock()
+            cls._instance.file_logger = None
+            if os.environ.get("ISOPOD_LOG_FILE"):
+                cls._instance.enable_file_sink(os.environ["ISOPOD_LOG_FILE"],
+                                               int(os.environ.get("ISOPOD_LOG_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                                               int(os.environ.get("ISOPOD_LOG_BACKUPS", DEFAULT_BACKUPS)))
         return cls._instance
 
+    def enable_file_sink(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS):
+        """
+        Also append every record to a file, rotating it when it reaches a maximum size.
+        :param path: The path of the log file.
+        :param max_bytes: The size in bytes at which the file is rotated.
+        :param backups: The number of rotated files to keep.
+        """
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("isopod")
+        logger.handlers.clear()
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.file_logger = logger
+
+    def add_record(self, record: LogRecord):
+        with self.lock:
+            self.records.append(record)
+            self.total += 1
+        if self.file_logger is not None:
+            self.file_logger.info("\n".join(record.lines()))
+
     def add_log(self, message: str):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.logs.append(f'{timestamp}: {message}')
+        self.add_record(LogRecord(datetime.now(), message=message))
+
+    def get_records(self) -> List[LogRecord]:
+        with self.lock:
+            return list(self.records)
+
+    def get_records_since(self, cursor: int) -> Tuple[List[LogRecord], int]:
+        """
+        Get the records added after a cursor returned by a previous call. Records that have already been dropped from
+        the buffer are skipped.
+        :param cursor: The cursor, or 0 to read every record still held.
+        :return: The new records and the cursor to pass next time.
+        """
+        with self.lock:
+            first = self.total - len(self.records)
+            return list(islice(self.records, max(cursor - first, 0), None)), self.total
 
     def get_logs(self) -> List[str]:
-        return self.logs
+        return [line for record in self.get_records() for line in record.lines()]
 
     def clear_logs(self):
-        self.logs.clear()
+        with self.lock:
+            self.records.clear()
+
+    def log_command(self, argv: Sequence[str], returncode: int, stdout: Optional[str], stderr: Optional[str],
+                    duration: Optional[float] = None, stdout_size: Optional[int] = None):
+        """
+        Record the outcome of a command. Only the start of its output is kept.
+        :param argv: The command.
+        :param returncode: The return code of the command.
+        :param stdout: The standard output of the command, if it was captured.
+        :param stderr: The error output of the command.
+        :param duration: The wall time of the command in seconds, if it was measured.
+        :param stdout_size: The size of the standard output, if it was streamed rather than captured.
+        """
+        output = stdout if returncode == 0 else stderr
+        self.add_record(LogRecord(datetime.now(), argv=argv, returncode=returncode, duration=duration,
+                                  stdout_size=len(stdout or "") if stdout_size is None else stdout_size,
+                                  stderr_size=len(stderr or ""), output=truncate(output)))
+
+    def log_batch(self, description: str, results: Sequence[Tuple[str, CompletedProcess]],
+                  duration: Optional[float] = None):
+        """
+        Record the outcome of an action applied to several resources as a single entry, with a line per resource.
+        :param description: The action, such as 'Stop containers'.
+        :param results: The resource the action was applied to and its result, for each resource.
+        :param duration: The wall time of the whole action in seconds, if it was measured.
+        """
+        failed = sum(result.returncode != 0 for _, result in results)
+        timing = f" in {duration * 1000:.0f} ms" if duration is not None else ""
+        message = f"{description}: {len(results) - failed} of {len(results)} succeeded{timing}"
+        details = [f"{target}: ok" if result.returncode == 0 else
+                   f"{target}: failed with return code {result.returncode}: {truncate(result.stderr.strip())}"
+                   for target, result in results]
+        self.add_record(LogRecord(datetime.now(), message=message, returncode=1 if failed else 0, duration=duration,
+                                  details=details))
 
     def write_system_log(self, completed_process: CompletedProcess):
-        if completed_process.returncode == 0:
-            self.add_log(f"Command executed successfully: {completed_process.args}")
-            self.add_log(f"Output: {completed_process.stdout}")
-        else:
-            self.add_log(f"Command failed with return code {completed_process.returncode}: {completed_process.args}")
-            self.add_log(f"Error output: {completed_process.stderr}")
+        self.log_command(completed_process.args, completed_process.returncode, completed_process.stdout,
+                         completed_process.stderr, getattr(completed_process, "duration", None))
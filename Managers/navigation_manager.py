@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import Callable, Union
+
 from textual.app import App
 from textual.screen import Screen
 
@@ -42,7 +45,13 @@ class NavigationManager:
     def set_app(self, app: App):
         self.app = app
 
-    def install(self, page: Screen, tag: str, title: str):
+    def install(self, page: Union[Screen, Callable[[], Screen]], tag: str, title: str):
+        """
+        Install a page under a tag.
+        :param page: The page, or a factory that creates it the first time it is navigated to.
+        :param tag: The tag used to navigate to the page.
+        :param title: The title shown in the header while the page is active.
+        """
         self.app.install_screen(screen=page, name=tag)
         self.screens[tag] = (page, title)
 
@@ -51,3 +60,14 @@ class NavigationManager:
         self.app.push_screen(tag)
         self.previous_screen = self.current_screen
         self.current_screen = tag
+
+
+def lazy_page(module: str, name: str) -> Callable[[], Screen]:
+    """
+    Create a factory for a page that only imports its module when the page is first navigated to, so that the modules
+    of pages that are never opened are not loaded at startup.
+    :param module: The module containing the page, such as 'Pages.image_page'.
+    :param name: The class of the page, such as 'ImagePage'.
+    :return: The factory.
+    """
+    return lambda: getattr(import_module(module), name)()
@@ -1,48 +1,83 @@
-import json
-from typing import List
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional
 
+from Managers.backend_manager import run_podman, run_podman_async
+from Managers.cache_manager import NETWORKS, fetch_inventory, fetch_inventory_async, invalidates
 from Managers.log_manager import LogManager
-from Managers.system_manager import run_command
+from Managers.record_manager import Network
+from Managers.stream_manager import iter_inventory, aiter_inventory, load_inventory, load_inventory_async
 
 
-def list_networks() -> List[List[str]]:
+# The command to list all networks in the system in JSON format
+LIST_NETWORKS_COMMAND = ["podman", "network", "ls", "--format", "json"]
+
+
+def iter_networks() -> Iterator[Network]:
+    """
+    Stream all podman networks as the output of podman arrives.
+    :return: An iterator of networks.
+    """
+    return iter_inventory(LIST_NETWORKS_COMMAND, Network)
+
+def aiter_networks() -> AsyncIterator[Network]:
+    """
+    Stream all podman networks without blocking the event loop.
+    :return: An iterator of networks.
+    """
+    return aiter_inventory(LIST_NETWORKS_COMMAND, Network)
+
+def list_networks() -> List[Network]:
     """
     List all podman networks.
-    :return: A list of networks with their details.
+    :return: A list of networks.
+    """
+    return fetch_inventory(NETWORKS, partial(load_inventory, LIST_NETWORKS_COMMAND, Network))
+
+async def list_networks_async() -> List[Network]:
+    """
+    List all podman networks without blocking the event loop.
+    :return: A list of networks.
+    """
+    return await fetch_inventory_async(NETWORKS, partial(load_inventory_async, LIST_NETWORKS_COMMAND, Network))
+
+def find_network(network_id: str) -> Optional[Network]:
+    """
+    Look up a single network.
+    :param network_id: The ID of the network.
+    :return: The network, or None if it does not exist.
+    """
+    cmd = ["podman", "network", "ls", "--filter", f"id={network_id}", "--format", "json"]
+    networks = list(iter_inventory(cmd, Network))
+    return next((network for network in networks if network.key == network_id[:12]), None)
+
+async def find_network_async(network_id: str) -> Optional[Network]:
+    """
+    Look up a single network without blocking the event loop.
+    :param network_id: The ID of the network.
+    :return: The network, or None if it does not exist.
     """
-    # The command to list all images in the system in JSON format
-    cmd = ["podman", "network", "ls", "--format", "json"]
-
-    # The headers for the table
-    headers = ["Network ID", "Name", "Driver", "Subnet(s)"]
-    data = [headers]
-
-    # Run the command and capture the output
-    result = run_command(cmd, capture_output=True, text=True)
-    # If the command was successful, parse the JSON output
-    if result.returncode == 0:
-        # The JSON output is stored in result.stdout
-        content = json.loads(result.stdout)
-        # Iterate through the images and extract the relevant information
-        for network in content:
-            # Extract the network ID, name, driver, and subnets
-            network_id = network.get("id")[:12]
-            name = network.get("name")
-            driver = network.get("driver")
-            subnets = [x["subnet"] for x in network.get("subnets")]
-            data.append([network_id, name, driver, ", ".join(subnets)])
+    cmd = ["podman", "network", "ls", "--filter", f"id={network_id}", "--format", "json"]
+    networks = [network async for network in aiter_inventory(cmd, Network)]
+    return next((network for network in networks if network.key == network_id[:12]), None)
+
+@invalidates(NETWORKS)
+def create_network(name: str, subnet: str):
+    # Create a new podman network with the given name and subnet
+    cmd = ['podman', 'network', 'create', '--subnet', subnet, name]
+    result = run_podman(cmd)
 
     # Log the operation
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    # Return the data
-    return data
+    # Return the result of the command
+    return result
 
-def create_network(name: str, subnet: str):
+@invalidates(NETWORKS)
+async def create_network_async(name: str, subnet: str):
     # Create a new podman network with the given name and subnet
     cmd = ['podman', 'network', 'create', '--subnet', subnet, name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = await run_podman_async(cmd)
 
     # Log the operation
     log_manager = LogManager()
@@ -51,10 +86,24 @@ def create_network(name: str, subnet: str):
     # Return the result of the command
     return result
 
+@invalidates(NETWORKS)
 def remove_network(name: str):
     # Remove a podman network with the given name
     cmd = ['podman', 'network', 'rm', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = run_podman(cmd)
+
+    # Log the operation
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    # Return the result of the command
+    return result
+
+@invalidates(NETWORKS)
+async def remove_network_async(name: str):
+    # Remove a podman network with the given name
+    cmd = ['podman', 'network', 'rm', name]
+    result = await run_podman_async(cmd)
 
     # Log the operation
     log_manager = LogManager()
@@ -1,51 +1,83 @@
-import json
-from datetime import datetime, timezone
-from typing import List
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional
 
+from Managers.backend_manager import run_podman, run_podman_async
+from Managers.cache_manager import CONTAINERS, PODS, fetch_inventory, fetch_inventory_async, invalidates
 from Managers.log_manager import LogManager
-from Managers.system_manager import run_command
+from Managers.record_manager import Pod
+from Managers.stream_manager import iter_inventory, aiter_inventory, load_inventory, load_inventory_async
 
 
-def list_pods() -> List[List[str]]:
+# The command to list all pods in the system in JSON format
+LIST_PODS_COMMAND = ["podman", "pod", "ps", "--format", "json"]
+
+
+def iter_pods() -> Iterator[Pod]:
+    """
+    Stream all podman pods as the output of podman arrives.
+    :return: An iterator of pods.
+    """
+    return iter_inventory(LIST_PODS_COMMAND, Pod)
+
+def aiter_pods() -> AsyncIterator[Pod]:
+    """
+    Stream all podman pods without blocking the event loop.
+    :return: An iterator of pods.
+    """
+    return aiter_inventory(LIST_PODS_COMMAND, Pod)
+
+def list_pods() -> List[Pod]:
     """
     List all podman pods.
-    :return: A list of pods with their details.
+    :return: A list of pods.
+    """
+    return fetch_inventory(PODS, partial(load_inventory, LIST_PODS_COMMAND, Pod))
+
+async def list_pods_async() -> List[Pod]:
+    """
+    List all podman pods without blocking the event loop.
+    :return: A list of pods.
+    """
+    return await fetch_inventory_async(PODS, partial(load_inventory_async, LIST_PODS_COMMAND, Pod))
+
+def find_pod(pod_id: str) -> Optional[Pod]:
+    """
+    Look up a single pod.
+    :param pod_id: The ID of the pod.
+    :return: The pod, or None if it does not exist.
+    """
+    cmd = ["podman", "pod", "ps", "--filter", f"id={pod_id}", "--format", "json"]
+    pods = list(iter_inventory(cmd, Pod))
+    return next((pod for pod in pods if pod.key == pod_id[:12]), None)
+
+async def find_pod_async(pod_id: str) -> Optional[Pod]:
+    """
+    Look up a single pod without blocking the event loop.
+    :param pod_id: The ID of the pod.
+    :return: The pod, or None if it does not exist.
     """
-    # The command to list all images in the system in JSON format
-    cmd = ["podman", "pod", "ps", "--format", "json"]
-
-    # The headers for the table
-    headers = ["Pod ID", "Name", "Status", "Created", "Infra ID", "# of Containers", "Network(s)"]
-    data = [headers]
-
-    # Run the command and capture the output
-    result = run_command(cmd, capture_output=True, text=True)
-    # If the command was successful, parse the JSON output
-    if result.returncode == 0:
-        # The JSON output is stored in result.stdout
-        content = json.loads(result.stdout)
-        # Iterate through the images and extract the relevant information
-        for pod in content:
-            pod_id = pod.get("Id")[:12]
-            pod_name = pod.get("Name")
-            pod_status = pod.get("Status")
-            pod_created = datetime.fromisoformat(pod.get("Created")).astimezone(timezone.utc).strftime("%Y-%m-%d")
-            pod_infra_id = pod.get("InfraId")[:12]
-            pod_containers = str(len(pod.get("Containers")))
-            pod_networks = ','.join(pod.get("Networks"))
-            data.append([pod_id, pod_name, pod_status, pod_created, pod_infra_id, pod_containers, pod_networks])
+    cmd = ["podman", "pod", "ps", "--filter", f"id={pod_id}", "--format", "json"]
+    pods = [pod async for pod in aiter_inventory(cmd, Pod)]
+    return next((pod for pod in pods if pod.key == pod_id[:12]), None)
+
+@invalidates(PODS, CONTAINERS)
+def create_pod(name: str, network: str =''):
+    # Create a new podman pod with the given name and network
+    cmd = ['podman', 'pod', 'create', '--network', network, name]
+    result = run_podman(cmd)
 
     # Log the operation
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    # Return the data
-    return data
+    # Return the result of the command
+    return result
 
-def create_pod(name: str, network: str =''):
+@invalidates(PODS, CONTAINERS)
+async def create_pod_async(name: str, network: str =''):
     # Create a new podman pod with the given name and network
     cmd = ['podman', 'pod', 'create', '--network', network, name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = await run_podman_async(cmd)
 
     # Log the operation
     log_manager = LogManager()
@@ -54,10 +86,24 @@ def create_pod(name: str, network: str =''):
     # Return the result of the command
     return result
 
+@invalidates(PODS, CONTAINERS)
 def remove_pod(name: str):
     # Remove a podman pod with the given name
     cmd = ['podman', 'pod', 'rm', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = run_podman(cmd)
+
+    # Log the operation
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    # Return the result of the command
+    return result
+
+@invalidates(PODS, CONTAINERS)
+async def remove_pod_async(name: str):
+    # Remove a podman pod with the given name
+    cmd = ['podman', 'pod', 'rm', name]
+    result = await run_podman_async(cmd)
 
     # Log the operation
     log_manager = LogManager()
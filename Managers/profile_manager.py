@@ -0,0 +1,317 @@
+########################################################################################################################
+# profile_manager.py
+# This module provides timing instrumentation for every podman invocation. Each command records its wall time, the time
+# spent spawning the process, the bytes sent and received and the manager function that issued it, and is aggregated
+# into per-operation latency percentiles that can be exported as JSON or in the Prometheus text format.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import json
+import math
+import os
+import sys
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The number of most recent durations kept per operation, from which percentiles are computed
+SAMPLE_WINDOW = 1024
+
+# The number of most recent commands kept for display
+RECENT_CAPACITY = 200
+
+# The percentiles reported for every operation
+PERCENTILES = (50, 95, 99)
+
+# Podman subcommands whose operation is named by their first argument as well, such as 'podman network ls'
+COMMAND_GROUPS = {"container", "image", "network", "pod", "volume", "system", "machine", "manifest", "secret"}
+
+# Modules that only carry a command to podman, which are skipped when looking for the function that issued it
+TRANSPORT_MODULES = {"Managers.backend_manager", "Managers.cache_manager", "Managers.log_manager",
+                     "Managers.profile_manager", "Managers.stream_manager", "Managers.system_manager"}
+
+# The caller attributed to commands that are run on another thread on behalf of a coroutine
+CALLER: ContextVar[Optional[str]] = ContextVar("isopod_caller", default=None)
+
+
+########################################################################################################################
+# ATTRIBUTION
+########################################################################################################################
+def operation_name(command: Sequence[str]) -> str:
+    """
+    Name the operation a command performs, leaving out its arguments so that every call of it is aggregated together.
+    :param command: The command.
+    :return: The program and its subcommand, such as 'podman ps' or 'podman network ls'.
+    """
+    if not command:
+        return "unknown"
+    words = [os.path.basename(command[0])]
+    for argument in command[1:]:
+        if argument.startswith("-"):
+            break
+        words.append(argument)
+        if len(words) > 2 or words[1] not in COMMAND_GROUPS:
+            break
+    return " ".join(words)
+
+
+def calling_function() -> str:
+    """
+    Find the manager function that issued the command currently being run.
+    :return: The module and qualified name of the function, such as 'container_manager.list_containers'.
+    """
+    caller = CALLER.get()
+    if caller is not None:
+        return caller
+
+    page = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("Managers.") and module not in TRANSPORT_MODULES:
+            return f"{module[len('Managers.'):]}.{frame.f_code.co_qualname}"
+        if page is None and module.startswith("Pages."):
+            page = f"{module[len('Pages.'):]}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return page or "unknown"
+
+
+@contextmanager
+def attributed() -> Iterator[None]:
+    """
+    Attribute the commands run inside the block to the current caller, including those run on worker threads that
+    cannot see the stack of the coroutine that started them.
+    """
+    token = CALLER.set(calling_function())
+    try:
+        yield
+    finally:
+        CALLER.reset(token)
+
+
+########################################################################################################################
+# STATISTICS
+########################################################################################################################
+class CommandSample:
+    """
+    The measurements of a single command.
+    """
+
+    __slots__ = ("timestamp", "operation", "caller", "backend", "duration", "spawn", "bytes_in", "bytes_out",
+                 "returncode")
+
+    def __init__(self, timestamp: datetime, operation: str, caller: str, backend: str, duration: float,
+                 spawn: Optional[float], bytes_in: int, bytes_out: int, returncode: Optional[int]):
+        self.timestamp = timestamp
+        self.operation = operation
+        self.caller = caller
+        self.backend = backend
+        self.duration = duration
+        self.spawn = spawn
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.returncode = returncode
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__} | {"timestamp": self.timestamp.isoformat()}
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """
+    Compute a percentile using the nearest-rank method.
+    :param values: The values, in ascending order.
+    :param rank: The percentile, between 0 and 100.
+    :return: The percentile, or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+    return values[max(math.ceil(rank / 100 * len(values)) - 1, 0)]
+
+
+class OperationStats:
+    """
+    The running totals of an operation, together with a window of its most recent durations.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.spawn_time = 0.0
+        self.spawn_count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.durations = deque(maxlen=SAMPLE_WINDOW)
+        self.callers = Counter()
+
+    def add(self, sample: CommandSample) -> None:
+        self.count += 1
+        self.errors += sample.returncode not in (0, None)
+        self.total_time += sample.duration
+        self.max_time = max(self.max_time, sample.duration)
+        if sample.spawn is not None:
+            self.spawn_time += sample.spawn
+            self.spawn_count += 1
+        self.bytes_in += sample.bytes_in
+        self.bytes_out += sample.bytes_out
+        self.durations.append(sample.duration)
+        self.callers[sample.caller] += 1
+
+    def percentiles(self) -> Dict[int, float]:
+        """
+        Compute the reported percentiles over the most recent durations.
+        :return: The duration in seconds at each percentile.
+        """
+        durations = sorted(self.durations)
+        return {rank: percentile(durations, rank) for rank in PERCENTILES}
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    @property
+    def mean_spawn(self) -> Optional[float]:
+        return self.spawn_time / self.spawn_count if self.spawn_count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "count": self.count,
+            "errors": self.errors,
+            "total_seconds": self.total_time,
+            "mean_seconds": self.mean_time,
+            "max_seconds": self.max_time,
+            **{f"p{rank}_seconds": value for rank, value in self.percentiles().items()},
+            "mean_spawn_seconds": self.mean_spawn,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "callers": dict(self.callers.most_common()),
+        }
+
+
+########################################################################################################################
+# EXPORT
+########################################################################################################################
+def prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(stats: List[OperationStats]) -> str:
+    """
+    Format operation statistics in the Prometheus text exposition format.
+    :param stats: The statistics of each operation.
+    :return: The metrics.
+    """
+    lines = ["# HELP isopod_command_duration_seconds Wall time of podman commands.",
+             "# TYPE isopod_command_duration_seconds summary"]
+    for operation in stats:
+        label = f'operation="{prometheus_label(operation.operation)}"'
+        for rank, value in operation.percentiles().items():
+            lines.append(f'isopod_command_duration_seconds{{{label},quantile="{rank / 100}"}} {value}')
+        lines.append(f"isopod_command_duration_seconds_sum{{{label}}} {operation.total_time}")
+        lines.append(f"isopod_command_duration_seconds_count{{{label}}} {operation.count}")
+
+    counters = [
+        ("isopod_command_errors_total", "Podman commands that failed.", lambda o: o.errors),
+        ("isopod_command_spawn_seconds_total", "Time spent spawning podman processes.", lambda o: o.spawn_time),
+        ("isopod_command_bytes_in_total", "Bytes sent to podman.", lambda o: o.bytes_in),
+        ("isopod_command_bytes_out_total", "Bytes received from podman.", lambda o: o.bytes_out),
+    ]
+    for name, description, value in counters:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for operation in stats:
+            lines.append(f'{name}{{operation="{prometheus_label(operation.operation)}"}} {value(operation)}')
+    return "\n".join(lines) + "\n"
+
+
+########################################################################################################################
+# PROFILE MANAGER
+########################################################################################################################
+class ProfileManager:
+    """
+    Collects the measurements of every podman command run by the application.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.operations = {}
+            cls._instance.recent = deque(maxlen=RECENT_CAPACITY)
+            cls._instance.lock = threading.Lock()
+        return cls._instance
+
+    def record(self, command: Sequence[str], caller: str, backend: str, duration: float, spawn: Optional[float] = None,
+               bytes_in: int = 0, bytes_out: int = 0, returncode: Optional[int] = None) -> None:
+        """
+        Record the measurements of a command.
+        :param command: The command.
+        :param caller: The manager function that issued the command.
+        :param backend: The name of the backend that ran the command.
+        :param duration: The wall time of the command in seconds.
+        :param spawn: The time in seconds taken to start the process, or None if no process was started.
+        :param bytes_in: The number of bytes sent to podman.
+        :param bytes_out: The number of bytes of output received from podman.
+        :param returncode: The return code of the command.
+        """
+        sample = CommandSample(datetime.now(), operation_name(command), caller, backend, duration, spawn, bytes_in,
+                               bytes_out, returncode)
+        with self.lock:
+            stats = self.operations.get(sample.operation)
+            if stats is None:
+                stats = self.operations[sample.operation] = OperationStats(sample.operation)
+            stats.add(sample)
+            self.recent.append(sample)
+
+    def get_stats(self) -> List[OperationStats]:
+        """
+        Get the statistics of every operation, slowest first by total time.
+        :return: The statistics.
+        """
+        with self.lock:
+            return sorted(self.operations.values(), key=lambda stats: stats.total_time, reverse=True)
+
+    def get_recent(self) -> List[CommandSample]:
+        with self.lock:
+            return list(self.recent)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.operations.clear()
+            self.recent.clear()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "generated": datetime.now().isoformat(),
+            "operations": [stats.to_dict() for stats in self.get_stats()],
+            "recent": [sample.to_dict() for sample in self.get_recent()],
+        }, indent=2)
+
+    def to_prometheus(self) -> str:
+        return format_prometheus(self.get_stats())
+
+    def export(self, path: str, output_format: str = "json") -> None:
+        """
+        Write the statistics to a file.
+        :param path: The path of the file.
+        :param output_format: Either 'json' or 'prometheus'.
+        """
+        content = self.to_prometheus() if output_format == "prometheus" else self.to_json()
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
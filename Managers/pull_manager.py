@@ -0,0 +1,347 @@
+########################################################################################################################
+# pull_manager.py
+# This module provides a queue of image pulls. A configurable number of pulls run at once, requests for an image that
+# is already queued or being pulled share the same job, and the progress of every layer is followed from the output of
+# podman or from the pull stream of the REST API.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import codecs
+import json
+import os
+import re
+import time
+from collections import deque
+from contextlib import aclosing
+from subprocess import CompletedProcess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Managers.backend_manager import PODMAN_ERROR_CODE, StreamStatus, stream_podman_async
+from Managers.cache_manager import CacheManager, IMAGES
+from Managers.log_manager import LogManager
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The number of pulls run at once, unless overridden by ISOPOD_PULL_CONCURRENCY
+DEFAULT_CONCURRENCY = 3
+
+# The states of a pull
+QUEUED = "queued"
+PULLING = "pulling"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+# The states of a layer
+COPYING = "copying"
+COPIED = "copied"
+SKIPPED = "skipped"
+
+# A progress line, such as 'Copying blob 4abcf2066143 done' or 'Copying blob sha256:4abc... 1.2MiB / 3.3MiB'
+COPYING_LINE = re.compile(r"Copying (blob|config) (?:sha256:)?([0-9a-f]{6,64})(.*)")
+
+# The amount of a layer transferred so far, such as '1.2MiB / 3.3MiB'
+TRANSFERRED = re.compile(r"([\d.]+)\s*([KMGT]?i?B)\s*/\s*([\d.]+)\s*([KMGT]?i?B)")
+
+# Lines printed once every layer has been copied
+FINISHING_LINES = ("Writing manifest", "Storing signatures")
+
+# The ID printed by podman once the image is stored
+IMAGE_ID = re.compile(r"[0-9a-f]{64}")
+
+# podman redraws progress bars with carriage returns when it writes to a terminal
+LINE_BREAKS = re.compile(r"[\r\n]")
+
+UNITS = {"B": 1, "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3, "TB": 1000 ** 4,
+         "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3, "TiB": 1024 ** 4}
+
+
+########################################################################################################################
+# PROGRESS
+########################################################################################################################
+class LayerProgress:
+    """
+    The progress of a single layer of an image.
+    """
+
+    __slots__ = ("digest", "state", "current", "total")
+
+    def __init__(self, digest: str):
+        self.digest = digest
+        self.state = COPYING
+        self.current = 0
+        self.total: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state != COPYING
+
+
+def to_bytes(amount: str, unit: str) -> int:
+    return int(float(amount) * UNITS.get(unit, 1))
+
+
+def pull_command(reference: str) -> List[str]:
+    return ["podman", "pull", reference]
+
+
+class PullJob:
+    """
+    A pull of a single image, updated as its progress is reported.
+    """
+
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.state = QUEUED
+        self.layers: Dict[str, LayerProgress] = {}
+        self.message = "Waiting for a free slot"
+        self.error = ""
+        self.image_id: Optional[str] = None
+        self.result: Optional[CompletedProcess] = None
+        self.queued = time.perf_counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.completed = asyncio.Event()
+        # Incremented on every change, so that views only redraw the jobs that changed
+        self.version = 0
+
+    def feed_line(self, line: str) -> None:
+        """
+        Update the progress from a line of output, which is plain text from the CLI and a JSON object from the REST API.
+        :param line: The line.
+        """
+        line = line.strip()
+        if not line:
+            return
+        if line.startswith("{"):
+            try:
+                report = json.loads(line)
+            except ValueError:
+                report = {"stream": line}
+            if report.get("error"):
+                self.error = report["error"].strip()
+                self.message = self.error
+                self.version += 1
+            if report.get("id"):
+                self.image_id = report["id"]
+            for text in report.get("stream", "").splitlines():
+                self.feed_text(text.strip())
+        else:
+            self.feed_text(line)
+
+    def feed_text(self, text: str) -> None:
+        if not text:
+            return
+        if IMAGE_ID.fullmatch(text):
+            self.image_id = text
+            return
+
+        match = COPYING_LINE.match(text)
+        if match:
+            kind, digest, rest = match.groups()
+            if kind == "config":
+                # The configuration is only copied after every layer
+                self.finish_layers()
+            else:
+                layer = self.layers.get(digest)
+                if layer is None:
+                    layer = self.layers[digest] = LayerProgress(digest)
+                if "skipped" in rest:
+                    layer.state = SKIPPED
+                elif "done" in rest:
+                    layer.state = COPIED
+                transferred = TRANSFERRED.search(rest)
+                if transferred:
+                    layer.current = to_bytes(*transferred.groups()[:2])
+                    layer.total = to_bytes(*transferred.groups()[2:])
+        elif text.startswith(FINISHING_LINES):
+            self.finish_layers()
+        self.message = text
+        self.version += 1
+
+    def finish_layers(self) -> None:
+        for layer in self.layers.values():
+            if layer.state == COPYING:
+                layer.state = COPIED
+                layer.current = layer.total or layer.current
+
+    def finish(self, state: str, returncode: int) -> None:
+        """
+        Record the outcome of the pull and wake anything waiting for it.
+        :param state: One of DONE, FAILED or CANCELLED.
+        :param returncode: The return code of the pull.
+        """
+        self.state = state
+        self.finished = time.perf_counter()
+        if state == DONE:
+            self.finish_layers()
+            self.message = f"Pulled {self.image_id[:12]}" if self.image_id else "Pulled"
+        elif state == CANCELLED:
+            self.message = "Cancelled"
+        self.result = CompletedProcess(pull_command(self.reference), returncode,
+                                       stdout=f"{self.image_id}\n" if self.image_id else "", stderr=self.error)
+        self.version += 1
+        self.completed.set()
+
+    @property
+    def layers_finished(self) -> int:
+        return sum(layer.finished for layer in self.layers.values())
+
+    @property
+    def fraction(self) -> float:
+        """
+        The fraction of the pull that is complete, by bytes when every layer reports its size and by layers otherwise.
+        """
+        if self.state == DONE:
+            return 1.0
+        if not self.layers:
+            return 0.0
+        if all(layer.total for layer in self.layers.values()):
+            return (sum(layer.current for layer in self.layers.values()) /
+                    sum(layer.total for layer in self.layers.values()))
+        return self.layers_finished / len(self.layers)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+
+########################################################################################################################
+# PULL MANAGER
+########################################################################################################################
+class PullManager:
+    """
+    Runs image pulls in the background on the event loop of the application, a limited number at a time.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.jobs = {}
+            cls._instance.waiting = deque()
+            cls._instance.active = 0
+            cls._instance.concurrency = int(os.environ.get("ISOPOD_PULL_CONCURRENCY", DEFAULT_CONCURRENCY))
+        return cls._instance
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """
+        Change the number of pulls run at once. Pulls already running are never interrupted.
+        :param concurrency: The number of pulls, at least 1.
+        """
+        self.concurrency = max(concurrency, 1)
+        self.start_waiting()
+
+    def enqueue(self, reference: str) -> PullJob:
+        """
+        Queue an image to be pulled. Must be called from a running event loop.
+        :param reference: The full reference of the image, such as 'docker.io/library/alpine:latest'.
+        :return: The job pulling the image, which is the existing job if the image is already queued or being pulled.
+        """
+        job = self.jobs.get(reference)
+        if job is not None and job.state not in FINISHED_STATES:
+            return job
+
+        # A finished job for the same image is replaced, moving the image to the end of the list
+        self.jobs.pop(reference, None)
+        job = self.jobs[reference] = PullJob(reference)
+        self.waiting.append(job)
+        self.start_waiting()
+        return job
+
+    def cancel(self, reference: str) -> bool:
+        """
+        Cancel a pull, removing it from the queue or stopping it if it has started.
+        :param reference: The reference of the image.
+        :return: True if the pull was cancelled, False if it had already finished.
+        """
+        job = self.jobs.get(reference)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        if job.state == QUEUED:
+            self.waiting.remove(job)
+            job.finish(CANCELLED, -1)
+            LogManager().add_log(f"Pull of {reference} cancelled before it started")
+        else:
+            job.task.cancel()
+        return True
+
+    def get_jobs(self) -> List[PullJob]:
+        return list(self.jobs.values())
+
+    def has_pending(self) -> bool:
+        return any(job.state not in FINISHED_STATES for job in self.jobs.values())
+
+    def clear_finished(self) -> None:
+        self.jobs = {reference: job for reference, job in self.jobs.items() if job.state not in FINISHED_STATES}
+
+    def start_waiting(self) -> None:
+        while self.waiting and self.active < self.concurrency:
+            job = self.waiting.popleft()
+            self.active += 1
+            job.task = asyncio.get_running_loop().create_task(self.run(job))
+
+    async def run(self, job: PullJob) -> None:
+        job.state, job.started, job.message = PULLING, time.perf_counter(), "Starting"
+        job.version += 1
+        command = pull_command(job.reference)
+        status = StreamStatus(command, merge_stderr=True)
+        try:
+            async with aclosing(await stream_podman_async(command, status)) as chunks:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                buffer = ""
+                async for chunk in chunks:
+                    *lines, buffer = LINE_BREAKS.split(buffer + decoder.decode(chunk))
+                    for line in lines:
+                        job.feed_line(line)
+                job.feed_line(buffer + decoder.decode(b"", final=True))
+        except asyncio.CancelledError:
+            job.finish(CANCELLED, -1)
+            LogManager().add_log(f"Pull of {job.reference} cancelled after {job.elapsed:.1f} s")
+            return
+        except OSError as error:
+            # podman is not installed or the Podman service went away
+            job.error = str(error)
+            job.finish(FAILED, PODMAN_ERROR_CODE)
+        else:
+            # The REST API reports a failed pull inside a successful response
+            returncode = status.returncode or (PODMAN_ERROR_CODE if job.error else 0)
+            if returncode and not job.error:
+                job.error = job.message
+            job.finish(FAILED if returncode else DONE, returncode)
+        finally:
+            self.active -= 1
+            self.start_waiting()
+
+        if job.state == DONE:
+            CacheManager().invalidate(IMAGES)
+        LogManager().log_command(command, job.result.returncode, job.result.stdout, job.result.stderr, job.elapsed)
+
+
+async def pull_all(references: Sequence[str], concurrency: Optional[int] = None) -> List[Tuple[str, CompletedProcess]]:
+    """
+    Pull several images through the queue and wait for every one of them.
+    :param references: The full references of the images.
+    :param concurrency: The number of pulls to run at once, or None to keep the current setting.
+    :return: Each reference and the result of its pull.
+    """
+    manager = PullManager()
+    if concurrency is not None:
+        manager.set_concurrency(concurrency)
+    jobs = [manager.enqueue(reference) for reference in references]
+    await asyncio.gather(*(job.completed.wait() for job in jobs))
+    return [(job.reference, job.result) for job in jobs]
@@ -0,0 +1,241 @@
+########################################################################################################################
+# record_manager.py
+# This module provides compact records for the Podman resources shown in tables. Records keep the raw values reported
+# by podman, such as sizes in bytes and creation timestamps, and only format them for display when a row is requested.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+########################################################################################################################
+# RECORDS
+########################################################################################################################
+class Record:
+    """
+    The base class for all resource records. Subclasses declare their fields in __slots__, so a record costs a fixed
+    number of pointers rather than a dictionary and a list of formatted strings.
+    """
+
+    __slots__ = ()
+
+    # The column headers of the table showing records of this type
+    HEADERS: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Record":
+        """
+        Create a record from the JSON podman reports for the resource.
+        :param data: The decoded JSON record.
+        :return: The record.
+        """
+        raise NotImplementedError
+
+    @property
+    def key(self) -> str:
+        """
+        The unique id of the resource, used as the key of its table row.
+        """
+        raise NotImplementedError
+
+    @property
+    def row(self) -> List[str]:
+        """
+        The values shown in the table, in the order of HEADERS.
+        """
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The fields of the record, for serialising it as JSON.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def shared(value: Optional[str]) -> str:
+    """
+    Intern a value that repeats across many resources, such as an image name or a status, so that every record refers
+    to the same string instead of its own decoded copy.
+    :param value: The value.
+    :return: The interned value, or an empty string if the value is missing.
+    """
+    return sys.intern(value) if value else ""
+
+
+def format_date(timestamp: float) -> str:
+    """
+    Format a Unix timestamp as a UTC date.
+    :param timestamp: The number of seconds since the epoch.
+    :return: The date in YYYY-MM-DD format.
+    """
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """
+    Convert an ISO 8601 date reported by podman into a Unix timestamp.
+    :param value: The date.
+    :return: The number of seconds since the epoch, or 0 if the date is missing.
+    """
+    return datetime.fromisoformat(value).timestamp() if value else 0.0
+
+
+class Container(Record):
+    __slots__ = ("id", "image", "command", "created", "created_at", "status", "ports", "names")
+
+    HEADERS = ("CONTAINER ID", "IMAGE", "COMMAND", "CREATED", "STATUS", "PORTS", "NAMES")
+
+    def __init__(self, id: str, image: str, command: Tuple[str, ...], created: int, created_at: str, status: str, ports: Tuple[Tuple[Any, Any, str], ...], names: Tuple[str, ...]):
+        self.id = id
+        self.image = image
+        self.command = command
+        self.created = created
+        self.created_at = created_at
+        self.status = status
+        self.ports = ports
+        self.names = names
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Container":
+        ports = tuple((p["host_port"], p["container_port"], shared(p["protocol"])) for p in (data.get("Ports") or []))
+        return cls(data["Id"], shared(data.get("Image")), tuple(map(shared, data.get("Command") or ())),
+                   data.get("Created") or 0, shared(data.get("CreatedAt")), shared(data.get("Status")), ports,
+                   tuple(data.get("Names") or ()))
+
+    @property
+    def key(self) -> str:
+        return self.id[:12]
+
+    @property
+    def row(self) -> List[str]:
+        ports = ', '.join(f"{host_port}->{container_port}/{protocol}" for host_port, container_port, protocol in self.ports)
+        return [self.id[:12], self.image, ' '.join(self.command), self.created_at, self.status, ports, ', '.join(self.names)]
+
+
+class Image(Record):
+    __slots__ = ("id", "name", "created", "size")
+
+    HEADERS = ("Repository", "Tag", "Image ID", "Created", "Size")
+
+    def __init__(self, id: str, name: Optional[str], created: int, size: int):
+        self.id = id
+        self.name = name
+        self.created = created
+        self.size = size
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Image":
+        names = data.get("Names") or []
+        return cls(data["Id"], names[0] if names else None, data["Created"], data["Size"])
+
+    @property
+    def repository(self) -> str:
+        return self.name.rsplit(":", 1)[0] if self.name else "Unknown"
+
+    @property
+    def tag(self) -> str:
+        return self.name.rsplit(":", 1)[1] if self.name else "Unknown"
+
+    @property
+    def key(self) -> str:
+        return self.id[:12]
+
+    @property
+    def row(self) -> List[str]:
+        # Sizes are shown in megabytes
+        return [self.repository, self.tag, self.id[:12], format_date(self.created), f"{round(self.size / (1024 ** 2), 2)} MB"]
+
+
+class Network(Record):
+    __slots__ = ("id", "name", "driver", "subnets")
+
+    HEADERS = ("Network ID", "Name", "Driver", "Subnet(s)")
+
+    def __init__(self, id: str, name: str, driver: str, subnets: Tuple[str, ...]):
+        self.id = id
+        self.name = name
+        self.driver = driver
+        self.subnets = subnets
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Network":
+        return cls(data["id"], data.get("name"), shared(data.get("driver")),
+                   tuple(x["subnet"] for x in data.get("subnets") or ()))
+
+    @property
+    def key(self) -> str:
+        return self.id[:12]
+
+    @property
+    def row(self) -> List[str]:
+        return [self.id[:12], self.name, self.driver, ", ".join(self.subnets)]
+
+
+class Pod(Record):
+    __slots__ = ("id", "name", "status", "created", "infra_id", "container_count", "networks")
+
+    HEADERS = ("Pod ID", "Name", "Status", "Created", "Infra ID", "# of Containers", "Network(s)")
+
+    def __init__(self, id: str, name: str, status: str, created: float, infra_id: str, container_count: int, networks: Tuple[str, ...]):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.created = created
+        self.infra_id = infra_id
+        self.container_count = container_count
+        self.networks = networks
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Pod":
+        return cls(data["Id"], data.get("Name"), shared(data.get("Status")), parse_timestamp(data.get("Created")),
+                   data.get("InfraId") or "", len(data.get("Containers") or ()),
+                   tuple(map(shared, data.get("Networks") or ())))
+
+    @property
+    def key(self) -> str:
+        return self.id[:12]
+
+    @property
+    def row(self) -> List[str]:
+        return [self.id[:12], self.name, self.status, format_date(self.created), self.infra_id[:12],
+                str(self.container_count), ','.join(self.networks)]
+
+
+class Volume(Record):
+    __slots__ = ("name", "driver", "mountpoint", "created", "labels")
+
+    HEADERS = ("Volume Name", "Driver", "Mountpoint", "Created", "Labels")
+
+    def __init__(self, name: str, driver: str, mountpoint: str, created: float, labels: Tuple[str, ...]):
+        self.name = name
+        self.driver = driver
+        self.mountpoint = mountpoint
+        self.created = created
+        self.labels = labels
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Volume":
+        return cls(data["Name"], shared(data.get("Driver")), data.get("Mountpoint"),
+                   parse_timestamp(data.get("CreatedAt")), tuple(map(shared, (data.get("Labels") or {}).keys())))
+
+    @property
+    def key(self) -> str:
+        return self.name
+
+    @property
+    def row(self) -> List[str]:
+        return [self.name, self.driver, self.mountpoint, format_date(self.created), ', '.join(self.labels)]
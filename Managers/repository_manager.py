@@ -1,15 +1,270 @@
+########################################################################################################################
+# repository_manager.py
+# This module provides a cache of the git repositories used to build images. Each repository is fetched once per URL
+# and ref with a shallow clone, refreshed later by an incremental fetch, and the least recently used checkouts are
+# removed once the cache grows beyond its size or entry limit.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import hashlib
+import json
 import os
-import uuid
+import shutil
+import threading
+import time
 from pathlib import Path
-from git import Repo
+from typing import Dict, List, Optional, Sequence
 
-from Managers.file_manager import create_directory
+from Managers.file_manager import create_directory, delete_directory, directory_size
+from Managers.log_manager import LogManager
 from Managers.system_manager import run_command
 
 
-def clone_github_repository(repo_url: str) -> Path:
-    name = repo_url.split('/')[-1].replace('.git', '')
-    path = Path(os.getcwd()).joinpath('tmp', 'repositories', f'{uuid.uuid4()}', name)
-    create_directory(path)
-    Repo.clone_from(repo_url, str(path))
-    return Path(path)
\ No newline at end of file
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The total size of the cached checkouts, unless overridden by ISOPOD_REPOSITORY_CACHE_BYTES
+REPOSITORY_CACHE_BYTES = 2 * 1024 ** 3
+
+# The number of cached checkouts, unless overridden by ISOPOD_REPOSITORY_CACHE_ENTRIES
+REPOSITORY_CACHE_ENTRIES = 20
+
+# The file recording the URL, ref, size and last use of every checkout
+INDEX_FILE = "index.json"
+
+
+########################################################################################################################
+# REPOSITORY CACHE
+########################################################################################################################
+def default_repository_cache() -> Path:
+    """
+    The directory checkouts are cached in, which is ISOPOD_REPOSITORY_CACHE if set and the isopod/repositories directory
+    of the user's cache directory, $XDG_CACHE_HOME or ~/.cache, otherwise.
+    """
+    if os.environ.get("ISOPOD_REPOSITORY_CACHE"):
+        return Path(os.environ["ISOPOD_REPOSITORY_CACHE"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")
+    return Path(cache_home).joinpath("isopod", "repositories")
+
+
+def repository_name(url: str) -> str:
+    return url.rstrip("/").split("/")[-1].removesuffix(".git")
+
+
+def git(*arguments: str) -> str:
+    """
+    Run a git command, raising an error with the message of git if it fails.
+    :param arguments: The arguments of the command.
+    :return: The output of the command.
+    """
+    result = run_command(["git", *arguments], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(result.stderr.strip() or f"git exited with {result.returncode}")
+    return result.stdout
+
+
+class RepositoryCache:
+    """
+    Checkouts of git repositories keyed by URL and ref. A checkout holds a single commit fetched with depth 1, so it
+    costs the size of the files rather than the whole history, and fetching it again only transfers what changed.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = REPOSITORY_CACHE_BYTES,
+                 max_entries: int = REPOSITORY_CACHE_ENTRIES) -> None:
+        """
+        :param root: The directory checkouts are cached in.
+        :param max_bytes: The total size of the checkouts above which the least recently used are removed.
+        :param max_entries: The number of checkouts above which the least recently used are removed.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # Checkouts of the same repository are serialised, while different repositories are fetched in parallel
+        self.key_locks: Dict[str, threading.Lock] = {}
+
+    def key(self, url: str, ref: Optional[str]) -> str:
+        return hashlib.sha256(f"{url}\0{ref or ''}".encode()).hexdigest()[:16]
+
+    def checkout_path(self, url: str, ref: Optional[str]) -> Path:
+        # The checkout is named after the repository, which is used as the default name of the image built from it
+        return self.root.joinpath(self.key(url, ref), repository_name(url))
+
+    def read_index(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.root.joinpath(INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def write_index(self, index: Dict[str, Dict]) -> None:
+        path = self.root.joinpath(INDEX_FILE)
+        temporary = path.with_suffix(f".{threading.get_ident()}.tmp")
+        temporary.write_text(json.dumps(index, indent=2))
+        os.replace(temporary, path)
+
+    def checkout(self, url: str, ref: Optional[str] = None, sparse_paths: Sequence[str] = ()) -> Path:
+        """
+        Get a checkout of a repository, cloning it on first use and fetching the latest commit of the ref afterwards.
+        Local changes to a cached checkout are discarded.
+        :param url: The URL of the repository, or the path of a local repository.
+        :param ref: The branch, tag or commit to check out, or None for the default branch.
+        :param sparse_paths: Directories to check out instead of the whole tree. Only the contents of these directories
+        are downloaded, as the clone is then partial.
+        :return: The path of the checkout.
+        """
+        key = self.key(url, ref)
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            path = self.checkout_path(url, ref)
+            started = time.perf_counter()
+            refreshed = path.joinpath(".git").is_dir()
+            if not refreshed:
+                delete_directory(path)
+                create_directory(path)
+                git("-C", str(path), "init", "--quiet")
+                git("-C", str(path), "remote", "add", "origin", url)
+            try:
+                self.fetch(path, ref, sparse_paths)
+            except OSError:
+                if not refreshed:
+                    delete_directory(path.parent)
+                raise
+            size = directory_size(path)
+            LogManager().add_log(f"{'Refreshed' if refreshed else 'Cloned'} {url}{f'@{ref}' if ref else ''} in "
+                                 f"{time.perf_counter() - started:.1f} s, {size / 1024 ** 2:.1f} MB on disk")
+
+        with self.lock:
+            index = self.read_index()
+            index[key] = {"url": url, "ref": ref, "path": str(path), "size": size, "last_used": time.time()}
+            self.evict(index, keep=key)
+            self.write_index(index)
+        return path
+
+    @staticmethod
+    def fetch(path: Path, ref: Optional[str], sparse_paths: Sequence[str]) -> None:
+        """
+        Fetch the latest commit of a ref into a checkout and replace the working tree with it.
+        :param path: The path of the checkout.
+        :param ref: The branch, tag or commit, or None for the default branch.
+        :param sparse_paths: Directories to check out instead of the whole tree.
+        """
+        options = ["--depth", "1", "--no-tags", "--quiet"]
+        if sparse_paths:
+            git("-C", str(path), "sparse-checkout", "set", *sparse_paths)
+            # Without a filter the fetch would download every file, including those sparse checkout leaves out
+            options += ["--filter", "blob:none"]
+        else:
+            git("-C", str(path), "sparse-checkout", "disable")
+        git("-C", str(path), "fetch", *options, "origin", ref or "HEAD")
+        git("-C", str(path), "checkout", "--quiet", "--force", "--detach", "FETCH_HEAD")
+        git("-C", str(path), "clean", "--quiet", "-d", "--force", "-x")
+
+    def copy_checkout(self, url: str, ref: Optional[str], destination: Path) -> Path:
+        """
+        Copy the working tree of a cached checkout, so that it can be changed and built from without a refresh of the
+        same checkout replacing it at the same time.
+        :param url: The URL of the repository.
+        :param ref: The branch, tag or commit, or None for the default branch.
+        :param destination: The directory to copy the files into, which may already exist.
+        :return: The destination.
+        """
+        with self.lock:
+            key_lock = self.key_locks.setdefault(self.key(url, ref), threading.Lock())
+        with key_lock:
+            shutil.copytree(self.checkout_path(url, ref), destination, symlinks=True,
+                            ignore=shutil.ignore_patterns(".git"), dirs_exist_ok=True)
+        return destination
+
+    def evict(self, index: Dict[str, Dict], keep: Optional[str] = None) -> List[str]:
+        """
+        Remove the least recently used checkouts until the cache is within its limits.
+        :param index: The index of the cache, updated in place.
+        :param keep: The key of a checkout that must not be removed, such as the one being returned. Checkouts that are
+        being fetched are never removed either.
+        :return: The URLs of the removed checkouts.
+        """
+        evicted = []
+        total = sum(entry["size"] for entry in index.values())
+        for key in sorted(index, key=lambda key: index[key]["last_used"]):
+            if total <= self.max_bytes and len(index) <= self.max_entries:
+                break
+            key_lock = self.key_locks.get(key)
+            if key == keep or (key_lock is not None and key_lock.locked()):
+                continue
+            entry = index.pop(key)
+            delete_directory(self.root.joinpath(key))
+            total -= entry["size"]
+            evicted.append(entry["url"])
+        if evicted:
+            LogManager().add_log(f"Removed {len(evicted)} cached repositories: {', '.join(evicted)}")
+        return evicted
+
+    def clear(self) -> None:
+        with self.lock:
+            for key in self.read_index():
+                delete_directory(self.root.joinpath(key))
+            self.write_index({})
+
+
+_repository_cache: Optional[RepositoryCache] = None
+
+
+def get_repository_cache() -> RepositoryCache:
+    """
+    Get the repository cache shared by the application, creating it on first use.
+    """
+    global _repository_cache
+    if _repository_cache is None:
+        root = default_repository_cache()
+        create_directory(root)
+        _repository_cache = RepositoryCache(root,
+                                            int(os.environ.get("ISOPOD_REPOSITORY_CACHE_BYTES", REPOSITORY_CACHE_BYTES)),
+                                            int(os.environ.get("ISOPOD_REPOSITORY_CACHE_ENTRIES",
+                                                               REPOSITORY_CACHE_ENTRIES)))
+    return _repository_cache
+
+
+def set_repository_cache(cache: Optional[RepositoryCache]) -> None:
+    """
+    Replace the shared repository cache, such as with one rooted in a temporary directory.
+    """
+    global _repository_cache
+    _repository_cache = cache
+
+
+########################################################################################################################
+# CLONING
+########################################################################################################################
+def clone_github_repository(repo_url: str, ref: Optional[str] = None, sparse_paths: Sequence[str] = ()) -> Path:
+    """
+    Check out a repository through the repository cache.
+    :param repo_url: The URL of the repository.
+    :param ref: The branch, tag or commit, or None for the default branch.
+    :param sparse_paths: Directories to check out instead of the whole tree.
+    :return: The path of the checkout.
+    """
+    return get_repository_cache().checkout(repo_url, ref, sparse_paths)
+
+
+async def clone_github_repository_async(repo_url: str, ref: Optional[str] = None,
+                                        sparse_paths: Sequence[str] = ()) -> Path:
+    return await asyncio.to_thread(clone_github_repository, repo_url, ref, sparse_paths)
+
+
+async def copy_github_repository_async(repo_url: str, ref: Optional[str], destination: Path) -> Path:
+    """
+    Copy the cached checkout of a repository into a directory to build from.
+    :param repo_url: The URL of the repository.
+    :param ref: The branch, tag or commit, or None for the default branch.
+    :param destination: The directory.
+    :return: The directory.
+    """
+    return await asyncio.to_thread(get_repository_cache().copy_checkout, repo_url, ref, destination)
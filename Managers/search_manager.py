@@ -0,0 +1,183 @@
+########################################################################################################################
+# search_manager.py
+# This module provides an in-memory index of resource records for filtering tables as the user types. Records are
+# indexed by the trigrams of their names, tags and ids, and by the prefixes of the words in them, so that a query is
+# answered from memory without running podman.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Managers.record_manager import Record
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The number of seconds to wait after a keystroke before searching, so that only the last of a burst is searched
+SEARCH_DELAY = 0.3
+
+# The length of the substrings indexed for each record
+GRAM_SIZE = 3
+
+# Words are separated by anything but letters and digits, such as the '/' and ':' in image names
+WORD_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+########################################################################################################################
+# INDEX
+########################################################################################################################
+def record_text(record: Record) -> str:
+    """
+    The text a record is searched by, which is the values shown in its row, such as its name, tag and short id.
+    :param record: The record.
+    :return: The text, in lower case.
+    """
+    return " ".join(map(str, record.row)).lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[index:index + GRAM_SIZE] for index in range(len(text) - GRAM_SIZE + 1)}
+
+
+def query_terms(query: str) -> List[str]:
+    return query.lower().split()
+
+
+class SearchIndex:
+    """
+    An index of records by the text of their rows. A query matches a record when every whitespace separated term of the
+    query appears in the record. Terms of three or more characters are looked up by their trigrams and match anywhere,
+    while shorter terms are looked up by word prefix and match the start of a word.
+    """
+
+    def __init__(self, records: Iterable[Record] = ()) -> None:
+        self.records: Dict[str, Record] = {}
+        self.texts: Dict[str, str] = {}
+        # The position of each record, so that matches are listed in the order podman reported them
+        self.order: Dict[str, int] = {}
+        self.grams: Dict[str, Set[str]] = defaultdict(set)
+        # The sorted words of every record, paired with the key of the record
+        self.words: List[Tuple[str, str]] = []
+        self.next_position = 0
+
+        for record in records:
+            self.index_record(record)
+        self.words.sort()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def index_record(self, record: Record) -> List[Tuple[str, str]]:
+        key = record.key
+        text = self.texts[key] = record_text(record)
+        self.records[key] = record
+        self.order[key] = self.next_position
+        self.next_position += 1
+        for gram in trigrams(text):
+            self.grams[gram].add(key)
+        words = [(word, key) for word in set(WORD_SEPARATORS.split(text)) if word]
+        self.words.extend(words)
+        return words
+
+    def add(self, record: Record) -> None:
+        """
+        Add a record to the index, replacing the record with the same key if there is one.
+        :param record: The record.
+        """
+        position = self.order.get(record.key)
+        self.remove(record.key)
+        # Words are appended by index_record, so they are moved into sorted position afterwards
+        words = self.index_record(record)
+        del self.words[len(self.words) - len(words):]
+        for word in words:
+            insort(self.words, word)
+        if position is not None:
+            self.order[record.key] = position
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a record from the index.
+        :param key: The key of the record.
+        """
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        del self.records[key]
+        del self.order[key]
+        for gram in trigrams(text):
+            keys = self.grams[gram]
+            keys.discard(key)
+            if not keys:
+                del self.grams[gram]
+        for word in set(WORD_SEPARATORS.split(text)):
+            if word:
+                index = bisect_left(self.words, (word, key))
+                if index < len(self.words) and self.words[index] == (word, key):
+                    del self.words[index]
+
+    def candidates(self, term: str) -> Set[str]:
+        """
+        Find the keys of the records that may contain a term.
+        :param term: A term of the query, in lower case.
+        :return: The keys.
+        """
+        if len(term) < GRAM_SIZE:
+            keys = set()
+            for index in range(bisect_left(self.words, (term, "")), len(self.words)):
+                word, key = self.words[index]
+                if not word.startswith(term):
+                    break
+                keys.add(key)
+            return keys
+
+        keys: Optional[Set[str]] = None
+        # The rarest trigrams are intersected first, which keeps the intermediate sets small
+        for gram in sorted(trigrams(term), key=lambda gram: len(self.grams.get(gram, ()))):
+            postings = self.grams.get(gram)
+            if not postings:
+                return set()
+            keys = set(postings) if keys is None else keys & postings
+            if not keys:
+                break
+        # Trigrams can appear in a record without the whole term, so every candidate is checked
+        return {key for key in keys if term in self.texts[key]}
+
+    def search(self, query: str) -> List[Record]:
+        """
+        Find the records matching a query.
+        :param query: The query, such as 'nginx 1.27'.
+        :return: The matching records in the order they were indexed, or every record if the query is empty.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return list(self.records.values())
+
+        matches: Optional[Set[str]] = None
+        for term in sorted(terms, key=len, reverse=True):
+            keys = self.candidates(term)
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                return []
+        return [self.records[key] for key in sorted(matches, key=self.order.__getitem__)]
+
+
+def matches(record: Record, query: str) -> bool:
+    """
+    Check whether a single record matches a query, by the same rules as SearchIndex.search.
+    :param record: The record.
+    :param query: The query.
+    :return: True if the record matches.
+    """
+    text = record_text(record)
+    words = [word for word in WORD_SEPARATORS.split(text) if word]
+    return all(term in text if len(term) >= GRAM_SIZE else any(word.startswith(term) for word in words)
+               for term in query_terms(query))
@@ -0,0 +1,70 @@
+########################################################################################################################
+# snapshot_manager.py
+# This module provides functionality for fetching every Podman resource inventory concurrently.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, NamedTuple, Optional
+
+from Managers.container_manager import list_containers, list_containers_async
+from Managers.image_manager import list_images, list_images_async
+from Managers.network_manager import list_networks, list_networks_async
+from Managers.pod_manager import list_pods, list_pods_async
+from Managers.record_manager import Container, Image, Network, Pod, Volume
+from Managers.volume_manager import list_volumes, list_volumes_async
+
+
+########################################################################################################################
+# SNAPSHOT FUNCTIONS
+########################################################################################################################
+class Snapshot(NamedTuple):
+    """
+    The containers, images, networks, pods and volumes on the system.
+    """
+
+    containers: List[Container]
+    images: List[Image]
+    networks: List[Network]
+    pods: List[Pod]
+    volumes: List[Volume]
+
+
+def take_snapshot(container_limit: Optional[int] = None, image_limit: Optional[int] = None) -> Snapshot:
+    """
+    Fetch every resource inventory concurrently, so the latency is that of the slowest call rather than the sum.
+    :param container_limit: The number of containers to fetch, or None for all of them.
+    :param image_limit: The number of images to fetch, or None for all of them.
+    :return: The snapshot of the system.
+    """
+    functions = [partial(list_containers, limit=container_limit), partial(list_images, limit=image_limit),
+                 list_networks, list_pods, list_volumes]
+
+    # Each list function blocks on its own podman call, so run them on separate threads
+    with ThreadPoolExecutor(max_workers=len(functions)) as executor:
+        futures = [executor.submit(function) for function in functions]
+        return Snapshot(*[future.result() for future in futures])
+
+
+async def take_snapshot_async(container_limit: Optional[int] = None, image_limit: Optional[int] = None) -> Snapshot:
+    """
+    Fetch every resource inventory concurrently without blocking the event loop.
+    :param container_limit: The number of containers to fetch, or None for all of them.
+    :param image_limit: The number of images to fetch, or None for all of them.
+    :return: The snapshot of the system.
+    """
+    results = await asyncio.gather(
+        list_containers_async(limit=container_limit),
+        list_images_async(limit=image_limit),
+        list_networks_async(),
+        list_pods_async(),
+        list_volumes_async(),
+    )
+    return Snapshot(*results)
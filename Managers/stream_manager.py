@@ -0,0 +1,193 @@
+########################################################################################################################
+# stream_manager.py
+# This module provides incremental decoding of the JSON arrays printed by podman list commands, so that resources can be
+# turned into records as they arrive rather than after the whole output has been buffered.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from Managers.backend_manager import StreamStatus, stream_podman, stream_podman_async
+from Managers.log_manager import LogManager
+from Managers.record_manager import Record
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# Whitespace and the commas separating array elements
+SEPARATORS = re.compile(r"[\s,]*")
+
+R = TypeVar("R", bound=Record)
+
+
+########################################################################################################################
+# DECODING
+########################################################################################################################
+class JsonArrayDecoder:
+    """
+    Decodes the elements of a top-level JSON array from a sequence of byte chunks. Only the element currently being
+    received is buffered, so memory is bounded by the largest element rather than the whole array.
+    """
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.buffer = ""
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Add a chunk of output and decode every element it completes.
+        :param chunk: The next chunk of output.
+        :return: The decoded elements.
+        """
+        buffer = self.buffer + self.text_decoder.decode(chunk)
+        records = []
+        position = 0
+
+        while not self.finished:
+            position = SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if not self.started:
+                if buffer[position] != "[":
+                    raise ValueError(f"Expected a JSON array, found {buffer[position:position + 20]!r}")
+                self.started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                self.finished = True
+                position += 1
+                break
+            try:
+                record, end = self.decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element is incomplete, so wait for the next chunk
+                break
+            # A scalar at the end of the buffer may continue in the next chunk
+            if end == len(buffer) and not isinstance(record, (dict, list)):
+                break
+            records.append(record)
+            position = end
+
+        self.buffer = buffer[position:]
+        return records
+
+    def close(self) -> None:
+        """
+        Check that the output ended with a complete array, or was empty.
+        """
+        if self.started and not self.finished:
+            raise ValueError("The JSON array ended before it was closed")
+
+
+def iter_json_array(chunks: Iterator[bytes]) -> Iterator[Any]:
+    """
+    Decode the elements of a JSON array as its chunks arrive.
+    :param chunks: The chunks of output.
+    :return: An iterator of decoded elements.
+    """
+    decoder = JsonArrayDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    decoder.close()
+
+
+async def aiter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Decode the elements of a JSON array as its chunks arrive, without blocking the event loop.
+    :param chunks: The chunks of output.
+    :return: An iterator of decoded elements.
+    """
+    decoder = JsonArrayDecoder()
+    async for chunk in chunks:
+        for record in decoder.feed(chunk):
+            yield record
+    decoder.close()
+
+
+########################################################################################################################
+# INVENTORIES
+########################################################################################################################
+def iter_inventory(command: List[str], record_type: Type[R], offset: int = 0, limit: Optional[int] = None, status: Optional[StreamStatus] = None) -> Iterator[R]:
+    """
+    Run a podman list command and yield one record per resource as the output arrives. The command is stopped as soon
+    as the last record of the window has been read.
+    :param command: The podman list command.
+    :param record_type: The record class of the resource.
+    :param offset: The index of the first resource to include.
+    :param limit: The maximum number of resources to include, or None for every remaining resource.
+    :param status: Filled in with the outcome of the command, or None if the caller does not need it.
+    :return: An iterator of records.
+    """
+    status = status or StreamStatus(command)
+    chunks = stream_podman(command, status)
+    try:
+        for index, data in enumerate(iter_json_array(chunks)):
+            if limit is not None and index >= offset + limit:
+                status.stopped_early = True
+                break
+            if index >= offset:
+                yield record_type.from_json(data)
+    finally:
+        chunks.close()
+        LogManager().log_command(command, 0 if status.succeeded else status.returncode, None, status.stderr,
+                                 status.duration, status.size)
+
+
+async def aiter_inventory(command: List[str], record_type: Type[R], offset: int = 0, limit: Optional[int] = None, status: Optional[StreamStatus] = None) -> AsyncIterator[R]:
+    """
+    Run a podman list command and yield one record per resource as the output arrives, without blocking the event
+    loop.
+    :param command: The podman list command.
+    :param record_type: The record class of the resource.
+    :param offset: The index of the first resource to include.
+    :param limit: The maximum number of resources to include, or None for every remaining resource.
+    :param status: Filled in with the outcome of the command, or None if the caller does not need it.
+    :return: An iterator of records.
+    """
+    status = status or StreamStatus(command)
+    chunks = await stream_podman_async(command, status)
+    try:
+        index = 0
+        async for data in aiter_json_array(chunks):
+            if limit is not None and index >= offset + limit:
+                status.stopped_early = True
+                break
+            if index >= offset:
+                yield record_type.from_json(data)
+            index += 1
+    finally:
+        await chunks.aclose()
+        LogManager().log_command(command, 0 if status.succeeded else status.returncode, None, status.stderr,
+                                 status.duration, status.size)
+
+
+def load_inventory(command: List[str], record_type: Type[R], offset: int = 0, limit: Optional[int] = None) -> Tuple[List[R], bool]:
+    """
+    Collect the records of a podman list command.
+    :return: The records, and whether the command succeeded.
+    """
+    status = StreamStatus(command)
+    records = list(iter_inventory(command, record_type, offset, limit, status))
+    return records, status.succeeded
+
+
+async def load_inventory_async(command: List[str], record_type: Type[R], offset: int = 0, limit: Optional[int] = None) -> Tuple[List[R], bool]:
+    """
+    Collect the records of a podman list command without blocking the event loop.
+    :return: The records, and whether the command succeeded.
+    """
+    status = StreamStatus(command)
+    records = [record async for record in aiter_inventory(command, record_type, offset, limit, status)]
+    return records, status.succeeded
@@ -1,22 +1,75 @@
+import asyncio
 import os
 import shlex
 import subprocess
 import sys
+import time
 from pathlib import Path
 from subprocess import CompletedProcess
 from typing import Optional, Dict, List, Tuple
 
-from Managers.navigation_manager import NavigationManager
+from Managers.profile_manager import ProfileManager, calling_function
 
 
 def run_command(command: List[str], shell=False, capture_output=False, text=False, env: Optional[List[Tuple[str, str]]]=None) -> CompletedProcess:
+    """
+    Run a command, recording its wall time, spawn time and output size with the ProfileManager.
+    :param command: The command to run.
+    :param shell: Whether to run the command through the shell.
+    :param capture_output: Whether to capture the standard output and error output.
+    :param text: Whether to decode the captured output as text.
+    :param env: Additional environment variables.
+    :return: A CompletedProcess object containing the result of the command.
+    """
     merged_env = os.environ.copy()
     if env:
         merged_env.update(dict(env))
 
-    return subprocess.run(command, shell=shell, capture_output=capture_output, text=text, env=merged_env)
+    pipe = subprocess.PIPE if capture_output else None
+    started = time.perf_counter()
+    with subprocess.Popen(command, shell=shell, stdout=pipe, stderr=pipe, text=text, env=merged_env) as process:
+        spawn = time.perf_counter() - started
+        try:
+            stdout, stderr = process.communicate()
+        except BaseException:
+            process.kill()
+            raise
+
+    ProfileManager().record(command, calling_function(), "cli", time.perf_counter() - started, spawn,
+                            bytes_out=len(stdout or "") + len(stderr or ""), returncode=process.returncode)
+    return CompletedProcess(command, process.returncode, stdout=stdout, stderr=stderr)
+
+async def run_command_async(command: List[str], env: Optional[List[Tuple[str, str]]] = None) -> CompletedProcess:
+    """
+    Run a command without blocking the event loop, capturing its output as text.
+    The process is killed if the awaiting task is cancelled.
+    :param command: The command to run.
+    :param env: Additional environment variables.
+    :return: A CompletedProcess object containing the result of the command.
+    """
+    merged_env = os.environ.copy()
+    if env:
+        merged_env.update(dict(env))
+
+    caller = calling_function()
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(*command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=merged_env)
+    spawn = time.perf_counter() - started
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+
+    ProfileManager().record(command, caller, "cli", time.perf_counter() - started, spawn,
+                            bytes_out=len(stdout) + len(stderr), returncode=process.returncode)
+    return CompletedProcess(command, process.returncode, stdout=stdout.decode(errors='replace'), stderr=stderr.decode(errors='replace'))
 
 def run_command_interactive(command: List[str], env: Optional[List[Tuple[str, str]]] = None) -> None:
+    # Imported here so that the headless command line interface never loads Textual
+    from Managers.navigation_manager import NavigationManager
+
     nav_manager = NavigationManager()
     nav_manager.app.exit()
     merged_env = os.environ.copy()
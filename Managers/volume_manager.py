@@ -1,50 +1,100 @@
-import json
-from datetime import datetime, timezone
-from typing import List
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional
+from Managers.backend_manager import run_podman, run_podman_async
+from Managers.cache_manager import VOLUMES, fetch_inventory, fetch_inventory_async, invalidates
 from Managers.log_manager import LogManager
-from Managers.system_manager import run_command
+from Managers.record_manager import Volume
+from Managers.stream_manager import iter_inventory, aiter_inventory, load_inventory, load_inventory_async
 
 
-def list_volumes() -> List[List[str]]:
+LIST_VOLUMES_COMMAND = ["podman", "volume", "ls", "--format", "json"]
+
+
+def iter_volumes() -> Iterator[Volume]:
+    """
+    Stream all podman volumes as the output of podman arrives.
+    :return: An iterator of volumes.
+    """
+    return iter_inventory(LIST_VOLUMES_COMMAND, Volume)
+
+def aiter_volumes() -> AsyncIterator[Volume]:
+    """
+    Stream all podman volumes without blocking the event loop.
+    :return: An iterator of volumes.
+    """
+    return aiter_inventory(LIST_VOLUMES_COMMAND, Volume)
+
+def list_volumes() -> List[Volume]:
     """
     List all podman volumes with their details.
-    :return: A list of volumes with their details.
+    :return: A list of volumes.
     """
-    cmd = ["podman", "volume", "ls", "--format", "json"]
+    return fetch_inventory(VOLUMES, partial(load_inventory, LIST_VOLUMES_COMMAND, Volume))
 
-    headers = ["Volume Name", "Driver", "Mountpoint", "Created", "Labels"]
-    data = [headers]
+async def list_volumes_async() -> List[Volume]:
+    """
+    List all podman volumes with their details without blocking the event loop.
+    :return: A list of volumes.
+    """
+    return await fetch_inventory_async(VOLUMES, partial(load_inventory_async, LIST_VOLUMES_COMMAND, Volume))
 
-    result = run_command(cmd, capture_output=True, text=True)
+def find_volume(name: str) -> Optional[Volume]:
+    """
+    Look up a single volume.
+    :param name: The name of the volume.
+    :return: The volume, or None if it does not exist.
+    """
+    cmd = ["podman", "volume", "ls", "--filter", f"name={name}", "--format", "json"]
+    volumes = list(iter_inventory(cmd, Volume))
+    return next((volume for volume in volumes if volume.key == name), None)
 
-    if result.returncode == 0:
-        content = json.loads(result.stdout)
-        for volume in content:
-            volume_name = volume.get("Name")
-            driver = volume.get("Driver")
-            mountpoint = volume.get("Mountpoint")
-            created = datetime.fromisoformat(volume.get("CreatedAt")).astimezone(timezone.utc).strftime("%Y-%m-%d")
-            labels = ', '.join(volume.get("Labels", {}).keys())
+async def find_volume_async(name: str) -> Optional[Volume]:
+    """
+    Look up a single volume without blocking the event loop.
+    :param name: The name of the volume.
+    :return: The volume, or None if it does not exist.
+    """
+    cmd = ["podman", "volume", "ls", "--filter", f"name={name}", "--format", "json"]
+    volumes = [volume async for volume in aiter_inventory(cmd, Volume)]
+    return next((volume for volume in volumes if volume.key == name), None)
 
-            data.append([volume_name, driver, mountpoint, created, labels])
+@invalidates(VOLUMES)
+def create_volume(name: str):
+    cmd = ['podman', 'volume', 'create', name]
+    result = run_podman(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
-    return data
+    return result
 
-def create_volume(name: str):
+@invalidates(VOLUMES)
+
+async def create_volume_async(name: str):
     cmd = ['podman', 'volume', 'create', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
 
     return result
 
+@invalidates(VOLUMES)
+
 def remove_volume(name: str):
     cmd = ['podman', 'volume', 'rm', name]
-    result = run_command(cmd, capture_output=True, text=True)
+    result = run_podman(cmd)
+
+    log_manager = LogManager()
+    log_manager.write_system_log(result)
+
+    return result
+
+@invalidates(VOLUMES)
+
+async def remove_volume_async(name: str):
+    cmd = ['podman', 'volume', 'rm', name]
+    result = await run_podman_async(cmd)
 
     log_manager = LogManager()
     log_manager.write_system_log(result)
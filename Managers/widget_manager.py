@@ -1,14 +1,464 @@
-from typing import List, Optional, Any
+import asyncio
+from typing import List, Optional, Any, Awaitable, Callable, Iterable, Iterator, Sequence, Tuple, Type, TypeVar
+from textual.coordinate import Coordinate
 from textual.screen import Screen
 from textual.widgets import DataTable
 
+from Managers.record_manager import Record
+from Managers.search_manager import SearchIndex, matches
 
-def populate_table(screen: Screen, table_id: str, data: List[List[str]]):
+
+# The number of rows a windowed table fetches at a time
+PAGE_SIZE = 200
+
+# How many rows before the end of a window the next page is fetched
+PREFETCH_MARGIN = 50
+
+
+def populate_table(screen: Screen, table_id: str, data: List[List[str]], key_column: Optional[int] = None):
+    """
+    Populate a table. When a key column is given and the headers are unchanged, only the rows and cells that differ
+    from the current contents are touched, which keeps the cursor position and avoids a full re-render.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param data: The header row followed by the data rows.
+    :param key_column: The column holding a unique id used as the row key, which enables row-level changes.
+    """
+    table = screen.query_one(f'#{table_id}', DataTable)
+    if key_column is None:
+        table.clear()
+        table.columns.clear()
+        table.add_columns(*data[0])
+        table.add_rows(data[1:])
+    else:
+        set_keyed_rows(table, data[0], [(row[key_column], row) for row in data[1:]])
+
+def populate_records(screen: Screen, table_id: str, record_type: Type[Record], records: Iterable[Record]) -> None:
+    """
+    Populate a table with resource records, keyed by the id of each resource. Only the rows and cells that differ from
+    the current contents are touched.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param record_type: The record class, which provides the headers.
+    :param records: The records.
+    """
     table = screen.query_one(f'#{table_id}', DataTable)
+    set_keyed_rows(table, record_type.HEADERS, [(record.key, record.row) for record in records])
+
+def set_keyed_rows(table: DataTable, headers: Sequence[str], keyed_rows: List[Tuple[str, List[str]]]) -> None:
+    """
+    Fill a table with keyed rows, diffing them against the current contents if the headers are unchanged.
+    :param table: The table.
+    :param headers: The column headers.
+    :param keyed_rows: The key and contents of each row.
+    """
+    if [column.label.plain for column in table.ordered_columns] == [str(header) for header in headers]:
+        diff_table_rows(table, keyed_rows)
+        return
+
     table.clear()
     table.columns.clear()
-    table.add_columns(*data[0])
-    table.add_rows(data[1:])
+    table.add_columns(*headers)
+    for key, row in keyed_rows:
+        table.add_row(*row, key=key)
+
+def diff_table_rows(table: DataTable, keyed_rows: List[Tuple[str, List[str]]]) -> None:
+    """
+    Bring the rows of a keyed table in line with new data, removing, updating and adding only what changed.
+    :param table: The table.
+    :param keyed_rows: The key and contents of each new row.
+    """
+    keys = [key for key, _ in keyed_rows]
+    new_keys = set(keys)
+    kept = [row.key.value for row in table.ordered_rows if row.key.value in new_keys]
+    # DataTable can only append rows, so new rows may be added in place only when they all come after the kept ones
+    if keys[:len(kept)] != kept:
+        replace_table_rows(table, keyed_rows)
+        return
+    for row_key in [row_key for row_key in table.rows if row_key.value not in new_keys]:
+        table.remove_row(row_key)
+    for key, row in keyed_rows:
+        change_table_row(table, key, row)
+
+def replace_table_rows(table: DataTable, keyed_rows: List[Tuple[str, List[str]]]) -> None:
+    """
+    Replace every row of a table in the given order, keeping the cursor on the row it was on if that row remains.
+    :param table: The table.
+    :param keyed_rows: The key and contents of each row.
+    """
+    cursor_key = get_cursor_row_key(table)
+    table.clear()
+    for key, row in keyed_rows:
+        table.add_row(*row, key=key)
+    restore_cursor_row(table, cursor_key)
+
+def get_cursor_row_key(table: DataTable) -> Optional[str]:
+    """
+    Get the key of the row under the cursor of a table.
+    :param table: The table.
+    :return: The key of the row, or None if the table is empty.
+    """
+    if not table.row_count or not table.is_valid_row_index(table.cursor_row):
+        return None
+    return table.ordered_rows[table.cursor_row].key.value
+
+def restore_cursor_row(table: DataTable, key: Optional[str]) -> None:
+    """
+    Move the cursor of a table back onto a row after the rows were rearranged.
+    :param table: The table.
+    :param key: The key of the row the cursor was on.
+    """
+    if key is not None and key in table.rows:
+        table.move_cursor(row=table.get_row_index(key), scroll=False)
+
+async def populate_table_async(screen: Screen, table_id: str, data: Awaitable[List[List[str]]], key_column: Optional[int] = None):
+    """
+    Populate a table with data that is still being fetched, showing a loading indicator in the meantime.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param data: An awaitable that produces the table data.
+    :param key_column: The column holding a unique id used as the row key.
+    """
+    table = screen.query_one(f'#{table_id}', DataTable)
+    table.loading = True
+    try:
+        rows = await data
+    finally:
+        table.loading = False
+    populate_table(screen, table_id, rows, key_column)
+
+async def populate_records_async(screen: Screen, table_id: str, record_type: Type[Record], records: Awaitable[List[Record]]):
+    """
+    Populate a table with records that are still being fetched, showing a loading indicator in the meantime.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param record_type: The record class, which provides the headers.
+    :param records: An awaitable that produces the records.
+    """
+    table = screen.query_one(f'#{table_id}', DataTable)
+    table.loading = True
+    try:
+        fetched = await records
+    finally:
+        table.loading = False
+    populate_records(screen, table_id, record_type, fetched)
+
+T = TypeVar('T')
+
+async def populate_tables_async(screen: Screen, table_ids: List[str], data: Awaitable[T]) -> T:
+    """
+    Show a loading indicator on several tables while the data they will be populated from is fetched.
+    :param screen: The screen containing the tables.
+    :param table_ids: The ids of the tables.
+    :param data: An awaitable that produces the data.
+    :return: The fetched data, for the caller to populate the tables with.
+    """
+    tables = [screen.query_one(f'#{table_id}', DataTable) for table_id in table_ids]
+    for table in tables:
+        table.loading = True
+    try:
+        return await data
+    finally:
+        for table in tables:
+            table.loading = False
+
+def apply_row_change(screen: Screen, table_id: str, key: str, row: Optional[List[str]],
+                     index: Optional[int] = None) -> None:
+    """
+    Insert, update or delete a single row of a table populated with a key column.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param key: The key of the row.
+    :param row: The new contents of the row, or None to delete it.
+    :param index: Where to insert the row if it is new, or None to append it.
+    """
+    table = screen.query_one(f'#{table_id}', DataTable)
+    # The table has not been populated yet, so there are no columns to fill
+    if not table.columns:
+        return
+    change_table_row(table, key, row, index)
+
+def apply_record_change(screen: Screen, table_id: str, key: str, record: Optional[Record],
+                        index: Optional[int] = 0) -> None:
+    """
+    Insert, update or delete the row of a single resource record. A new record is inserted at the top by default,
+    where the inventory lists the most recently created resource.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :param key: The key of the row.
+    :param record: The new record, or None to delete the row.
+    :param index: Where to insert the row if it is new, or None to append it.
+    """
+    apply_row_change(screen, table_id, key, record.row if record is not None else None, index)
+
+def change_table_row(table: DataTable, key: str, row: Optional[List[str]], index: Optional[int] = None) -> None:
+    """
+    Insert, update or delete a single row of a table, updating only the cells that changed.
+    :param table: The table.
+    :param key: The key of the row.
+    :param row: The new contents of the row, or None to delete it.
+    :param index: Where to insert the row if it is new, or None to append it.
+    """
+    exists = key in table.rows
+    if row is None:
+        if exists:
+            table.remove_row(key)
+    elif exists:
+        row_index = table.get_row_index(key)
+        for column_index, value in enumerate(row):
+            if table.get_cell_at(Coordinate(row_index, column_index)) != value:
+                table.update_cell_at(Coordinate(row_index, column_index), value, update_width=True)
+    elif index is None or index >= table.row_count:
+        table.add_row(*row, key=key)
+    else:
+        insert_table_row(table, index, key, row)
+
+def insert_table_row(table: DataTable, index: int, key: str, row: List[str]) -> None:
+    """
+    Insert a row into a table at a given position by re-adding the rows below it.
+    :param table: The table.
+    :param index: The position of the new row.
+    :param key: The key of the row.
+    :param row: The contents of the row.
+    """
+    cursor_key = get_cursor_row_key(table)
+    below = [(table_row.key, table.get_row(table_row.key)) for table_row in table.ordered_rows[index:]]
+    for row_key, _ in below:
+        table.remove_row(row_key)
+    table.add_row(*row, key=key)
+    for row_key, cells in below:
+        table.add_row(*cells, key=row_key.value)
+    restore_cursor_row(table, cursor_key)
+
+class TableWindow:
+    """
+    A window onto an inventory too large to load at once. The table starts with a single page of rows and the next
+    page is fetched and appended when the cursor or viewport comes within the prefetch margin of the last loaded row.
+
+    While a filter is applied the table instead shows every matching record of the whole inventory, which is listed
+    once into a search index and then searched in memory on every change of the filter.
+    """
+
+    def __init__(self, screen: Screen, table_id: str, record_type: Type[Record],
+                 fetch_page: Callable[[int, int], Awaitable[List[Record]]], page_size: int = PAGE_SIZE,
+                 margin: int = PREFETCH_MARGIN) -> None:
+        """
+        :param screen: The screen containing the table.
+        :param table_id: The id of the table.
+        :param record_type: The record class, which provides the headers.
+        :param fetch_page: A function taking an offset and a limit that fetches the records in that page.
+        :param page_size: The number of rows fetched at a time.
+        :param margin: How many rows before the end of the window the next page is fetched.
+        """
+        self.screen = screen
+        self.table_id = table_id
+        self.record_type = record_type
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.margin = margin
+        self.loaded = 0
+        self.exhausted = False
+        self.extending = False
+        self.query = ''
+        self.index: Optional[SearchIndex] = None
+
+    @property
+    def table(self) -> DataTable:
+        return self.screen.query_one(f'#{self.table_id}', DataTable)
+
+    @property
+    def window_size(self) -> int:
+        """
+        The number of rows to fetch when the window is refreshed, which keeps every page loaded so far.
+        """
+        return max(self.loaded, self.page_size)
+
+    def load(self, records: List[Record], requested: int) -> None:
+        """
+        Replace the contents of the window with records fetched from the start of the inventory.
+        :param records: The records.
+        :param requested: The number of records that were asked for, used to tell whether more remain.
+        """
+        # The inventory has been listed again, so the index is rebuilt by the next search
+        self.index = None
+        if self.query:
+            return
+        populate_records(self.screen, self.table_id, self.record_type, records)
+        self.loaded = len(records)
+        self.exhausted = self.loaded < requested
+
+    async def reset(self) -> None:
+        """
+        Refetch the rows in the window, showing a loading indicator in the meantime.
+        """
+        if self.query:
+            self.index = None
+            await self.filter(self.query)
+            return
+        requested = self.window_size
+        table = self.table
+        table.loading = True
+        try:
+            records = await self.fetch_page(0, requested)
+        finally:
+            table.loading = False
+        self.load(records, requested)
+
+    def needs_more(self) -> bool:
+        """
+        Check whether the cursor or the bottom of the viewport is within the prefetch margin of the last loaded row.
+        :return: True if the next page should be fetched.
+        """
+        if self.exhausted or self.extending:
+            return False
+        table = self.table
+        last_visible_row = int(table.scroll_y) + table.size.height
+        return max(table.cursor_row, last_visible_row) >= self.loaded - self.margin
+
+    async def extend(self) -> None:
+        """
+        Fetch the next page and append it to the table.
+        """
+        if self.exhausted or self.extending:
+            return
+        self.extending = True
+        try:
+            records = await self.fetch_page(self.loaded, self.page_size)
+        finally:
+            self.extending = False
+        if self.query:
+            return
+
+        table = self.table
+        if not table.columns:
+            populate_records(self.screen, self.table_id, self.record_type, records)
+        else:
+            # Resources created since the window was loaded shift the inventory, so a row may already be present
+            for record in records:
+                change_table_row(table, record.key, record.row)
+        self.loaded += len(records)
+        self.exhausted = len(records) < self.page_size
+
+    async def filter(self, query: str) -> None:
+        """
+        Show only the records matching a query, or the first page of the inventory again if the query is empty.
+        :param query: The query, matched against the names, tags and ids of the records.
+        """
+        self.query = query.strip()
+        if not self.query:
+            await self.reset()
+            return
+
+        if self.index is None:
+            table = self.table
+            table.loading = True
+            try:
+                records = await self.fetch_page(0, None)
+                self.index = await asyncio.to_thread(SearchIndex, records)
+            finally:
+                table.loading = False
+        records = self.index.search(self.query)
+        populate_records(self.screen, self.table_id, self.record_type, records)
+        # Every match is already shown, so there is nothing further to fetch
+        self.loaded, self.exhausted = len(records), True
+
+    def apply_change(self, key: str, record: Optional[Record]) -> None:
+        """
+        Insert, update or delete the row of a single record, keeping the search index in step with the inventory.
+        :param key: The key of the row.
+        :param record: The new record, or None to delete the row.
+        """
+        if self.index is not None:
+            if record is None:
+                self.index.remove(key)
+            else:
+                self.index.add(record)
+        if self.query and record is not None and not matches(record, self.query):
+            record = None
+        present = key in self.table.rows
+        apply_record_change(self.screen, self.table_id, key, record)
+        # Rows added or removed at the top shift the offset the next page is fetched from
+        if not self.query and self.table.columns:
+            if record is not None and not present:
+                self.loaded += 1
+            elif record is None and present:
+                self.loaded -= 1
+
+
+class PagedTable:
+    """
+    A table filled from an iterator of pages of rows, such as a Docker Hub listing followed through its next links.
+    The first page is loaded when the listing starts and each further page is appended when the cursor or viewport
+    comes within the prefetch margin of the last row.
+    """
+
+    def __init__(self, screen: Screen, table_id: str, margin: int = PREFETCH_MARGIN) -> None:
+        """
+        :param screen: The screen containing the table.
+        :param table_id: The id of the table.
+        :param margin: How many rows before the end of the table the next page is fetched.
+        """
+        self.screen = screen
+        self.table_id = table_id
+        self.margin = margin
+        self.pages: Optional[Iterator[List[List[Any]]]] = None
+        self.loaded = 0
+        self.exhausted = True
+        self.extending = False
+
+    @property
+    def table(self) -> DataTable:
+        return self.screen.query_one(f'#{self.table_id}', DataTable)
+
+    async def start(self, headers: Sequence[str], pages: Iterator[List[List[Any]]]) -> None:
+        """
+        Replace the contents of the table with the first page of a listing, showing a loading indicator in the meantime.
+        :param headers: The headers of the table.
+        :param pages: The pages of rows, which are read on a worker thread.
+        """
+        self.pages, self.loaded, self.exhausted = pages, 0, False
+        table = self.table
+        table.loading = True
+        try:
+            rows = await asyncio.to_thread(next, pages, None)
+        finally:
+            table.loading = False
+        table.clear(columns=True)
+        table.add_columns(*headers)
+        self.append(rows)
+
+    def append(self, rows: Optional[List[List[Any]]]) -> None:
+        if rows is None:
+            self.exhausted = True
+            return
+        self.table.add_rows(rows)
+        self.loaded += len(rows)
+
+    def needs_more(self) -> bool:
+        """
+        Check whether the cursor or the bottom of the viewport is within the prefetch margin of the last loaded row.
+        :return: True if the next page should be fetched.
+        """
+        if self.exhausted or self.extending:
+            return False
+        table = self.table
+        last_visible_row = int(table.scroll_y) + table.size.height
+        return max(table.cursor_row, last_visible_row) >= self.loaded - self.margin
+
+    async def extend(self) -> None:
+        """
+        Read the next page and append it to the table, unless another listing has started in the meantime.
+        """
+        if self.exhausted or self.extending:
+            return
+        pages = self.pages
+        self.extending = True
+        try:
+            rows = await asyncio.to_thread(next, pages, None)
+        finally:
+            self.extending = False
+        if pages is self.pages:
+            self.append(rows)
 
 def get_selected_table_row(screen: Screen, table_id: str) -> Optional[List[str]]:
     table = screen.query_one(f'#{table_id}', DataTable)
@@ -18,6 +468,19 @@ def get_selected_table_row(screen: Screen, table_id: str) -> Optional[List[str]]
         return table.get_row_at(row)
     return None
 
+def get_selected_row_key(screen: Screen, table_id: str) -> Optional[str]:
+    """
+    Get the key of the selected row of a keyed table, which is the id of the resource it shows.
+    :param screen: The screen containing the table.
+    :param table_id: The id of the table.
+    :return: The key, or None if the table is empty.
+    """
+    table = screen.query_one(f'#{table_id}', DataTable)
+    if not table.row_count:
+        return None
+    row_key, _ = table.coordinate_to_cell_key(table.cursor_coordinate)
+    return row_key.value
+
 def get_selected_table_cell(screen: Screen, table_id: str) -> Optional[str]:
     table = screen.query_one(f'#{table_id}', DataTable)
     coordinate = table.cursor_coordinate
@@ -0,0 +1,278 @@
+########################################################################################################################
+# workspace_manager.py
+# This module manages the temporary directories images are built in. A workspace is only created on disk once a build
+# needs it, its owner and last use are recorded, and a background thread removes workspaces that are no longer owned
+# or have not been used for a while, as well as the least recently used ones whenever the workspaces together exceed a
+# disk quota. Only workspaces recorded in the index are ever removed, and never while an image is being built in one.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from Managers.build_manager import BuildManager, FINISHED_STATES
+from Managers.file_manager import create_directory, directory_size, remove_tree
+from Managers.log_manager import LogManager
+
+
+########################################################################################################################
+# CONSTANTS
+########################################################################################################################
+# The number of seconds after its last use that an owned workspace is removed, unless overridden by ISOPOD_WORKSPACE_TTL
+WORKSPACE_TTL = 7 * 24 * 60 * 60
+
+# The total size of the workspaces, unless overridden by ISOPOD_WORKSPACE_QUOTA
+WORKSPACE_QUOTA = 1024 ** 3
+
+# Workspaces used by a running owner within this many seconds are never removed to meet the quota
+ACTIVE_PERIOD = 60 * 60
+
+# The number of seconds between two runs of the reaper
+REAP_INTERVAL = 10 * 60
+
+# The number of threads deleting files at once
+DELETE_THREADS = 8
+
+# The file recording the owner and last use of every workspace
+INDEX_FILE = "index.json"
+
+# The file locked while the index is read and written, which is shared by every running instance of the application
+LOCK_FILE = "index.lock"
+
+
+########################################################################################################################
+# WORKSPACES
+########################################################################################################################
+def default_workspace_root() -> Path:
+    """
+    Determine the directory workspaces are kept in, which is ISOPOD_WORKSPACE_ROOT if it is set.
+    :return: The directory.
+    """
+    if os.environ.get("ISOPOD_WORKSPACE_ROOT"):
+        return Path(os.environ["ISOPOD_WORKSPACE_ROOT"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home().joinpath(".cache")
+    return Path(cache_home).joinpath("isopod", "workspaces")
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def building_paths() -> Set[Path]:
+    """
+    The directories of the builds that have not finished yet. May be called from any thread, as the jobs are read from
+    a snapshot taken under the lock of the BuildManager.
+    """
+    return {Path(job.path).resolve() for job in BuildManager().get_jobs() if job.state not in FINISHED_STATES}
+
+
+class WorkspaceManager:
+    """
+    Hands out build workspaces and reaps them. The index of workspaces is kept on disk and locked while it is changed,
+    so that several running instances share it and workspaces left behind by an earlier run are reaped as well.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.configure(default_workspace_root(),
+                                    float(os.environ.get("ISOPOD_WORKSPACE_TTL", WORKSPACE_TTL)),
+                                    int(os.environ.get("ISOPOD_WORKSPACE_QUOTA", WORKSPACE_QUOTA)))
+        return cls._instance
+
+    def configure(self, root: Path, ttl: float, quota: int) -> None:
+        """
+        Set where workspaces are kept and when they are reaped.
+        :param root: The directory holding the workspaces.
+        :param ttl: The number of seconds after its last use that a workspace is reaped.
+        :param quota: The total size in bytes above which the least recently used workspaces are reaped.
+        """
+        self.root = root
+        self.ttl = ttl
+        self.quota = quota
+        self.lock = threading.Lock()
+        self.reaper: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def read_index(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.root.joinpath(INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def write_index(self, index: Dict[str, Dict]) -> None:
+        path = self.root.joinpath(INDEX_FILE)
+        temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_text(json.dumps(index, indent=2))
+        os.replace(temporary, path)
+
+    @contextmanager
+    def locked_index(self) -> Iterator[Dict[str, Dict]]:
+        """
+        Read the index while holding the lock shared with other instances of the application, and write it back once the
+        block ends without an error.
+        :return: The index, to be changed in place.
+        """
+        with self.lock:
+            create_directory(self.root)
+            with open(self.root.joinpath(LOCK_FILE), "a") as lock_file:
+                # The lock is released when the file is closed
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                index = self.read_index()
+                yield index
+                self.write_index(index)
+
+    def new_workspace(self, owner: str) -> Path:
+        """
+        Reserve a workspace. The directory is only created once the workspace is used.
+        :param owner: What the workspace is for, such as 'image_builder'.
+        :return: The path of the workspace.
+        """
+        name = str(uuid.uuid4())
+        with self.locked_index() as index:
+            index[name] = {"owner": owner, "pid": os.getpid(), "created": time.time(), "last_used": None,
+                           "released": False}
+        return self.root.joinpath(name)
+
+    def use(self, path: Path) -> Path:
+        """
+        Create a workspace if it does not exist yet and record that it was used. A workspace that has been reaped in
+        the meantime is recreated empty, and directories outside the workspace root are returned unchanged.
+        :param path: The path of the workspace.
+        :return: The path.
+        """
+        path = Path(path)
+        if path.parent != self.root:
+            return path
+        with self.locked_index() as index:
+            entry = index.setdefault(path.name, {"owner": None, "pid": os.getpid(), "created": time.time(),
+                                                 "last_used": None, "released": False})
+            create_directory(path)
+            entry["last_used"] = time.time()
+            entry["pid"] = os.getpid()
+            entry["released"] = False
+        return path
+
+    def release(self, path: Path) -> bool:
+        """
+        Give up a workspace, which the next run of the reaper removes.
+        :param path: The path of the workspace.
+        :return: True if the workspace was released, False if it is not a workspace or an image is being built in it.
+        """
+        path = Path(path)
+        if path.parent != self.root or path.resolve() in building_paths():
+            return False
+        with self.locked_index() as index:
+            if path.name not in index:
+                return False
+            index[path.name]["released"] = True
+        return True
+
+    def stale(self, entry: Dict, now: float) -> bool:
+        """
+        Check whether a workspace can be reaped: it was released, its owner has exited without using it, or it has not
+        been used within the time to live.
+        """
+        if entry["released"]:
+            return True
+        if entry["last_used"] is None:
+            return not process_alive(entry["pid"])
+        return now - entry["last_used"] > self.ttl
+
+    def reap(self) -> int:
+        """
+        Remove stale workspaces, then the least recently used workspaces until the rest fit within the quota. Only the
+        workspaces recorded in the index are removed, and none that an image is being built in.
+        :return: The number of bytes freed.
+        """
+        now = time.time()
+        building = building_paths()
+        with self.locked_index() as index:
+            candidates = {name for name in index if self.root.joinpath(name).resolve() not in building}
+            doomed = [name for name in candidates if self.stale(index[name], now)]
+            for name in doomed:
+                del index[name]
+                candidates.discard(name)
+
+            sizes = {name: directory_size(self.root.joinpath(name)) for name in index}
+            total = sum(sizes.values())
+            for name in sorted(candidates, key=lambda name: index[name]["last_used"] or index[name]["created"]):
+                if total <= self.quota:
+                    break
+                last_used = index[name]["last_used"]
+                if process_alive(index[name]["pid"]) and (last_used is None or now - last_used < ACTIVE_PERIOD):
+                    continue
+                doomed.append(name)
+                total -= sizes[name]
+                del index[name]
+
+        paths = [self.root.joinpath(name) for name in doomed]
+        freed = self.delete(paths)
+        if paths:
+            LogManager().add_log(f"Removed {len(paths)} build workspaces, freeing {freed / 1024 ** 2:.1f} MB")
+        return freed
+
+    @staticmethod
+    def delete(paths: List[Path]) -> int:
+        """
+        Delete directories in parallel. The entries at the top of every directory are deleted on separate threads, so
+        that one large workspace does not hold up the rest.
+        :param paths: The directories.
+        :return: The number of bytes freed.
+        """
+        entries = [entry.path for path in paths for entry in WorkspaceManager.scan_all(path)]
+        with ThreadPoolExecutor(max_workers=DELETE_THREADS) as executor:
+            freed = sum(executor.map(remove_tree, entries))
+        return freed + sum(remove_tree(str(path)) for path in paths)
+
+    @staticmethod
+    def scan_all(directory: Path) -> List[os.DirEntry]:
+        try:
+            with os.scandir(directory) as entries:
+                return list(entries)
+        except OSError:
+            return []
+
+    def start_reaper(self, interval: float = REAP_INTERVAL) -> None:
+        """
+        Reap workspaces now and then periodically on a background thread, until stop_reaper is called.
+        :param interval: The number of seconds between two runs.
+        """
+        if self.reaper is not None and self.reaper.is_alive():
+            return
+        self.stopping.clear()
+        self.reaper = threading.Thread(target=self.run_reaper, args=(interval,), name="workspace-reaper", daemon=True)
+        self.reaper.start()
+
+    def run_reaper(self, interval: float) -> None:
+        while not self.stopping.is_set():
+            try:
+                self.reap()
+            except Exception as error:
+                # The thread keeps running so that a single failure does not stop workspaces from ever being reaped
+                LogManager().add_log(f"Reaping build workspaces failed: {error!r}")
+            self.stopping.wait(interval)
+
+    def stop_reaper(self) -> None:
+        self.stopping.set()
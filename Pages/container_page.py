@@ -1,27 +1,63 @@
-from textual import events
+import asyncio
+from functools import partial
+from typing import List
+
+from rich.text import Text
+from textual import events, work
 from textual.app import Screen, ComposeResult, Binding
+from textual.coordinate import Coordinate
 from textual.containers import Vertical, Horizontal, Container, VerticalScroll
 from textual.widgets import Footer, Static, Header, DataTable, Button, Input, TabbedContent, TabPane, Switch, Rule, \
     OptionList
 
-from Managers.image_manager import list_images
+from Managers.event_manager import PodmanEvent, find_event_record
+from Managers.image_manager import list_images_async
 from Managers.log_manager import LogManager
 from Managers.navigation_manager import NavigationManager
-from Managers.container_manager import create_container, list_containers, remove_container, start_container, \
-    exec_container_shell, attach_container, restart_container, stop_container
-from Managers.network_manager import list_networks
-from Managers.pod_manager import list_pods
-from Managers.volume_manager import list_volumes
-from Managers.widget_manager import populate_table, get_selected_table_row, add_table_row, remove_table_row, \
-    read_table_rows
+from Managers.container_manager import create_container_async, list_containers_async, run_bulk_action_async, \
+    exec_container_shell, attach_container, STOP_TIMEOUT
+from Managers.network_manager import list_networks_async
+from Managers.pod_manager import list_pods_async
+from Managers.record_manager import Container as ContainerRecord, Image, Network, Pod, Volume
+from Managers.search_manager import SEARCH_DELAY
+from Managers.snapshot_manager import take_snapshot_async
+from Managers.volume_manager import list_volumes_async
+from Managers.widget_manager import populate_table, populate_records, populate_records_async, populate_tables_async, \
+    apply_record_change, get_selected_table_row, get_selected_row_key, add_table_row, remove_table_row, read_table_rows, \
+    TableWindow
+
+
+# The tables populated from a single snapshot when the page is shown
+SNAPSHOT_TABLES = ['container_tbl', 'crt_container_img_tbl', 'crt_container_network_tbl', 'crt_container_pod_tbl',
+                   'crt_container_vol_tbl']
+
+# The bulk action run by each option of the container actions list
+CONTAINER_ACTIONS = {'Start': 'start', 'Stop': 'stop', 'Restart': 'restart', 'Remove': 'remove'}
+
+# The number of selected container names listed beneath the table
+SELECTION_PREVIEW = 3
+
+# Shown before the id of every selected container
+SELECTION_MARKER = '● '
+
+# The table updated by each type of podman event
+EVENT_TABLES = {
+    'container': 'container_tbl',
+    'image': 'crt_container_img_tbl',
+    'network': 'crt_container_network_tbl',
+    'pod': 'crt_container_pod_tbl',
+    'volume': 'crt_container_vol_tbl',
+}
 
 
 class ContainerPage(Screen):
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
         Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Back'),
+        Binding(key='space', action='toggle_container_selection', description='Select'),
     ]
 
     CSS_PATH = 'Styles/container_page.tcss'
@@ -37,8 +73,13 @@ class ContainerPage(Screen):
                             'Stop',
                             'Restart',
                             'Remove',
+                            'Select All',
+                            'Clear Selection',
                             id='container_actions',
                         ),
+                        Input(placeholder=f'Stop timeout in seconds ({STOP_TIMEOUT})', id='container_stop_timeout',
+                              type='integer'),
+                        Input(placeholder='Filter by name, image or ID', id='container_filter'),
                         DataTable(id='container_tbl')
                     )
                 with Container(id='crt_container_ctr'):
@@ -139,13 +180,16 @@ class ContainerPage(Screen):
         yield Footer()
 
     def on_show(self, event: events.Show) -> None:
-        self.refresh_container_tbl()
-        self.refresh_strd_img_tbl()
-        self.refresh_net_tbl()
-        self.refresh_pod_tbl()
-        self.refresh_volume_tbl()
+        self.refresh_all_tbls()
 
     def on_mount(self, event: events.Mount) -> None:
+        # Containers and images can number in the tens of thousands, so they are loaded a page at a time
+        self.windows = {
+            'container_tbl': TableWindow(self, 'container_tbl', ContainerRecord, list_containers_async),
+            'crt_container_img_tbl': TableWindow(self, 'crt_container_img_tbl', Image, list_images_async),
+        }
+        # The containers selected for bulk actions, mapping their ids to their names
+        self.selected_containers = {}
         self.query_one('#container_ctr').border_title = 'Containers'
         self.query_one('#crt_container_ctr').border_title = 'Create Container'
         populate_table(self, 'crt_container_port_tbl', [['Host Port', 'Container Port']])
@@ -168,25 +212,22 @@ class ContainerPage(Screen):
                 ports = [(x[0], x[1]) for x in read_table_rows(self, 'crt_container_port_tbl')]
                 env_vars = [(x[0], x[1]) for x in read_table_rows(self, 'crt_container_environment_variable_tbl')]
 
-                if create_container(name=name,
-                                    image=image,
-                                    command=cmd,
-                                    detached=detach,
-                                    interactive=interactive,
-                                    tty=tty,
-                                    network=network,
-                                    pod=pod,
-                                    volume=volume,
-                                    ports=ports,
-                                    env_vars=env_vars,
-                                    mount_path=mount_path).returncode == 0:
-                    self.refresh_container_tbl()
+                self.run_create_container(name=name,
+                                          image=image,
+                                          command=cmd,
+                                          detached=detach,
+                                          interactive=interactive,
+                                          tty=tty,
+                                          network=network,
+                                          pod=pod,
+                                          volume=volume,
+                                          ports=ports,
+                                          env_vars=env_vars,
+                                          mount_path=mount_path)
             case 'rm_container_btn':
-                selected_row = get_selected_table_row(self, 'container_tbl')
-                if selected_row:
-                    container_name = selected_row[0]
-                    remove_container(container_name)
-                    self.refresh_container_tbl()
+                container_ids = self.get_action_targets()
+                if container_ids:
+                    self.run_container_action('Remove', container_ids)
             case 'crt_container_find_img_btn':
                 nav_manager.navigate('image_page')
             case 'crt_container_new_pod_btn':
@@ -210,25 +251,170 @@ class ContainerPage(Screen):
                 self.query_one('#crt_container_key', Input).value = ''
                 self.query_one('#crt_container_value', Input).value = ''
 
-    def refresh_container_tbl(self):
-        data = list_containers()
-        populate_table(self, 'container_tbl', data)
+    @work(group='container_ops')
+    async def run_create_container(self, **options):
+        button = self.query_one('#crt_container_btn', Button)
+        button.loading = True
+        try:
+            result = await create_container_async(**options)
+        finally:
+            button.loading = False
+        if result.returncode == 0:
+            self.refresh_container_tbl()
+
+    def stop_timeout(self) -> int:
+        """
+        Read the stop timeout, which the input may hold only part of, such as a lone '-' while it is being typed.
+        :return: The timeout in seconds, which is STOP_TIMEOUT if the input is empty or not a number.
+        """
+        try:
+            return max(int(self.query_one('#container_stop_timeout', Input).value), 0)
+        except ValueError:
+            return STOP_TIMEOUT
+
+    @work(group='container_ops')
+    async def run_container_action(self, action: str, container_ids: List[str]):
+        self.notify(f'{action} {len(container_ids)} container(s)...')
+        results = await run_bulk_action_async(CONTAINER_ACTIONS[action], container_ids, self.stop_timeout())
+
+        failed = [container_id for container_id, result in results if result.returncode != 0]
+        if failed:
+            self.notify(f'{action} failed for {len(failed)} of {len(results)} container(s), see the logs',
+                        severity='error')
+        else:
+            self.notify(f'{action} succeeded for {len(results)} container(s)')
+        self.clear_container_selection()
+        self.refresh_container_tbl()
+
+    def get_action_targets(self) -> List[str]:
+        """
+        Get the containers an action applies to: the selected containers, or the one under the cursor if none are
+        selected.
+        :return: The ids of the containers.
+        """
+        if self.selected_containers:
+            return list(self.selected_containers)
+        container_id = get_selected_row_key(self, 'container_tbl')
+        return [container_id] if container_id else []
+
+    def action_toggle_container_selection(self):
+        table = self.query_one('#container_tbl', DataTable)
+        container_id = get_selected_row_key(self, 'container_tbl')
+        if self.focused is not table or not container_id:
+            return
+        if self.selected_containers.pop(container_id, None) is None:
+            self.selected_containers[container_id] = get_selected_table_row(self, 'container_tbl')[-1]
+        self.show_container_selection()
+
+    def select_all_containers(self):
+        table = self.query_one('#container_tbl', DataTable)
+        for row_key in table.rows:
+            self.selected_containers[row_key.value] = table.get_row(row_key)[-1]
+        self.show_container_selection()
+
+    def clear_container_selection(self):
+        self.selected_containers.clear()
+        self.show_container_selection()
 
-    def refresh_strd_img_tbl(self):
-        data = list_images()
-        populate_table(self, 'crt_container_img_tbl', data)
+    def show_container_selection(self):
+        names = list(self.selected_containers.values())
+        preview = ', '.join(names[:SELECTION_PREVIEW])
+        if len(names) > SELECTION_PREVIEW:
+            preview += f' and {len(names) - SELECTION_PREVIEW} more'
+        self.query_one('#container_ctr').border_subtitle = f'Selected: {preview}' if names else ''
+        self.mark_selected_containers()
 
-    def refresh_net_tbl(self):
-        data = list_networks()
-        populate_table(self, 'crt_container_network_tbl', data)
+    def mark_selected_containers(self):
+        """
+        Mark the id of every selected container in the table and unmark the rows that are no longer selected. Rows
+        are redrawn from their records whenever the table is refreshed, so the marks are applied again afterwards.
+        """
+        table = self.query_one('#container_tbl', DataTable)
+        for row_index, row in enumerate(table.ordered_rows):
+            container_id = row.key.value
+            cell = Text(SELECTION_MARKER + container_id, style='bold') \
+                if container_id in self.selected_containers else container_id
+            if table.get_cell_at(Coordinate(row_index, 0)) != cell:
+                table.update_cell_at(Coordinate(row_index, 0), cell, update_width=True)
 
-    def refresh_pod_tbl(self):
-        data = list_pods()
-        populate_table(self, 'crt_container_pod_tbl', data)
+    @work(exclusive=True, group='all_tbls')
+    async def refresh_all_tbls(self):
+        container_window = self.windows['container_tbl']
+        image_window = self.windows['crt_container_img_tbl']
+        container_limit, image_limit = container_window.window_size, image_window.window_size
+        snapshot = await populate_tables_async(self, SNAPSHOT_TABLES, take_snapshot_async(container_limit, image_limit))
+        container_window.load(snapshot.containers, container_limit)
+        image_window.load(snapshot.images, image_limit)
+        if container_window.query:
+            await container_window.filter(container_window.query)
+        self.mark_selected_containers()
+        populate_records(self, 'crt_container_network_tbl', Network, snapshot.networks)
+        populate_records(self, 'crt_container_pod_tbl', Pod, snapshot.pods)
+        populate_records(self, 'crt_container_vol_tbl', Volume, snapshot.volumes)
 
-    def refresh_volume_tbl(self):
-        data = list_volumes()
-        populate_table(self, 'crt_container_vol_tbl', data)
+    @work(exclusive=True, group='container_tbl')
+    async def refresh_container_tbl(self):
+        await self.windows['container_tbl'].reset()
+        self.mark_selected_containers()
+
+    @work(exclusive=True, group='container_tbl')
+    async def filter_container_tbl(self, query: str):
+        await asyncio.sleep(SEARCH_DELAY)
+        await self.windows['container_tbl'].filter(query)
+        self.mark_selected_containers()
+
+    @work(exclusive=True, group='crt_container_img_tbl')
+    async def refresh_strd_img_tbl(self):
+        await self.windows['crt_container_img_tbl'].reset()
+
+    @work(exclusive=True, group='crt_container_network_tbl')
+    async def refresh_net_tbl(self):
+        await populate_records_async(self, 'crt_container_network_tbl', Network, list_networks_async())
+
+    @work(exclusive=True, group='crt_container_pod_tbl')
+    async def refresh_pod_tbl(self):
+        await populate_records_async(self, 'crt_container_pod_tbl', Pod, list_pods_async())
+
+    @work(exclusive=True, group='crt_container_vol_tbl')
+    async def refresh_volume_tbl(self):
+        await populate_records_async(self, 'crt_container_vol_tbl', Volume, list_volumes_async())
+
+    def on_podman_event(self, event: PodmanEvent):
+        table_id = EVENT_TABLES.get(event.resource)
+        if table_id:
+            self.run_worker(partial(self.apply_podman_event, table_id, event), group=f'{table_id}:{event.key}',
+                            exclusive=True)
+
+    async def apply_podman_event(self, table_id: str, event: PodmanEvent):
+        record = await find_event_record(event)
+        window = self.windows.get(table_id)
+        if window:
+            window.apply_change(event.key, record)
+        else:
+            apply_record_change(self, table_id, event.key, record)
+        if table_id == 'container_tbl':
+            # A removed container can no longer be acted on, so it leaves the selection along with its row
+            if record is None and self.selected_containers.pop(event.key, None) is not None:
+                self.show_container_selection()
+            else:
+                self.mark_selected_containers()
+
+    def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted):
+        self.extend_window(event.data_table.id)
+
+    def on_mouse_scroll_down(self, event: events.MouseScrollDown):
+        for table_id in self.windows:
+            self.extend_window(table_id)
+
+    def extend_window(self, table_id: str):
+        window = self.windows.get(table_id)
+        if window and window.needs_more():
+            self.run_worker(self.extend_window_rows(window), group=f'{table_id}:extend', exclusive=True)
+
+    async def extend_window_rows(self, window: TableWindow):
+        await window.extend()
+        if window.table_id == 'container_tbl':
+            self.mark_selected_containers()
 
     def on_data_table_cell_selected(self, event: DataTable.CellSelected):
         match event.data_table.id:
@@ -244,12 +430,16 @@ class ContainerPage(Screen):
             case 'crt_container_vol_tbl':
                 name = get_selected_table_row(self, 'crt_container_vol_tbl')[0]
                 self.query_one('#crt_container_selected_volume', Input).value = name
-                self.query_one('#crt_container_mount_path', Input).value = f'/mnt/{name.replace(' ', '-')}'
+                self.query_one('#crt_container_mount_path', Input).value = f"/mnt/{name.replace(' ', '-')}"
 
     def action_logs(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('log_page')
 
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
+
     def action_home(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('home_page')
@@ -260,18 +450,16 @@ class ContainerPage(Screen):
 
     def on_option_list_option_selected(self, event: OptionList.OptionSelected):
         if event.option_list.id == 'container_actions':
-            selected_action = event.option.prompt
-            selected_container = get_selected_table_row(self, 'container_tbl')[0]
-            match selected_action:
-                case 'Start':
-                    start_container(selected_container)
-                case 'Stop':
-                    stop_container(selected_container)
-                case 'Restart':
-                    restart_container(selected_container)
-                case 'Remove':
-                    remove_container(selected_container)
-
-            self.refresh_container_tbl()
-
+            match event.option.prompt:
+                case 'Select All':
+                    self.select_all_containers()
+                case 'Clear Selection':
+                    self.clear_container_selection()
+                case selected_action:
+                    container_ids = self.get_action_targets()
+                    if container_ids:
+                        self.run_container_action(selected_action, container_ids)
 
+    def on_input_changed(self, event: Input.Changed):
+        if event.input.id == 'container_filter':
+            self.filter_container_tbl(event.value)
@@ -0,0 +1,113 @@
+from textual import events
+from textual.app import Screen, ComposeResult, Binding
+from textual.containers import Vertical, Horizontal, Container, VerticalScroll
+from textual.widgets import Footer, Static, Header, DataTable, Button, Input
+
+from Managers.log_manager import LogManager
+from Managers.navigation_manager import NavigationManager
+from Managers.profile_manager import ProfileManager
+from Managers.widget_manager import populate_table
+
+
+# How often, in seconds, the statistics are refreshed while the page is shown
+REFRESH_INTERVAL = 1.0
+
+OPERATION_HEADERS = ['Operation', 'Calls', 'Errors', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Max (ms)', 'Spawn (ms)',
+                     'Bytes In', 'Bytes Out', 'Top Caller']
+
+RECENT_HEADERS = ['Time', 'Operation', 'Caller', 'Backend', 'Wall (ms)', 'Spawn (ms)', 'Bytes Out', 'Return Code']
+
+
+def milliseconds(seconds) -> str:
+    return f'{seconds * 1000:.1f}' if seconds is not None else '-'
+
+
+class DiagnosticsPage(Screen):
+    BINDINGS = [
+        Binding(key='ctrl+q', action='quit', description='Quit the application'),
+        Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+o', action='home', description='Home'),
+        Binding(key='ctrl+b', action='back', description='Back'),
+    ]
+
+    CSS_PATH = 'Styles/diagnostics_page.tcss'
+
+    def compose(self) -> ComposeResult:
+        with Vertical():
+            yield Header(show_clock=True, time_format='%I:%M:%S %p')
+            with Container(id='operation_ctr'):
+                yield DataTable(id='operation_tbl')
+            with Horizontal():
+                with Container(id='recent_ctr'):
+                    yield DataTable(id='recent_tbl')
+                with Container(id='export_ctr'):
+                    yield VerticalScroll(
+                        Static(' Path'),
+                        Input(placeholder='isopod-profile.json', id='export_path'),
+                        Button('Export JSON', id='export_json_btn'),
+                        Button('Export Prometheus', id='export_prom_btn'),
+                        Button('Reset', id='reset_btn'),
+                    )
+        yield Footer()
+
+    def on_mount(self, event: events.Mount) -> None:
+        self.query_one('#operation_ctr').border_title = 'Operations'
+        self.query_one('#recent_ctr').border_title = 'Recent Commands'
+        self.query_one('#export_ctr').border_title = 'Export'
+        self.refresh_timer = self.set_interval(REFRESH_INTERVAL, self.refresh_tbls, pause=True)
+
+    def on_show(self, event: events.Show) -> None:
+        self.refresh_tbls()
+        self.refresh_timer.resume()
+
+    def on_hide(self, event: events.Hide) -> None:
+        self.refresh_timer.pause()
+
+    def on_button_pressed(self, event: Button.Pressed):
+        match event.button.id:
+            case 'export_json_btn':
+                self.export('json', 'isopod-profile.json')
+            case 'export_prom_btn':
+                self.export('prometheus', 'isopod-profile.prom')
+            case 'reset_btn':
+                ProfileManager().reset()
+                self.refresh_tbls()
+
+    def export(self, output_format: str, default_path: str):
+        path = self.query_one('#export_path', Input).value or default_path
+        try:
+            ProfileManager().export(path, output_format)
+        except OSError as e:
+            LogManager().add_log(f'Failed to export profile to {path}: {e}')
+            self.notify(f'Failed to export profile to {path}', severity='error')
+            return
+        LogManager().add_log(f'Exported profile to {path}')
+        self.notify(f'Exported profile to {path}')
+
+    def refresh_tbls(self):
+        profile_manager = ProfileManager()
+        operations = []
+        for stats in profile_manager.get_stats():
+            percentiles = stats.percentiles()
+            top_caller = stats.callers.most_common(1)[0][0] if stats.callers else '-'
+            operations.append([stats.operation, str(stats.count), str(stats.errors),
+                               *[milliseconds(value) for value in percentiles.values()], milliseconds(stats.max_time),
+                               milliseconds(stats.mean_spawn), str(stats.bytes_in), str(stats.bytes_out), top_caller])
+        populate_table(self, 'operation_tbl', [OPERATION_HEADERS] + operations, key_column=0)
+
+        recent = [[sample.timestamp.strftime('%H:%M:%S'), sample.operation, sample.caller, sample.backend,
+                   milliseconds(sample.duration), milliseconds(sample.spawn), str(sample.bytes_out),
+                   str(sample.returncode)] for sample in reversed(profile_manager.get_recent())]
+        populate_table(self, 'recent_tbl', [RECENT_HEADERS] + recent)
+
+    def action_logs(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('log_page')
+
+    def action_back(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate(nav_manager.previous_screen)
+
+    def action_home(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('home_page')
@@ -20,6 +20,7 @@ class HomePage(Screen):
                     "Networks",
                     "Pods",
                     "Volumes",
+                    "Diagnostics",
                     "Exit",
                     id="options",
                 ),
@@ -41,5 +42,7 @@ class HomePage(Screen):
                 nav_manager.navigate('pod_page')
             case 'Volumes':
                 nav_manager.navigate('volume_page')
+            case 'Diagnostics':
+                nav_manager.navigate('diagnostics_page')
             case 'Exit':
                 exit(0)
@@ -1,26 +1,75 @@
+import asyncio
 import os
+from itertools import islice
+from functools import partial
 from pathlib import Path
+from typing import List, Optional
 from uuid import uuid4
 
-from click import style
+from textual import events, work
 from textual.app import ComposeResult
 from textual.binding import Binding
 from textual.containers import Vertical, Horizontal, Container, VerticalScroll
 from textual.screen import Screen
-from textual.widgets import Footer, Static, Header, TabbedContent, TabPane, DataTable, Input, Button, Rule, TextArea
+from textual.widgets import Footer, Static, Header, TabbedContent, TabPane, DataTable, Input, Button, Rule, TextArea, \
+    Switch, Log
 
-from Managers.file_manager import create_temp_directory, create_file, read_file_content
-from Managers.image_manager import list_images, pull_image, search_docker_hub_images, fetch_top_docker_hub_images, \
-    get_docker_hub_tags, remove_image, build_image
+from Managers.build_manager import BuildManager, BuildJob, DONE as BUILT, FINISHED_STATES as BUILD_FINISHED_STATES
+from Managers.context_manager import ContextAnalysis, add_ignore_patterns, analyze_context_async
+from Managers.file_manager import create_file, read_file_content, format_size
+from Managers.image_manager import list_images_async, iter_docker_hub_image_pages, iter_docker_hub_tag_pages, \
+    get_image_url, remove_image_async, REPOSITORY_HEADERS, TAG_HEADERS
+from Managers.event_manager import PodmanEvent, find_event_record
 from Managers.navigation_manager import NavigationManager
-from Managers.repository_manager import clone_github_repository
-from Managers.widget_manager import populate_table, get_selected_table_row
+from Managers.pull_manager import PullManager, PullJob, DONE, FINISHED_STATES
+from Managers.record_manager import Image
+from Managers.search_manager import SEARCH_DELAY
+from Managers.repository_manager import clone_github_repository_async, copy_github_repository_async
+from Managers.workspace_manager import WorkspaceManager
+from Managers.widget_manager import populate_table, get_selected_table_row, get_selected_row_key, TableWindow, \
+    PagedTable
+
+# The number of seconds between refreshes of the download table while pulls are running
+PULL_REFRESH_INTERVAL = 0.5
+
+PULL_COLUMNS = ('REFERENCE', 'STATE', 'LAYERS', 'PROGRESS', 'ELAPSED', 'STATUS')
+
+# The number of characters in a progress bar
+PROGRESS_WIDTH = 20
+
+BUILD_COLUMNS = ('IMAGE', 'STATE', 'STEP', 'ELAPSED', 'STATUS')
+
+BUILD_STEP_HEADERS = ['STEP', 'INSTRUCTION', 'TIME', 'CACHED']
+
+CONTEXT_HEADERS = ['PATH', 'KIND', 'SIZE', 'NOTE']
+
+
+def pull_row(job: PullJob) -> list:
+    filled = round(job.fraction * PROGRESS_WIDTH)
+    progress = f"{'█' * filled}{'░' * (PROGRESS_WIDTH - filled)} {job.fraction:4.0%}"
+    layers = f'{job.layers_finished}/{len(job.layers)}' if job.layers else ''
+    return [job.reference, job.state, layers, progress, f'{job.elapsed:.1f} s', job.message]
+
+
+def build_row(job: BuildJob) -> list:
+    step = job.current_step
+    return [job.reference, job.state, step.label if step else '', f'{job.elapsed:.1f} s', job.message]
+
+
+def context_rows(analysis: ContextAnalysis) -> list:
+    rows = [[f'{path}/', 'directory', format_size(size), f'{format_size(sent)} sent' if sent != size else '']
+            for path, size, sent in analysis.largest_directories]
+    rows += [[path, 'file', format_size(size), 'ignored' if ignored else '']
+             for path, size, ignored in analysis.largest_files]
+    rows += [[pattern, 'suggestion', format_size(size), reason] for pattern, size, reason in analysis.suggestions]
+    return rows
 
 
 class ImagePage(Screen):
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
         Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Back'),
     ]
@@ -33,6 +82,7 @@ class ImagePage(Screen):
             with Horizontal():
                 with Container(id='strd_img_ctr'):
                     yield VerticalScroll(
+                        Input(placeholder='Filter by name, tag or ID', id='strd_img_filter'),
                         DataTable(id='strd_img_tbl'),
                         Button('Remove', id='rm_img_btn')
                     )
@@ -44,6 +94,8 @@ class ImagePage(Screen):
                                 Input(placeholder='Keyword', id='dh_img_srch'),
                                 # Docker Hub Image Table
                                 DataTable(id='dh_img_tbl'),
+                                # Docker Hub Tag Filter, applied by Docker Hub
+                                Input(placeholder='Filter tags', id='dh_tag_filter'),
                                 # Docker Hub Tag Table
                                 DataTable(id='dh_tag_tbl'),
                                 Rule(),
@@ -52,6 +104,16 @@ class ImagePage(Screen):
                                 Static(' Tag'),
                                 Input(placeholder='latest', id='hd_img_tag'),
                                 Button('Download', id='dh_img_dl_btn'),
+                                Rule(),
+                                Static(' Downloads'),
+                                DataTable(id='pull_tbl'),
+                                Horizontal(
+                                    Input(placeholder=f'Parallel downloads ({PullManager().concurrency})',
+                                          id='pull_concurrency', type='integer'),
+                                    Button('Cancel', id='pull_cancel_btn'),
+                                    Button('Clear Finished', id='pull_clear_btn'),
+                                    id='pull_ctr'
+                                ),
                                 id='dh_img_tbl_ctr'
                             )
                         with TabPane('Distroless Images'):
@@ -64,13 +126,19 @@ class ImagePage(Screen):
                                     " Enter a GitHub repository URL containing a Docker file and/or resources for image building."),
                                 Horizontal(
                                     Input(placeholder='Enter image directory', id='git_repo'),
+                                    Input(placeholder='Branch, tag or commit', id='git_ref'),
                                     Button("Clone Repository", id="clone_git_btn"),
                                     id='git_repo_ctr'
                                 ),
                                 TextArea(id='git_editor', show_line_numbers=True, soft_wrap=True),
-                                Button('Build', id='git_build_btn'),
+                                Horizontal(
+                                    Button('Build', id='git_build_btn'),
+                                    Static(' Use Layer Cache'),
+                                    Switch(animate=True, id='git_cache_switch', value=True),
+                                    id='git_build_ctr'
+                                ),
                             )
-                        with TabPane('Image Builder'):
+                        with TabPane('Image Builder', id='ib_tab'):
                             yield Vertical(
                                 Static(" Image Name"),
                                 Input(placeholder='my-image', id='ib_img_name'),
@@ -82,95 +150,409 @@ class ImagePage(Screen):
                                     id='ib_dir_ctr'
                                 ),
                                 TextArea(id='ib_editor', show_line_numbers=True, soft_wrap=True),
-                                Button('Build', id='ib_build_btn'),
+                                Horizontal(
+                                    Button('Build', id='ib_build_btn'),
+                                    Static(' Use Layer Cache'),
+                                    Switch(animate=True, id='ib_cache_switch', value=True),
+                                    Button('Analyze Context', id='ib_analyze_btn'),
+                                    id='ib_build_ctr'
+                                ),
+                                Vertical(
+                                    Static(id='ib_context_summary'),
+                                    DataTable(id='ib_context_tbl'),
+                                    Button('Ignore Suggested Paths', id='ib_ignore_btn'),
+                                    id='ib_context_ctr'
+                                ),
+                            )
+                        with TabPane('Builds', id='build_tab'):
+                            yield Vertical(
+                                DataTable(id='build_tbl'),
+                                Horizontal(
+                                    Button('Cancel', id='build_cancel_btn'),
+                                    Button('Clear Finished', id='build_clear_btn'),
+                                    id='build_btn_ctr'
+                                ),
+                                Static(' Steps'),
+                                DataTable(id='build_step_tbl'),
+                                Static(' Output'),
+                                Log(id='build_log', max_lines=BuildManager().log_lines),
                             )
         yield Footer()
 
 
-    def on_mount(self):
+    def on_show(self):
         self.refresh_strd_img_tbl()
-        self.display_top_docker_images()
+        # Pulls carry on while the page is hidden, so the table catches up when it is shown again
+        self.refresh_pull_tbl()
+        if PullManager().has_pending():
+            self.pull_timer.resume()
+        self.refresh_build_tbl()
+        if BuildManager().has_pending():
+            self.build_timer.resume()
+
+    def on_hide(self):
+        self.pull_timer.pause()
+        self.build_timer.pause()
+
+    def on_mount(self):
+        # The URL and ref of the cloned repository, and the workspace its last build was copied into
+        self.git_repository = None
+        self.git_workspace = None
+        self.context_analysis = None
+        self.img_window = TableWindow(self, 'strd_img_tbl', Image, list_images_async)
+        # Docker Hub listings are paged, and the next page is fetched in the background while the current one is read
+        self.hub_tables = {
+            'dh_img_tbl': PagedTable(self, 'dh_img_tbl'),
+            'dh_tag_tbl': PagedTable(self, 'dh_tag_tbl'),
+        }
+        # The job and version last shown in each row of the download table
+        self.pull_rows = {}
+        self.pull_timer = self.set_interval(PULL_REFRESH_INTERVAL, self.refresh_pull_tbl, pause=True)
+        pull_tbl = self.query_one('#pull_tbl', DataTable)
+        for column in PULL_COLUMNS:
+            pull_tbl.add_column(column, key=column)
+        # Builds are followed in the same way, and the output of the build under the cursor is shown line by line
+        self.build_rows = {}
+        self.build_output_job = None
+        self.build_output_seen = 0
+        self.build_timer = self.set_interval(PULL_REFRESH_INTERVAL, self.refresh_build_tbl, pause=True)
+        build_tbl = self.query_one('#build_tbl', DataTable)
+        for column in BUILD_COLUMNS:
+            build_tbl.add_column(column, key=column)
+        populate_table(self, 'build_step_tbl', [BUILD_STEP_HEADERS], key_column=0)
+        # Docker Hub is only contacted once the page has been drawn
+        self.call_after_refresh(self.display_top_docker_images)
         self.query_one('#strd_img_ctr').border_title = 'Stored Images'
         self.query_one('#img_src_ctr').border_title = 'Image Sources'
 
-        path = create_temp_directory()
-        self.query_one('#ib_dir', Input).value = str(path)
-        self.query_one('#ib_img_name', Input).value = path.name
+    def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated):
+        # A workspace is reserved once the image builder is opened, and only created on disk by the first build
+        if event.pane.id == 'ib_tab' and not self.query_one('#ib_dir', Input).value:
+            path = WorkspaceManager().new_workspace('image_builder')
+            self.query_one('#ib_dir', Input).value = str(path)
+            self.query_one('#ib_img_name', Input).value = path.name
+
+    @work(exclusive=True, group='strd_img_tbl')
+    async def refresh_strd_img_tbl(self):
+        await self.img_window.reset()
+
+    @work(exclusive=True, group='strd_img_tbl')
+    async def filter_strd_img_tbl(self, query: str):
+        await asyncio.sleep(SEARCH_DELAY)
+        await self.img_window.filter(query)
+
+    @work(exclusive=True, group='dh_img_tbl')
+    async def display_docker_images(self, query: str, delay: float = 0.0):
+        # A newer search cancels this worker while it waits, so only the last keystroke of a burst reaches Docker Hub
+        await asyncio.sleep(delay)
+        await self.read_docker_hub(self.hub_tables['dh_img_tbl'].start(REPOSITORY_HEADERS,
+                                                                       iter_docker_hub_image_pages(query.strip())))
+
+    @work(exclusive=True, group='dh_img_tbl')
+    async def display_top_docker_images(self):
+        await self.read_docker_hub(self.hub_tables['dh_img_tbl'].start(REPOSITORY_HEADERS,
+                                                                       iter_docker_hub_image_pages()))
 
-    def refresh_strd_img_tbl(self):
-        data = list_images()
-        populate_table(self, 'strd_img_tbl', data)
+    @work(exclusive=True, group='dh_tag_tbl')
+    async def display_docker_tags(self, repository: str, name: str = '', delay: float = 0.0):
+        await asyncio.sleep(delay)
+        await self.read_docker_hub(self.hub_tables['dh_tag_tbl'].start(TAG_HEADERS,
+                                                                       iter_docker_hub_tag_pages(repository, name.strip())))
 
-    def display_docker_images(self, query: str):
-        data = search_docker_hub_images(query)
-        populate_table(self, 'dh_img_tbl', data)
+    async def read_docker_hub(self, listing):
+        try:
+            await listing
+        except OSError as error:
+            self.notify(f'Docker Hub could not be reached: {error}', severity='error')
 
-    def display_top_docker_images(self):
-        data = fetch_top_docker_hub_images()
-        populate_table(self, 'dh_img_tbl', data)
+    def extend_hub_table(self, table_id: str):
+        hub_table = self.hub_tables.get(table_id)
+        if hub_table and hub_table.needs_more():
+            self.run_worker(self.read_docker_hub(hub_table.extend()), group=f'{table_id}:extend', exclusive=True)
 
     def on_input_submitted(self, event: Input.Submitted):
         match event.input.id:
             case 'dh_img_srch':
                 self.display_docker_images(event.input.value)
+            case 'dh_tag_filter':
+                repository = self.query_one('#dh_img_url', Input).value
+                if repository:
+                    self.display_docker_tags(repository, event.input.value)
 
     def on_button_pressed(self, event: Button.Pressed):
-        git_repo_dir = Path()
         match event.button.id:
             case 'dh_img_dl_btn':
                 repository = self.query_one('#dh_img_url', Input).value
-                tag = self.query_one('#hd_img_tag', Input).value
-                if pull_image('docker.io', repository, tag).returncode == 0:
-                    self.refresh_strd_img_tbl()
+                tag = self.query_one('#hd_img_tag', Input).value or 'latest'
+                if repository:
+                    job = PullManager().enqueue(get_image_url('docker.io', repository, tag))
+                    self.notify(f'{job.reference} is {job.state}')
+                    self.refresh_pull_tbl()
+                    self.pull_timer.resume()
+            case 'pull_cancel_btn':
+                reference = get_selected_row_key(self, 'pull_tbl')
+                if reference and PullManager().cancel(reference):
+                    self.refresh_pull_tbl()
+            case 'pull_clear_btn':
+                PullManager().clear_finished()
+                self.refresh_pull_tbl()
             case 'rm_img_btn':
-                img_id = get_selected_table_row(self, 'strd_img_tbl')[2]
-                if remove_image(img_id):
-                    self.refresh_strd_img_tbl()
+                img_id = get_selected_row_key(self, 'strd_img_tbl')
+                if img_id:
+                    self.run_remove_image(img_id)
             case 'create_tmp_dir_btn':
-                path = create_temp_directory()
+                workspace_manager = WorkspaceManager()
+                workspace_manager.release(Path(self.query_one('#ib_dir', Input).value))
+                path = workspace_manager.new_workspace('image_builder')
                 self.query_one('#ib_dir', Input).value = str(path)
+                self.query_one('#ib_context_ctr').display = False
             case 'ib_build_btn':
-                path = Path(self.query_one('#ib_dir', Input).value)
+                path = WorkspaceManager().use(Path(self.query_one('#ib_dir', Input).value))
                 image_name = self.query_one('#ib_img_name', Input).value
                 if path.exists():
                     editor = self.query_one('#ib_editor', TextArea)
                     create_file(path, 'Dockerfile', editor.document.lines)
-                if build_image(path, image_name if image_name != '' else 'my-image').returncode == 0:
-                    self.refresh_strd_img_tbl()
+                self.start_build(path, image_name if image_name != '' else 'my-image',
+                                 not self.query_one('#ib_cache_switch', Switch).value)
+            case 'ib_analyze_btn':
+                path = Path(self.query_one('#ib_dir', Input).value)
+                if path.is_dir():
+                    self.run_analyze_context(path)
+                else:
+                    self.notify(f'{path} does not exist yet', severity='warning')
+            case 'ib_ignore_btn':
+                analysis = self.context_analysis
+                if analysis is not None and analysis.suggestions:
+                    ignore_file = add_ignore_patterns(analysis.context,
+                                                      [pattern for pattern, _, _ in analysis.suggestions])
+                    self.notify(f'Added {len(analysis.suggestions)} patterns to {ignore_file.name}')
+                    self.run_analyze_context(analysis.context)
             case 'load_dir_btn':
                 path = Path(self.query_one('#ib_dir', Input).value)
                 if path.exists():
                     self.query_one('#ib_img_name', Input).value = path.name
+                    self.query_one('#ib_context_ctr').display = False
                     editor = self.query_one('#ib_editor', TextArea)
                     content = read_file_content(path.joinpath('Dockerfile'))
                     editor.text = '\n'.join([x.replace('\n', '') for x in content])
             case 'clone_git_btn':
                 repo_url = self.query_one('#git_repo', Input).value
-                # repo_name = self.query_one('#git_img_name', Input).value
-                path = clone_github_repository(repo_url)
-                if path.exists():
-                    self.query_one('#git_img_name', Input).value = path.name
-                    editor = self.query_one('#git_editor', TextArea)
-                    content = read_file_content(path.joinpath('Dockerfile'))
-                    editor.text = '\n'.join([x.replace('\n', '') for x in content])
-                    git_repo_dir = path
+                ref = self.query_one('#git_ref', Input).value.strip()
+                self.run_clone_repository(repo_url, ref or None)
             case 'git_build_btn':
-                path = git_repo_dir
                 image_name = self.query_one('#git_img_name', Input).value
-                if path.exists():
-                    editor = self.query_one('#git_editor', TextArea)
-                    create_file(path, 'Dockerfile', editor.document.lines)
-                if build_image(path, image_name if image_name != '' else 'my-image').returncode == 0:
-                    self.refresh_strd_img_tbl()
+                if self.git_repository is not None:
+                    self.run_git_build(image_name if image_name != '' else 'my-image',
+                                       self.query_one('#git_editor', TextArea).document.lines,
+                                       not self.query_one('#git_cache_switch', Switch).value)
+            case 'build_cancel_btn':
+                job_id = get_selected_row_key(self, 'build_tbl')
+                if job_id and BuildManager().cancel(job_id):
+                    self.refresh_build_tbl()
+            case 'build_clear_btn':
+                BuildManager().clear_finished()
+                self.refresh_build_tbl()
+
+    def refresh_pull_tbl(self):
+        pull_manager = PullManager()
+        table = self.query_one('#pull_tbl', DataTable)
+        jobs = {job.reference: job for job in pull_manager.get_jobs()}
+        for reference in [reference for reference in self.pull_rows if reference not in jobs]:
+            table.remove_row(reference)
+            del self.pull_rows[reference]
+
+        pulled = False
+        for reference, job in jobs.items():
+            shown = self.pull_rows.get(reference)
+            if shown is None:
+                table.add_row(*pull_row(job), key=reference)
+            elif shown != (job, job.version) or job.state not in FINISHED_STATES:
+                # Running pulls are redrawn on every refresh to advance their elapsed time
+                for column, value in zip(PULL_COLUMNS, pull_row(job)):
+                    table.update_cell(reference, column, value)
+                pulled |= job.state == DONE
+            self.pull_rows[reference] = (job, job.version)
+
+        if pulled:
+            self.refresh_strd_img_tbl()
+        if not pull_manager.has_pending():
+            self.pull_timer.pause()
+
+    def on_input_changed(self, event: Input.Changed):
+        match event.input.id:
+            case 'pull_concurrency':
+                if event.value.isdigit() and int(event.value) > 0:
+                    PullManager().set_concurrency(int(event.value))
+            case 'strd_img_filter':
+                self.filter_strd_img_tbl(event.value)
+            case 'dh_img_srch':
+                self.display_docker_images(event.value, SEARCH_DELAY)
+            case 'dh_tag_filter':
+                repository = self.query_one('#dh_img_url', Input).value
+                if repository:
+                    self.display_docker_tags(repository, event.value, SEARCH_DELAY)
+
+    @work(group='image_ops')
+    async def run_remove_image(self, img_id: str):
+        if (await remove_image_async(img_id)).returncode == 0:
+            self.refresh_strd_img_tbl()
 
+    def start_build(self, path: Path, name: str, no_cache: bool):
+        try:
+            job = BuildManager().start(path, name, no_cache=no_cache)
+        except ValueError as error:
+            self.notify(str(error), severity='warning')
+            return
+        self.query_one('#img_tabs', TabbedContent).active = 'build_tab'
+        self.refresh_build_tbl()
+        build_tbl = self.query_one('#build_tbl', DataTable)
+        build_tbl.move_cursor(row=build_tbl.get_row_index(job.id))
+        self.show_build_output(job)
+        self.build_timer.resume()
+
+    def refresh_build_tbl(self):
+        build_manager = BuildManager()
+        table = self.query_one('#build_tbl', DataTable)
+        jobs = {job.id: job for job in build_manager.get_jobs()}
+        for job_id in [job_id for job_id in self.build_rows if job_id not in jobs]:
+            table.remove_row(job_id)
+            del self.build_rows[job_id]
+
+        built = False
+        for job_id, job in jobs.items():
+            shown = self.build_rows.get(job_id)
+            if shown is None:
+                table.add_row(*build_row(job), key=job_id)
+            elif shown != (job, job.version) or job.state not in BUILD_FINISHED_STATES:
+                for column, value in zip(BUILD_COLUMNS, build_row(job)):
+                    table.update_cell(job_id, column, value)
+                built |= job.state == BUILT
+            self.build_rows[job_id] = (job, job.version)
+
+        job_id = get_selected_row_key(self, 'build_tbl')
+        self.show_build_output(build_manager.get_job(job_id) if job_id else None)
+        if built:
+            self.refresh_strd_img_tbl()
+        if not build_manager.has_pending():
+            self.build_timer.pause()
+
+    def show_build_output(self, job: Optional[BuildJob]):
+        """
+        Show the output and step timings of a build, appending only the lines produced since the last refresh.
+        :param job: The build, or None to clear the output.
+        """
+        log = self.query_one('#build_log', Log)
+        if job is not self.build_output_job:
+            log.clear()
+            self.build_output_job = job
+            # Lines that have already been dropped from the buffer of the build cannot be shown
+            self.build_output_seen = job.lines_seen - len(job.lines) if job else 0
+        if job is None:
+            populate_table(self, 'build_step_tbl', [BUILD_STEP_HEADERS], key_column=0)
+            return
+
+        new_lines = job.lines_seen - self.build_output_seen
+        if new_lines:
+            log.write_lines(islice(job.lines, max(len(job.lines) - new_lines, 0), None))
+            self.build_output_seen = job.lines_seen
+        populate_table(self, 'build_step_tbl', [BUILD_STEP_HEADERS] + [
+            [step.label, step.instruction, f'{step.elapsed:.1f} s', 'yes' if step.cached else '']
+            for step in job.steps], key_column=0)
+
+    @work(exclusive=True, group='context_analysis')
+    async def run_analyze_context(self, path: Path):
+        button = self.query_one('#ib_analyze_btn', Button)
+        button.loading = True
+        try:
+            analysis = await analyze_context_async(path)
+        finally:
+            button.loading = False
+        self.context_analysis = analysis
+        self.query_one('#ib_context_summary', Static).update(f' {analysis.summary()}')
+        populate_table(self, 'ib_context_tbl', [CONTEXT_HEADERS] + context_rows(analysis))
+        self.query_one('#ib_ignore_btn', Button).display = bool(analysis.suggestions)
+        self.query_one('#ib_context_ctr').display = True
+
+    @work(exclusive=True, group='clone')
+    async def run_clone_repository(self, repo_url: str, ref: Optional[str] = None):
+        button = self.query_one('#clone_git_btn', Button)
+        button.loading = True
+        try:
+            path = await clone_github_repository_async(repo_url, ref)
+        except OSError as error:
+            self.notify(f'The repository could not be fetched: {error}', severity='error')
+            return
+        finally:
+            button.loading = False
+        if path.exists():
+            self.query_one('#git_img_name', Input).value = path.name
+            editor = self.query_one('#git_editor', TextArea)
+            content = read_file_content(path.joinpath('Dockerfile'))
+            editor.text = '\n'.join([x.replace('\n', '') for x in content])
+            self.git_repository = (repo_url, ref)
+
+    @work(exclusive=True, group='git_build')
+    async def run_git_build(self, name: str, dockerfile: List[str], no_cache: bool):
+        """
+        Build an image from a copy of the cloned repository in a workspace, so that writing the Dockerfile and building
+        do not race with a refresh of the cached checkout.
+        :param name: The name of the image.
+        :param dockerfile: The lines of the Dockerfile in the editor.
+        :param no_cache: Whether to rebuild every layer.
+        """
+        workspace_manager = WorkspaceManager()
+        if self.git_workspace is not None:
+            workspace_manager.release(self.git_workspace)
+        path = self.git_workspace = workspace_manager.use(workspace_manager.new_workspace('github_builder'))
+        button = self.query_one('#git_build_btn', Button)
+        button.loading = True
+        try:
+            await copy_github_repository_async(*self.git_repository, path)
+        except OSError as error:
+            self.notify(f'The repository could not be copied: {error}', severity='error')
+            return
+        finally:
+            button.loading = False
+        create_file(path, 'Dockerfile', dockerfile)
+        self.start_build(path, name, no_cache)
+
+    def on_podman_event(self, event: PodmanEvent):
+        if event.resource == 'image':
+            self.run_worker(partial(self.apply_podman_event, event), group=f'strd_img_tbl:{event.key}', exclusive=True)
+
+    async def apply_podman_event(self, event: PodmanEvent):
+        record = await find_event_record(event)
+        self.img_window.apply_change(event.key, record)
+
+    def on_data_table_cell_highlighted(self, event: DataTable.CellHighlighted):
+        if event.data_table.id == 'strd_img_tbl':
+            self.extend_img_window()
+        elif event.data_table.id == 'build_tbl':
+            job_id = get_selected_row_key(self, 'build_tbl')
+            self.show_build_output(BuildManager().get_job(job_id) if job_id else None)
+        else:
+            self.extend_hub_table(event.data_table.id)
+
+    def on_mouse_scroll_down(self, event: events.MouseScrollDown):
+        self.extend_img_window()
+        for table_id in self.hub_tables:
+            self.extend_hub_table(table_id)
+
+    def extend_img_window(self):
+        if self.img_window.needs_more():
+            self.run_worker(self.img_window.extend(), group='strd_img_tbl:extend', exclusive=True)
 
     def on_data_table_cell_selected(self, event: DataTable.CellSelected):
         match event.data_table.id:
             case 'dh_img_tbl':
                 repository = get_selected_table_row(self, 'dh_img_tbl')[0]
                 self.query_one('#dh_img_url', Input).value = repository
-                tag_data = get_docker_hub_tags(repository)
-                populate_table(self, 'dh_tag_tbl', tag_data)
+                tag_filter = self.query_one('#dh_tag_filter', Input)
+                if tag_filter.value:
+                    # Clearing the filter lists the tags of the repository through on_input_changed
+                    tag_filter.value = ''
+                else:
+                    self.display_docker_tags(repository)
             case 'dh_tag_tbl':
                 tag = get_selected_table_row(self, 'dh_tag_tbl')[1]
                 self.query_one('#hd_img_tag', Input).value = tag
@@ -179,6 +561,10 @@ class ImagePage(Screen):
         nav_manager = NavigationManager()
         nav_manager.navigate('log_page')
 
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
+
     def action_home(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('home_page')
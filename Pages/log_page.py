@@ -8,11 +8,19 @@ from Managers.log_manager import LogManager
 from Managers.navigation_manager import NavigationManager
 
 
+# The number of lines the log widget retains before discarding the oldest
+MAX_LINES = 5000
+
+# How often, in seconds, new records are appended while the page is shown
+TAIL_INTERVAL = 0.5
+
+
 class LogPage(Screen):
     CSS_PATH = 'Styles/log_page.tcss'
 
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Go back'),
     ]
@@ -21,20 +29,35 @@ class LogPage(Screen):
         yield Vertical(
             Header(),
             Container(
-              Log(id='log_content'),
+              Log(id='log_content', max_lines=MAX_LINES),
                 id='log_container'
             ),
             Footer()
         )
 
     def on_show(self):
-        log_manager = LogManager()
-        logs = log_manager.get_logs()
-        log_content = self.query_one('#log_content', Log)
-        log_content.write_lines(logs)
+        self.append_new_logs()
+        self.tail_timer.resume()
+
+    def on_hide(self):
+        self.tail_timer.pause()
 
     def on_mount(self):
         self.query_one('#log_container').border_title = 'Logs'
+        # Records up to the cursor have already been written to the widget
+        self.cursor = 0
+        self.tail_timer = self.set_interval(TAIL_INTERVAL, self.append_new_logs, pause=True)
+
+    def append_new_logs(self):
+        log_manager = LogManager()
+        records, self.cursor = log_manager.get_records_since(self.cursor)
+        if records:
+            log_content = self.query_one('#log_content', Log)
+            log_content.write_lines([line for record in records for line in record.lines()])
+
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
 
     def action_back(self):
         nav_manager = NavigationManager()
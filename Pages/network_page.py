@@ -1,17 +1,22 @@
-from textual import events
+from functools import partial
+
+from textual import events, work
 from textual.app import Screen, ComposeResult, Binding
 from textual.containers import Vertical, Horizontal, Container, VerticalScroll
 from textual.widgets import Footer, Static, Header, DataTable, Button, Input
 
+from Managers.event_manager import PodmanEvent, find_event_record
 from Managers.navigation_manager import NavigationManager
-from Managers.network_manager import list_networks, create_network, remove_network
-from Managers.widget_manager import populate_table, get_selected_table_row
+from Managers.network_manager import list_networks_async, create_network_async, remove_network_async
+from Managers.record_manager import Network
+from Managers.widget_manager import populate_records_async, apply_record_change, get_selected_row_key
 
 
 class NetworkPage(Screen):
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
         Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Back'),
     ]
@@ -37,8 +42,10 @@ class NetworkPage(Screen):
                     )
         yield Footer()
 
-    def on_mount(self, event: events.Mount) -> None:
+    def on_show(self, event: events.Show) -> None:
         self.refresh_net_tbl()
+
+    def on_mount(self, event: events.Mount) -> None:
         self.query_one('#net_ctr').border_title = 'Networks'
         self.query_one('#crt_net_ctr').border_title = 'Create Network'
 
@@ -47,26 +54,44 @@ class NetworkPage(Screen):
             case 'crt_net_btn':
                 name = self.query_one('#net_name', Input).value
                 subnet = self.query_one('#net_subnet', Input).value
-                if create_network(name, subnet).returncode == 0:
-                    self.refresh_net_tbl()
+                self.run_create_network(name, subnet)
             case 'rm_net_btn':
-                selected_row = get_selected_table_row(self, 'net_tbl')
-                if selected_row:
-                    network_name = selected_row[0]
+                network_name = get_selected_row_key(self, 'net_tbl')
+                if network_name:
                     # Remove the selected network
-                    remove_network(network_name)
-                    # Refresh the table
-                    self.refresh_net_tbl()
+                    self.run_remove_network(network_name)
+
+    @work(group='network_ops')
+    async def run_create_network(self, name: str, subnet: str):
+        if (await create_network_async(name, subnet)).returncode == 0:
+            self.refresh_net_tbl()
 
+    @work(group='network_ops')
+    async def run_remove_network(self, name: str):
+        await remove_network_async(name)
+        # Refresh the table
+        self.refresh_net_tbl()
+
+    @work(exclusive=True, group='net_tbl')
+    async def refresh_net_tbl(self):
+        await populate_records_async(self, 'net_tbl', Network, list_networks_async())
+
+    def on_podman_event(self, event: PodmanEvent):
+        if event.resource == 'network':
+            self.run_worker(partial(self.apply_podman_event, event), group=f'net_tbl:{event.key}', exclusive=True)
 
-    def refresh_net_tbl(self):
-        data = list_networks()
-        populate_table(self, 'net_tbl', data)
+    async def apply_podman_event(self, event: PodmanEvent):
+        record = await find_event_record(event)
+        apply_record_change(self, 'net_tbl', event.key, record)
 
     def action_logs(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('log_page')
 
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
+
     def action_home(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('home_page')
@@ -1,17 +1,22 @@
-from textual import events
+from functools import partial
+
+from textual import events, work
 from textual.app import Screen, ComposeResult, Binding
 from textual.containers import Vertical, Horizontal, Container, VerticalScroll
 from textual.widgets import Footer, Static, Header, DataTable, Button, Input
 
+from Managers.event_manager import PodmanEvent, find_event_record
 from Managers.navigation_manager import NavigationManager
-from Managers.pod_manager import create_pod, list_pods, remove_pod
-from Managers.widget_manager import populate_table, get_selected_table_row
+from Managers.pod_manager import create_pod_async, list_pods_async, remove_pod_async
+from Managers.record_manager import Pod
+from Managers.widget_manager import populate_records_async, apply_record_change, get_selected_row_key
 
 
 class PodPage(Screen):
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
         Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Back'),
     ]
@@ -37,8 +42,10 @@ class PodPage(Screen):
                     )
         yield Footer()
 
-    def on_mount(self, event: events.Mount) -> None:
+    def on_show(self, event: events.Show) -> None:
         self.refresh_pod_tbl()
+
+    def on_mount(self, event: events.Mount) -> None:
         self.query_one('#pod_ctr').border_title = 'Pods'
         self.query_one('#crt_pod_ctr').border_title = 'Create Pod'
 
@@ -47,26 +54,44 @@ class PodPage(Screen):
             case 'crt_pod_btn':
                 name = self.query_one('#pod_name', Input).value
                 network = self.query_one('#pod_net', Input).value
-                if create_pod(name, network).returncode == 0:
-                    self.refresh_pod_tbl()
+                self.run_create_pod(name, network)
             case 'rm_pod_btn':
-                selected_row = get_selected_table_row(self, 'pod_tbl')
-                if selected_row:
-                    pod_name = selected_row[0]
-                    # Remove the selected network
-                    remove_pod(pod_name)
-                    # Refresh the table
-                    self.refresh_pod_tbl()
+                pod_name = get_selected_row_key(self, 'pod_tbl')
+                if pod_name:
+                    # Remove the selected pod
+                    self.run_remove_pod(pod_name)
+
+    @work(group='pod_ops')
+    async def run_create_pod(self, name: str, network: str):
+        if (await create_pod_async(name, network)).returncode == 0:
+            self.refresh_pod_tbl()
 
+    @work(group='pod_ops')
+    async def run_remove_pod(self, name: str):
+        await remove_pod_async(name)
+        # Refresh the table
+        self.refresh_pod_tbl()
+
+    @work(exclusive=True, group='pod_tbl')
+    async def refresh_pod_tbl(self):
+        await populate_records_async(self, 'pod_tbl', Pod, list_pods_async())
+
+    def on_podman_event(self, event: PodmanEvent):
+        if event.resource == 'pod':
+            self.run_worker(partial(self.apply_podman_event, event), group=f'pod_tbl:{event.key}', exclusive=True)
 
-    def refresh_pod_tbl(self):
-        data = list_pods()
-        populate_table(self, 'pod_tbl', data)
+    async def apply_podman_event(self, event: PodmanEvent):
+        record = await find_event_record(event)
+        apply_record_change(self, 'pod_tbl', event.key, record)
 
     def action_logs(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('log_page')
 
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
+
     def action_home(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('home_page')
@@ -1,17 +1,22 @@
-from textual import events
+from functools import partial
+
+from textual import events, work
 from textual.app import Screen, ComposeResult, Binding
 from textual.containers import Vertical, Horizontal, Container, VerticalScroll
 from textual.widgets import Footer, Static, Header, DataTable, Button, Input
 
+from Managers.event_manager import PodmanEvent, find_event_record
 from Managers.navigation_manager import NavigationManager
-from Managers.volume_manager import create_volume, list_volumes, remove_volume
-from Managers.widget_manager import populate_table, get_selected_table_row
+from Managers.volume_manager import create_volume_async, list_volumes_async, remove_volume_async
+from Managers.record_manager import Volume
+from Managers.widget_manager import populate_records_async, apply_record_change, get_selected_row_key
 
 
 class VolumePage(Screen):
     BINDINGS = [
         Binding(key='ctrl+q', action='quit', description='Quit the application'),
         Binding(key='ctrl+l', action='logs', description='Logs'),
+        Binding(key='ctrl+t', action='diagnostics', description='Diagnostics'),
         Binding(key='ctrl+o', action='home', description='Home'),
         Binding(key='ctrl+b', action='back', description='Back'),
     ]
@@ -35,8 +40,10 @@ class VolumePage(Screen):
                     )
         yield Footer()
 
-    def on_mount(self, event: events.Mount) -> None:
+    def on_show(self, event: events.Show) -> None:
         self.refresh_volume_tbl()
+
+    def on_mount(self, event: events.Mount) -> None:
         self.query_one('#volume_ctr').border_title = 'Volumes'
         self.query_one('#crt_volume_ctr').border_title = 'Create Volume'
 
@@ -44,23 +51,42 @@ class VolumePage(Screen):
         match event.button.id:
             case 'crt_volume_btn':
                 name = self.query_one('#volume_name', Input).value
-                if create_volume(name).returncode == 0:
-                    self.refresh_volume_tbl()
+                self.run_create_volume(name)
             case 'rm_volume_btn':
-                selected_row = get_selected_table_row(self, 'volume_tbl')
-                if selected_row:
-                    volume_name = selected_row[0]
-                    remove_volume(volume_name)
-                    self.refresh_volume_tbl()
+                volume_name = get_selected_row_key(self, 'volume_tbl')
+                if volume_name:
+                    self.run_remove_volume(volume_name)
+
+    @work(group='volume_ops')
+    async def run_create_volume(self, name: str):
+        if (await create_volume_async(name)).returncode == 0:
+            self.refresh_volume_tbl()
 
-    def refresh_volume_tbl(self):
-        data = list_volumes()
-        populate_table(self, 'volume_tbl', data)
+    @work(group='volume_ops')
+    async def run_remove_volume(self, name: str):
+        await remove_volume_async(name)
+        self.refresh_volume_tbl()
+
+    @work(exclusive=True, group='volume_tbl')
+    async def refresh_volume_tbl(self):
+        await populate_records_async(self, 'volume_tbl', Volume, list_volumes_async())
+
+    def on_podman_event(self, event: PodmanEvent):
+        if event.resource == 'volume':
+            self.run_worker(partial(self.apply_podman_event, event), group=f'volume_tbl:{event.key}', exclusive=True)
+
+    async def apply_podman_event(self, event: PodmanEvent):
+        record = await find_event_record(event)
+        apply_record_change(self, 'volume_tbl', event.key, record)
 
     def action_logs(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('log_page')
 
+    def action_diagnostics(self):
+        nav_manager = NavigationManager()
+        nav_manager.navigate('diagnostics_page')
+
     def action_home(self):
         nav_manager = NavigationManager()
         nav_manager.navigate('home_page')
@@ -0,0 +1,234 @@
+########################################################################################################################
+# test_backend_manager.py
+# Tests that the socket backend lists containers with the same table rows as the CLI backend, serving the REST API
+# from a stub on a local Unix socket and the CLI from a stub podman executable, and that the CLI backend streams a
+# command that writes more error output than a pipe holds.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingUnixStreamServer
+
+import pytest
+
+from Managers.backend_manager import ABORTED_CODE, CliBackend, SocketBackend, StreamStatus
+from Managers.record_manager import Container
+
+
+########################################################################################################################
+# STUBS
+########################################################################################################################
+COMMAND = ["podman", "ps", "-a", "--format", "json"]
+
+PORTS = [{"host_ip": "", "container_port": 80, "host_port": 8080, "range": 1, "protocol": "tcp"}]
+
+
+def rest_containers(now: float):
+    """
+    The containers as the libpod REST API lists them, with RFC 3339 creation times and only the health as status.
+    """
+    created = datetime.fromtimestamp(now - 3 * 86400, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    common = {"Image": "docker.io/library/nginx:latest", "Command": ["nginx", "-g", "daemon off;"],
+              "Created": created, "CreatedAt": "", "Ports": PORTS}
+    return [
+        dict(common, Id="a" * 64, Names=["web"], State="running", StartedAt=int(now - 300), Status="healthy"),
+        dict(common, Id="b" * 64, Names=["job"], State="exited", ExitedAt=int(now - 7200), ExitCode=1, Status=""),
+        dict(common, Id="c" * 64, Names=["new"], State="created", Status=""),
+    ]
+
+
+def cli_containers(now: float):
+    """
+    The same containers as 'podman ps --format json' prints them.
+    """
+    common = {"Image": "docker.io/library/nginx:latest", "Command": ["nginx", "-g", "daemon off;"],
+              "Created": int(now - 3 * 86400), "CreatedAt": "3 days ago", "Ports": PORTS}
+    return [
+        dict(common, Id="a" * 64, Names=["web"], State="running", Status="Up 5 minutes (healthy)"),
+        dict(common, Id="b" * 64, Names=["job"], State="exited", Status="Exited (1) 2 hours ago"),
+        dict(common, Id="c" * 64, Names=["new"], State="created", Status="Created"),
+    ]
+
+
+class StubService(BaseHTTPRequestHandler):
+    """
+    Answers every GET with the REST container list, streams progress for a pull until the client goes away and drops
+    every other POST without a response.
+    """
+
+    def do_POST(self):
+        self.server.posts.append(self.path)
+        if self.path.startswith("/v4.0.0/libpod/images/pull"):
+            self.send_progress()
+        # Drops the connection once the request has arrived, as a service failing mid-request would
+        self.close_connection = True
+
+    def send_progress(self):
+        # Reports progress until the client goes away, as a slow pull would
+        self.send_response(200)
+        self.end_headers()
+        try:
+            while True:
+                self.wfile.write(b'{"stream": "Copying blob"}\n')
+                self.wfile.flush()
+                time.sleep(0.01)
+        except OSError:
+            self.server.abandoned.append(self.path)
+
+    def do_GET(self):
+        body = json.dumps(rest_containers(self.server.now)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *arguments):
+        pass
+
+
+@pytest.fixture
+def now():
+    return time.time()
+
+
+@pytest.fixture
+def socket_backend(tmp_path, now):
+    server = ThreadingUnixStreamServer(str(tmp_path.joinpath("podman.sock")), StubService)
+    server.now = now
+    server.posts = []
+    server.abandoned = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    backend = SocketBackend(str(tmp_path.joinpath("podman.sock")))
+    backend.server = server
+    yield backend
+    backend.pool.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cli_backend(tmp_path, now, monkeypatch):
+    podman = tmp_path.joinpath("bin", "podman")
+    podman.parent.mkdir()
+    podman.write_text(f"#!{sys.executable}\nprint({json.dumps(json.dumps(cli_containers(now)))})\n")
+    podman.chmod(0o755)
+    monkeypatch.setenv("PATH", str(podman.parent), prepend=":")
+    return CliBackend()
+
+
+def rows(output: str):
+    return [Container.from_json(data).row for data in json.loads(output)]
+
+
+########################################################################################################################
+# TESTS
+########################################################################################################################
+def test_socket_backend_lists_the_same_rows_as_the_cli(socket_backend, cli_backend):
+    expected = rows(cli_backend.run(COMMAND).stdout)
+    assert expected[0][4] == "Up 5 minutes (healthy)"
+
+    assert rows(socket_backend.run(COMMAND).stdout) == expected
+
+    status = StreamStatus(COMMAND)
+    assert rows(b"".join(socket_backend.stream(COMMAND, status)).decode()) == expected
+    assert status.returncode == 0
+
+
+def test_socket_backend_reports_a_request_that_was_sent_instead_of_falling_back(socket_backend):
+    result = socket_backend.run(["podman", "stop", "web"])
+    assert result is not None and result.returncode != 0
+    assert socket_backend.server.posts == ["/v4.0.0/libpod/containers/web/stop"]
+
+    status = StreamStatus(["podman", "stop", "web"])
+    assert list(socket_backend.stream(["podman", "stop", "web"], status)) == []
+    assert status.returncode != 0
+    assert len(socket_backend.server.posts) == 2
+
+
+@pytest.mark.parametrize("chunks_read", [0, 1, 3])
+def test_cancelled_socket_stream_closes_its_connection(socket_backend, chunks_read):
+    command = ["podman", "pull", "alpine"]
+    server = socket_backend.server
+
+    async def pull(status: StreamStatus, started: asyncio.Event) -> None:
+        chunks = await socket_backend.stream_async(command, status)
+        for _ in range(chunks_read):
+            await chunks.__anext__()
+        started.set()
+        await asyncio.sleep(60)
+
+    async def cancel_pull(status: StreamStatus, abandoned: int) -> None:
+        started = asyncio.Event()
+        task = asyncio.create_task(pull(status, started))
+        if chunks_read:
+            await started.wait()
+        else:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The connection is closed from the worker thread once the request has been sent
+        for _ in range(100):
+            if len(server.abandoned) == abandoned:
+                return
+            await asyncio.sleep(0.05)
+
+    for attempt in range(1, 4):
+        status = StreamStatus(command)
+        asyncio.run(cancel_pull(status, attempt))
+        assert len(server.abandoned) == attempt
+        assert status.returncode == ABORTED_CODE
+        assert socket_backend.pool.idle.empty()
+
+
+# Writes several pipe buffers of error output before any output, which blocks unless both are read at once
+NOISY_COMMAND = [sys.executable, "-c", "import sys; sys.stderr.write('e' * 1048576); sys.stderr.flush(); print('done')"]
+
+
+def test_cli_backend_streams_while_draining_error_output():
+    status = StreamStatus(NOISY_COMMAND)
+    output = []
+    reader = threading.Thread(target=lambda: output.extend(CliBackend().stream(NOISY_COMMAND, status)), daemon=True)
+    reader.start()
+    reader.join(10)
+    assert not reader.is_alive()
+    assert b"".join(output) == b"done\n"
+    assert status.returncode == 0 and len(status.stderr) == 1048576
+
+
+def test_cli_backend_streams_asynchronously_while_draining_error_output():
+    async def read(status: StreamStatus) -> bytes:
+        return b"".join([chunk async for chunk in await CliBackend().stream_async(NOISY_COMMAND, status)])
+
+    status = StreamStatus(NOISY_COMMAND)
+    assert asyncio.run(asyncio.wait_for(read(status), 10)) == b"done\n"
+    assert status.returncode == 0 and len(status.stderr) == 1048576
+
+
+def test_cli_backend_stops_a_command_whose_output_is_left_unread():
+    # Writes more output than the pipe and the stream buffer hold, then keeps running
+    command = [sys.executable, "-c",
+               "import sys, time; sys.stdout.write('o' * 4194304); sys.stdout.flush(); time.sleep(30)"]
+
+    async def read_one_chunk(status: StreamStatus) -> None:
+        chunks = await CliBackend().stream_async(command, status)
+        await chunks.__anext__()
+        await asyncio.sleep(0.2)
+        await chunks.aclose()
+
+    status = StreamStatus(command)
+    asyncio.run(asyncio.wait_for(read_one_chunk(status), 10))
+    assert status.returncode is not None and status.returncode != 0
@@ -0,0 +1,107 @@
+########################################################################################################################
+# test_registry_client.py
+# Tests of the RegistryClient against a local stub of the Docker Hub API: a first fetch, a revalidation answered with
+# 304 Not Modified, and the disk cache served once the registry cannot be reached.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from Managers.image_manager import RegistryClient
+
+
+########################################################################################################################
+# STUB REGISTRY
+########################################################################################################################
+DOCUMENT = {"count": 1, "next": None, "results": [{"name": "alpine"}]}
+
+ETAG = '"v1"'
+
+
+class StubRegistry(BaseHTTPRequestHandler):
+    """
+    Answers every GET with the same document and entity tag, or with 304 when the request carries that tag.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        body = json.dumps(DOCUMENT).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *arguments):
+        pass
+
+
+@pytest.fixture
+def registry():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRegistry)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def registry_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+########################################################################################################################
+# TESTS
+########################################################################################################################
+def test_fetch_revalidate_and_serve_offline(registry, tmp_path):
+    url = registry_url(registry)
+    # A time to live of 0 makes every fetch after the first a revalidation
+    client = RegistryClient(url, cache_dir=tmp_path, ttl=0)
+
+    assert client.get_json("/v2/repositories/library/", {"page": 1}) == DOCUMENT
+    assert registry.requests == [("/v2/repositories/library/?page=1", None)]
+
+    assert client.get_json("/v2/repositories/library/", {"page": 1}) == DOCUMENT
+    assert registry.requests[-1] == ("/v2/repositories/library/?page=1", ETAG)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    registry.shutdown()
+    registry.server_close()
+    # A new client has nothing in memory, so the response comes from the disk cache
+    offline = RegistryClient(url, cache_dir=tmp_path, ttl=0, timeout=(1, 1))
+    assert offline.get_json("/v2/repositories/library/", {"page": 1}) == DOCUMENT
+
+
+def test_fresh_response_is_not_requested_again(registry, tmp_path):
+    client = RegistryClient(registry_url(registry), cache_dir=tmp_path, ttl=60)
+
+    client.get_json("/v2/repositories/library/")
+    client.get_json("/v2/repositories/library/")
+    assert len(registry.requests) == 1
+
+
+def test_offline_without_cache_raises(registry):
+    url = registry_url(registry)
+    registry.shutdown()
+    registry.server_close()
+    client = RegistryClient(url, cache_dir=None, timeout=(1, 1))
+
+    with pytest.raises(requests.ConnectionError):
+        client.get_json("/v2/repositories/library/")
@@ -0,0 +1,121 @@
+########################################################################################################################
+# test_repository_cache.py
+# Tests of the RepositoryCache against bare git repositories on disk: the first fetch, a refresh that picks up a new
+# commit and discards local changes, and the eviction of the least recently used checkouts.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from Managers.repository_manager import RepositoryCache
+
+
+########################################################################################################################
+# REPOSITORIES
+########################################################################################################################
+GIT_ENVIRONMENT = dict(os.environ, GIT_AUTHOR_NAME="Isopod", GIT_AUTHOR_EMAIL="isopod@example.com",
+                       GIT_COMMITTER_NAME="Isopod", GIT_COMMITTER_EMAIL="isopod@example.com")
+
+
+def run_git(directory: Path, *arguments: str) -> None:
+    subprocess.run(["git", "-C", str(directory), *arguments], check=True, capture_output=True, env=GIT_ENVIRONMENT)
+
+
+def commit(work: Path, files: dict, message: str) -> None:
+    for name, content in files.items():
+        path = work.joinpath(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    run_git(work, "add", "--all")
+    run_git(work, "commit", "--quiet", "-m", message)
+    run_git(work, "push", "--quiet", "origin", "HEAD:main")
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """
+    A bare repository with one commit on main, and the working copy commits are pushed from.
+    """
+    bare = tmp_path.joinpath("project.git")
+    work = tmp_path.joinpath("work")
+    run_git(tmp_path, "init", "--quiet", "--bare", "--initial-branch", "main", str(bare))
+    run_git(tmp_path, "init", "--quiet", "--initial-branch", "main", str(work))
+    run_git(work, "remote", "add", "origin", str(bare))
+    commit(work, {"Dockerfile": "FROM alpine\n", "app/main.py": "print(1)\n"}, "First")
+    return bare, work
+
+
+########################################################################################################################
+# TESTS
+########################################################################################################################
+def test_checkout_and_refresh(repository, tmp_path):
+    bare, work = repository
+    cache = RepositoryCache(tmp_path.joinpath("cache"))
+
+    path = cache.checkout(str(bare))
+    assert path.name == "project"
+    assert path.joinpath("app", "main.py").read_text() == "print(1)\n"
+    assert cache.read_index()[cache.key(str(bare), None)]["size"] > 0
+
+    path.joinpath("app", "main.py").write_text("edited\n")
+    path.joinpath("untracked.txt").write_text("left behind\n")
+    commit(work, {"app/main.py": "print(2)\n"}, "Second")
+
+    assert cache.checkout(str(bare)) == path
+    assert path.joinpath("app", "main.py").read_text() == "print(2)\n"
+    assert not path.joinpath("untracked.txt").exists()
+
+
+def test_checkout_of_a_ref(repository, tmp_path):
+    bare, work = repository
+    run_git(work, "tag", "v1")
+    run_git(work, "push", "--quiet", "origin", "v1")
+    commit(work, {"app/main.py": "print(2)\n"}, "Second")
+    cache = RepositoryCache(tmp_path.joinpath("cache"))
+
+    tagged = cache.checkout(str(bare), "v1")
+    latest = cache.checkout(str(bare))
+    assert tagged != latest
+    assert tagged.joinpath("app", "main.py").read_text() == "print(1)\n"
+    assert latest.joinpath("app", "main.py").read_text() == "print(2)\n"
+
+
+def test_least_recently_used_checkout_is_evicted(repository, tmp_path):
+    bare, work = repository
+    run_git(work, "tag", "v1")
+    run_git(work, "push", "--quiet", "origin", "v1")
+    cache = RepositoryCache(tmp_path.joinpath("cache"), max_entries=1)
+
+    first = cache.checkout(str(bare), "v1")
+    second = cache.checkout(str(bare))
+    assert not first.exists()
+    assert second.exists()
+    assert list(cache.read_index()) == [cache.key(str(bare), None)]
+
+
+def test_failed_fetch_leaves_nothing_behind(tmp_path):
+    cache = RepositoryCache(tmp_path.joinpath("cache"))
+
+    with pytest.raises(OSError):
+        cache.checkout(str(tmp_path.joinpath("missing.git")))
+    assert not any(path.is_dir() for path in tmp_path.joinpath("cache").iterdir())
+
+
+def test_copy_checkout_leaves_the_cache_unchanged(repository, tmp_path):
+    bare, _ = repository
+    cache = RepositoryCache(tmp_path.joinpath("cache"))
+    path = cache.checkout(str(bare))
+
+    copy = cache.copy_checkout(str(bare), None, tmp_path.joinpath("workspace"))
+    copy.joinpath("Dockerfile").write_text("FROM busybox\n")
+    assert not copy.joinpath(".git").exists()
+    assert path.joinpath("Dockerfile").read_text() == "FROM alpine\n"
@@ -0,0 +1,81 @@
+########################################################################################################################
+# test_widget_manager.py
+# Tests that refreshing a keyed table keeps its rows in the order of the inventory, whether new rows arrive in a full
+# refresh or one at a time from podman events.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import asyncio
+
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable
+
+from Managers.widget_manager import set_keyed_rows, change_table_row
+
+
+########################################################################################################################
+# HELPERS
+########################################################################################################################
+HEADERS = ["NAME", "STATUS"]
+
+
+class TableApp(App):
+    def compose(self) -> ComposeResult:
+        yield DataTable(id="table")
+
+
+def keyed(*names: str):
+    return [(name, [name, "running"]) for name in names]
+
+
+def row_keys(table: DataTable):
+    return [row.key.value for row in table.ordered_rows]
+
+
+def run_with_table(test) -> None:
+    async def run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            test(app.query_one("#table", DataTable))
+            await pilot.pause()
+
+    asyncio.run(run())
+
+
+########################################################################################################################
+# TESTS
+########################################################################################################################
+def test_refresh_with_new_key_at_front_keeps_inventory_order():
+    def test(table: DataTable) -> None:
+        set_keyed_rows(table, HEADERS, keyed("a", "b"))
+        table.move_cursor(row=1)
+        set_keyed_rows(table, HEADERS, keyed("c", "a", "b"))
+        assert row_keys(table) == ["c", "a", "b"]
+        assert table.ordered_rows[table.cursor_row].key.value == "b"
+
+    run_with_table(test)
+
+
+def test_refresh_with_new_key_at_end_and_removed_key():
+    def test(table: DataTable) -> None:
+        set_keyed_rows(table, HEADERS, keyed("a", "b", "c"))
+        set_keyed_rows(table, HEADERS, [("a", ["a", "exited"])] + keyed("c", "d"))
+        assert row_keys(table) == ["a", "c", "d"]
+        assert table.get_row("a") == ["a", "exited"]
+
+    run_with_table(test)
+
+
+def test_new_row_inserted_at_index():
+    def test(table: DataTable) -> None:
+        set_keyed_rows(table, HEADERS, keyed("a", "b"))
+        change_table_row(table, "c", ["c", "created"], 0)
+        assert row_keys(table) == ["c", "a", "b"]
+        assert table.get_row("a") == ["a", "running"]
+
+    run_with_table(test)
@@ -0,0 +1,335 @@
+########################################################################################################################
+# cli.py
+# This module provides a headless command line interface to the managers, for scripts that need Isopod's behaviour
+# without the terminal interface. Listings and results are written to stdout as JSON or as tab separated values.
+#
+# Textual and the Pages modules are never imported, and each command only imports the managers it uses, so that a
+# command starts in tens of milliseconds.
+#
+# Copyright (c) 2025 noahsub
+########################################################################################################################
+
+
+########################################################################################################################
+# IMPORTS
+########################################################################################################################
+import json
+import sys
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import click
+
+
+########################################################################################################################
+# OUTPUT
+########################################################################################################################
+OUTPUT_FORMATS = ("json", "tsv")
+
+output_option = click.option("--format", "output_format", type=click.Choice(OUTPUT_FORMATS), default="json",
+                             show_default=True, help="The format of the output.")
+
+
+def tsv_line(values: Iterable[object]) -> str:
+    return "\t".join(str(value).replace("\t", " ").replace("\n", " ") for value in values)
+
+
+def write_records(records: Iterable, record_type: Type, output_format: str) -> None:
+    """
+    Write resource records as they arrive, so that large inventories are never held in memory.
+    :param records: The records.
+    :param record_type: The record class, which provides the TSV headers.
+    :param output_format: Either 'json', for the raw fields of each record, or 'tsv', for the rows shown in the tables.
+    """
+    if output_format == "tsv":
+        click.echo(tsv_line(record_type.HEADERS))
+        for record in records:
+            click.echo(tsv_line(record.row))
+        return
+
+    click.echo("[", nl=False)
+    for index, record in enumerate(records):
+        click.echo(("," if index else "") + "\n  " + json.dumps(record.to_dict()), nl=False)
+    click.echo("\n]")
+
+
+def write_results(results: Sequence[Tuple[str, CompletedProcess]], output_format: str) -> None:
+    """
+    Write the outcome of a command run on one or more resources, exiting with an error if any of them failed.
+    :param results: The resource each command was run on and its result.
+    :param output_format: Either 'json' or 'tsv'.
+    """
+    if output_format == "tsv":
+        click.echo(tsv_line(("TARGET", "RETURN CODE", "OUTPUT")))
+        for target, result in results:
+            click.echo(tsv_line((target, result.returncode, (result.stdout if result.returncode == 0 else result.stderr).strip())))
+    else:
+        click.echo(json.dumps([{"target": target, "returncode": result.returncode, "stdout": result.stdout,
+                                "stderr": result.stderr} for target, result in results], indent=2))
+
+    if any(result.returncode != 0 for _, result in results):
+        sys.exit(1)
+
+
+def parse_filters(filters: Sequence[str]) -> Optional[Dict[str, str]]:
+    """
+    Convert '--filter key=value' options into the filters taken by the list functions.
+    :param filters: The options.
+    :return: The filters, or None if there are none.
+    """
+    parsed = {}
+    for item in filters:
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise click.BadParameter(f"expected key=value, found {item!r}", param_hint="--filter")
+        parsed[key] = value
+    return parsed or None
+
+
+def parse_pairs(items: Sequence[str], separator: str, option: str) -> List[Tuple[str, str]]:
+    pairs = []
+    for item in items:
+        first, found, second = item.partition(separator)
+        if not found:
+            raise click.BadParameter(f"expected a{separator}b, found {item!r}", param_hint=option)
+        pairs.append((first, second))
+    return pairs
+
+
+########################################################################################################################
+# COMMANDS
+########################################################################################################################
+@click.group(context_settings={"help_option_names": ["-h", "--help"]})
+def cli() -> None:
+    """
+    Manage Podman resources without starting the terminal interface.
+    """
+
+
+@cli.group()
+def containers() -> None:
+    """
+    List, create, start, stop, restart and remove containers.
+    """
+
+
+@containers.command("ls")
+@click.option("--limit", type=int, help="Only list the most recently created containers.")
+@click.option("--filter", "filters", multiple=True, metavar="KEY=VALUE", help="A podman filter, may be repeated.")
+@output_option
+def list_containers(limit: Optional[int], filters: Tuple[str, ...], output_format: str) -> None:
+    from Managers.container_manager import iter_containers
+    from Managers.record_manager import Container
+    write_records(iter_containers(limit=limit, filters=parse_filters(filters)), Container, output_format)
+
+
+@containers.command("create")
+@click.argument("name")
+@click.argument("image")
+@click.option("--network", help="The network to connect the container to.")
+@click.option("--pod", help="The pod to run the container in, which takes precedence over --network.")
+@click.option("--volume", help="The volume to mount, together with --mount-path.")
+@click.option("--mount-path", help="The path inside the container at which the volume is mounted.")
+@click.option("--command", help="The command to run in the container.")
+@click.option("--port", "ports", multiple=True, metavar="HOST:CONTAINER", help="A port to publish, may be repeated.")
+@click.option("--env", "env_vars", multiple=True, metavar="KEY=VALUE", help="An environment variable, may be repeated.")
+@output_option
+def create_container(name: str, image: str, network: Optional[str], pod: Optional[str], volume: Optional[str], mount_path: Optional[str], command: Optional[str], ports: Tuple[str, ...], env_vars: Tuple[str, ...], output_format: str) -> None:
+    from Managers.container_manager import create_container
+    result = create_container(name, image, network, pod, volume, mount_path, command,
+                              ports=parse_pairs(ports, ":", "--port"), env_vars=parse_pairs(env_vars, "=", "--env"))
+    write_results([(name, result)], output_format)
+
+
+def container_action(name: str, action: str, help_text: str) -> None:
+    """
+    Register a command that applies an action to every container given, in a single podman command.
+    :param name: The name of the command.
+    :param action: The bulk action, one of 'start', 'stop', 'restart' or 'remove'.
+    :param help_text: The help of the command.
+    """
+    @containers.command(name, help=help_text)
+    @click.argument("names", nargs=-1, required=True)
+    @click.option("--time", "-t", "timeout", type=int,
+                  help="The number of seconds to wait for a container to stop before killing it.")
+    @output_option
+    def command(names: Tuple[str, ...], timeout: Optional[int], output_format: str) -> None:
+        from Managers.container_manager import run_bulk_action
+        options = {} if timeout is None else {"timeout": timeout}
+        write_results(run_bulk_action(action, names, **options), output_format)
+
+
+container_action("start", "start", "Start one or more containers.")
+container_action("stop", "stop", "Stop one or more containers.")
+container_action("restart", "restart", "Restart one or more containers.")
+container_action("rm", "remove", "Stop and remove one or more containers.")
+
+
+@cli.group()
+def images() -> None:
+    """
+    List, pull, build and remove images.
+    """
+
+
+@images.command("ls")
+@click.option("--filter", "filters", multiple=True, metavar="KEY=VALUE", help="A podman filter, may be repeated.")
+@output_option
+def list_images(filters: Tuple[str, ...], output_format: str) -> None:
+    from Managers.image_manager import iter_images
+    from Managers.record_manager import Image
+    write_records(iter_images(filters=parse_filters(filters)), Image, output_format)
+
+
+@images.command("pull")
+@click.argument("repositories", nargs=-1, required=True)
+@click.option("--tag", default="latest", show_default=True, help="The tag of repositories given without one.")
+@click.option("--source", default="docker.io", show_default=True, help="The registry to pull from.")
+@click.option("--concurrency", type=int, help="The number of images pulled at once.")
+@output_option
+def pull_image(repositories: Tuple[str, ...], tag: str, source: str, concurrency: Optional[int], output_format: str) -> None:
+    """
+    Pull one or more images, such as 'alpine nginx:1.27', several at a time.
+    """
+    import asyncio
+    from Managers.image_manager import get_image_url
+    from Managers.pull_manager import pull_all
+
+    references = []
+    for repository in repositories:
+        # A reference pinned to a digest is passed to podman unchanged
+        if "@" in repository:
+            references.append(repository)
+            continue
+        # A colon after the last slash separates the tag, while one before it belongs to a registry port
+        name, separator, repository_tag = repository.rpartition(":")
+        if not separator or "/" in repository_tag:
+            name, repository_tag = repository, tag
+        try:
+            references.append(get_image_url(source, name, repository_tag))
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="REPOSITORIES")
+    write_results(asyncio.run(pull_all(references, concurrency)), output_format)
+
+
+@images.command("build")
+@click.argument("path", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.option("--name", required=True, help="The name of the image.")
+@click.option("--tag", default="latest", show_default=True)
+@click.option("--no-cache", is_flag=True,
+              help="Rebuild every layer, even if an image was already built from the same context.")
+@click.option("--build-arg", "build_args", multiple=True, metavar="KEY=VALUE",
+              help="The value of an ARG instruction, may be repeated.")
+@output_option
+def build_image(path: Path, name: str, tag: str, no_cache: bool, build_args: Tuple[str, ...], output_format: str) -> None:
+    from Managers.image_manager import build_image
+    result = build_image(path, name, tag, no_cache, dict(parse_pairs(build_args, "=", "--build-arg")) or None)
+    write_results([(f"{name}:{tag}", result)], output_format)
+
+
+@images.command("rm")
+@click.argument("ids", nargs=-1, required=True)
+@output_option
+def remove_image(ids: Tuple[str, ...], output_format: str) -> None:
+    from Managers.image_manager import remove_image
+    write_results([(image_id, remove_image(image_id)) for image_id in ids], output_format)
+
+
+@cli.group()
+def networks() -> None:
+    """
+    List, create and remove networks.
+    """
+
+
+@networks.command("ls")
+@output_option
+def list_networks(output_format: str) -> None:
+    from Managers.network_manager import iter_networks
+    from Managers.record_manager import Network
+    write_records(iter_networks(), Network, output_format)
+
+
+@networks.command("create")
+@click.argument("name")
+@click.option("--subnet", default="", help="The subnet of the network, such as 192.168.1.0/24.")
+@output_option
+def create_network(name: str, subnet: str, output_format: str) -> None:
+    from Managers.network_manager import create_network
+    write_results([(name, create_network(name, subnet))], output_format)
+
+
+@networks.command("rm")
+@click.argument("names", nargs=-1, required=True)
+@output_option
+def remove_network(names: Tuple[str, ...], output_format: str) -> None:
+    from Managers.network_manager import remove_network
+    write_results([(name, remove_network(name)) for name in names], output_format)
+
+
+@cli.group()
+def pods() -> None:
+    """
+    List, create and remove pods.
+    """
+
+
+@pods.command("ls")
+@output_option
+def list_pods(output_format: str) -> None:
+    from Managers.pod_manager import iter_pods
+    from Managers.record_manager import Pod
+    write_records(iter_pods(), Pod, output_format)
+
+
+@pods.command("create")
+@click.argument("name")
+@click.option("--network", default="", help="The network to connect the pod to.")
+@output_option
+def create_pod(name: str, network: str, output_format: str) -> None:
+    from Managers.pod_manager import create_pod
+    write_results([(name, create_pod(name, network))], output_format)
+
+
+@pods.command("rm")
+@click.argument("names", nargs=-1, required=True)
+@output_option
+def remove_pod(names: Tuple[str, ...], output_format: str) -> None:
+    from Managers.pod_manager import remove_pod
+    write_results([(name, remove_pod(name)) for name in names], output_format)
+
+
+@cli.group()
+def volumes() -> None:
+    """
+    List, create and remove volumes.
+    """
+
+
+@volumes.command("ls")
+@output_option
+def list_volumes(output_format: str) -> None:
+    from Managers.record_manager import Volume
+    from Managers.volume_manager import iter_volumes
+    write_records(iter_volumes(), Volume, output_format)
+
+
+@volumes.command("create")
+@click.argument("name")
+@output_option
+def create_volume(name: str, output_format: str) -> None:
+    from Managers.volume_manager import create_volume
+    write_results([(name, create_volume(name))], output_format)
+
+
+@volumes.command("rm")
+@click.argument("names", nargs=-1, required=True)
+@output_option
+def remove_volume(names: Tuple[str, ...], output_format: str) -> None:
+    from Managers.volume_manager import remove_volume
+    write_results([(name, remove_volume(name)) for name in names], output_format)
+
+
+if __name__ == "__main__":
+    cli(prog_name="isopod")
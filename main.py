@@ -1,13 +1,16 @@
+import sys
+
+# Arguments select the headless command line interface, which must start without loading Textual
+if __name__ == '__main__' and len(sys.argv) > 1:
+    from cli import cli
+    cli(prog_name='isopod')
+
 from textual.app import App
 
-from Managers.navigation_manager import NavigationManager
-from Pages.container_page import ContainerPage
+from Managers.event_manager import EventManager
+from Managers.navigation_manager import NavigationManager, lazy_page
+from Managers.workspace_manager import WorkspaceManager
 from Pages.home_page import HomePage
-from Pages.image_page import ImagePage
-from Pages.log_page import LogPage
-from Pages.network_page import NetworkPage
-from Pages.pod_page import PodPage
-from Pages.volume_page import VolumePage
 from Themes.themes import LAVENDER
 
 
@@ -21,14 +24,20 @@ class IsopodApp(App):
 
         self.title = 'Isopod'
         nav_manager = NavigationManager(self)
+        # Only the home page is created up front; the others are created the first time they are navigated to
         nav_manager.install(HomePage(), 'home_page', 'Home')
-        nav_manager.install(ImagePage(), 'image_page', 'Image Manager')
-        nav_manager.install(LogPage(), 'log_page', 'Logs')
-        nav_manager.install(NetworkPage(), 'network_page', 'Network Manager')
-        nav_manager.install(PodPage(), 'pod_page', 'Pod Manager')
-        nav_manager.install(VolumePage(), 'volume_page', 'Volume Manager')
-        nav_manager.install(ContainerPage(), 'container_page', 'Container Manager')
+        nav_manager.install(lazy_page('Pages.image_page', 'ImagePage'), 'image_page', 'Image Manager')
+        nav_manager.install(lazy_page('Pages.log_page', 'LogPage'), 'log_page', 'Logs')
+        nav_manager.install(lazy_page('Pages.network_page', 'NetworkPage'), 'network_page', 'Network Manager')
+        nav_manager.install(lazy_page('Pages.pod_page', 'PodPage'), 'pod_page', 'Pod Manager')
+        nav_manager.install(lazy_page('Pages.volume_page', 'VolumePage'), 'volume_page', 'Volume Manager')
+        nav_manager.install(lazy_page('Pages.container_page', 'ContainerPage'), 'container_page', 'Container Manager')
+        nav_manager.install(lazy_page('Pages.diagnostics_page', 'DiagnosticsPage'), 'diagnostics_page', 'Diagnostics')
         nav_manager.navigate('home_page')
+        # The event stream starts a podman process, which can wait until the first frame has been drawn
+        self.call_after_refresh(EventManager().start, self)
+        # Build workspaces left behind by earlier runs are removed in the background
+        self.call_after_refresh(WorkspaceManager().start_reaper)
 
 
 if __name__ == '__main__':